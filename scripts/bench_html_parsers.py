@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Micro-Benchmark for TMT Legal Intelligence
+
+Times monitor_pages.parse_page over saved HTML fixtures with every installed
+parser backend (selectolax, lxml, html.parser) and reports pages/sec.
+
+By default it runs against the committed fixtures in scripts/fixtures/html/:
+synthetic pages shaped like the sites we monitor (notification tables, PDF
+lists, a long news article, a court cause list, malformed legacy markup and a
+JavaScript shell), so results are reproducible. Pages saved live with --save
+go to scripts/fixtures/live/, which is not committed.
+
+Usage:
+    python bench_html_parsers.py                     # Benchmark the committed fixtures
+    python bench_html_parsers.py --rounds=5          # More rounds for steadier numbers
+    python bench_html_parsers.py --save --tier=1     # Save Tier 1 webfetch pages and benchmark them
+    python bench_html_parsers.py --fixtures=DIR      # Benchmark another fixture directory
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import http_client
+import monitor_pages
+import requests
+from monitor_pages import HEADERS, TIMEOUT, available_parsers, parse_page, source_pages
+
+FIXTURES_DIR = monitor_pages.SCRIPT_DIR / "fixtures" / "html"
+LIVE_FIXTURES_DIR = monitor_pages.SCRIPT_DIR / "fixtures" / "live"
+
+
+def save_fixtures(tiers: list[int], fixtures_dir: Path) -> int:
+    """Download the configured webfetch pages into the fixtures directory."""
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    saved = 0
+    for source in monitor_pages.load_source_configs(tiers):
+        for url, section_name in source_pages(source):
+            name = re.sub(r"[^A-Za-z0-9_-]+", "-", f"{source['id']}__{section_name}")
+            try:
+                response = http_client.get(url, headers=HEADERS, timeout=TIMEOUT)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                print(f"  Skipped {url}: {e}")
+                continue
+            (fixtures_dir / f"{name}.html").write_text(response.text, encoding="utf-8")
+            print(f"  Saved {name}.html ({len(response.text):,} chars)")
+            saved += 1
+    return saved
+
+
+def benchmark(pages: list[str], parser: str, rounds: int) -> float:
+    """Return pages/sec for parsing every page `rounds` times with one backend."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for html in pages:
+            parse_page(html, "https://example.org/", parser)
+    elapsed = time.perf_counter() - start
+    return len(pages) * rounds / elapsed if elapsed else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends used by monitor_pages")
+    parser.add_argument("--fixtures", type=str, help=f"Fixture directory (default: {FIXTURES_DIR})")
+    parser.add_argument("--save", action="store_true", help=f"Download webfetch pages first (default: {LIVE_FIXTURES_DIR})")
+    parser.add_argument("--tier", type=int, choices=[1, 2, 3, 4, 5], default=1, help="Tier to save (with --save)")
+    parser.add_argument("--rounds", type=int, default=3, help="Passes over the fixtures per backend")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        fixtures_dir = Path(args.fixtures)
+    else:
+        fixtures_dir = LIVE_FIXTURES_DIR if args.save else FIXTURES_DIR
+
+    if args.save:
+        print(f"Saving fixtures to {fixtures_dir}")
+        save_fixtures([args.tier], fixtures_dir)
+
+    pages = [p.read_text(encoding="utf-8", errors="replace") for p in sorted(fixtures_dir.glob("*.html"))]
+    if not pages:
+        print(f"No HTML fixtures found in {fixtures_dir}")
+        sys.exit(1)
+
+    total_bytes = sum(len(p) for p in pages)
+    print(f"Benchmarking {len(pages)} pages ({total_bytes:,} chars), {args.rounds} rounds")
+    print("-" * 40)
+
+    baseline = None
+    for backend in reversed(available_parsers()):  # html.parser first as the baseline
+        rate = benchmark(pages, backend, args.rounds)
+        baseline = baseline or rate
+        print(f"  {backend:<12} {rate:>8.1f} pages/sec  ({rate / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
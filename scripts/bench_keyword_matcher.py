@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher Benchmark for TMT Legal Intelligence
+
+Runs every configured filter_keywords list against the items in
+new_items.json, once with the old per-keyword substring loop and once with
+the compiled matcher, checks both agree, and reports items/sec. Also times
+focus-area tagging.
+
+Usage:
+    python bench_keyword_matcher.py                          # Uses sources/downloaded/new_items.json
+    python bench_keyword_matcher.py --input=findings.json    # Any file with an "items" list
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from keyword_matcher import FocusAreaTagger, KeywordMatcher, load_focus_area_keywords
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+SOURCES_CONFIG_DIR = PROJECT_ROOT / "sources" / "config"
+DEFAULT_INPUT = PROJECT_ROOT / "sources" / "downloaded" / "new_items.json"
+
+
+def load_keyword_lists() -> list[list[str]]:
+    """Collect every non-empty filter_keywords list from the tier configs."""
+    lists = []
+    for config_file in sorted(SOURCES_CONFIG_DIR.glob("tier*/*.json")):
+        with open(config_file) as f:
+            for source in json.load(f).get("sources", []):
+                if source.get("filter_keywords"):
+                    lists.append(source["filter_keywords"])
+    return lists
+
+
+def naive_pass(text: str, keywords: list[str]) -> bool:
+    """The original fetch_rss check."""
+    text = text.lower()
+    return any(kw.lower() in text for kw in keywords)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compiled keyword matcher")
+    parser.add_argument("--input", type=str, help=f"Items file (default: {DEFAULT_INPUT})")
+    args = parser.parse_args()
+
+    input_path = Path(args.input) if args.input else DEFAULT_INPUT
+    with open(input_path) as f:
+        items = json.load(f).get("items", [])
+    texts = [f"{item.get('title', '')} {item.get('snippet', '')}" for item in items]
+    keyword_lists = load_keyword_lists()
+
+    if not texts or not keyword_lists:
+        print("Nothing to benchmark: no items or no filter_keywords lists found.")
+        sys.exit(1)
+
+    checks = len(texts) * len(keyword_lists)
+    print(f"{len(texts)} items x {len(keyword_lists)} keyword lists = {checks:,} checks")
+    print("-" * 50)
+
+    start = time.perf_counter()
+    naive = [naive_pass(text, kws) for kws in keyword_lists for text in texts]
+    naive_time = time.perf_counter() - start
+    print(f"  substring loop     {checks / naive_time:>12,.0f} checks/sec")
+
+    start = time.perf_counter()
+    matchers = [KeywordMatcher(kws) for kws in keyword_lists]
+    compiled = [bool(m.find(text)) for m in matchers for text in texts]
+    compiled_time = time.perf_counter() - start
+    print(f"  compiled (find)    {checks / compiled_time:>12,.0f} checks/sec  "
+          f"({naive_time / compiled_time:.1f}x, includes which keywords matched)")
+
+    start = time.perf_counter()
+    lowered = [text.lower() for text in texts]
+    shared = [bool(m.find_lowered(text)) for m in matchers for text in lowered]
+    shared_time = time.perf_counter() - start
+    print(f"  compiled (shared)  {checks / shared_time:>12,.0f} checks/sec  "
+          f"({naive_time / shared_time:.1f}x, text lowercased once per item)")
+
+    if naive != compiled or naive != shared:
+        print("ERROR: compiled matcher disagrees with substring loop")
+        sys.exit(1)
+    print(f"  Results agree: {sum(naive):,} of {checks:,} checks pass")
+
+    tagger = FocusAreaTagger(load_focus_area_keywords(SOURCES_CONFIG_DIR / "focus-area-keywords.json"))
+    start = time.perf_counter()
+    tagged = sum(1 for text in lowered if tagger.tag_lowered(text))
+    tag_time = time.perf_counter() - start
+    print(f"  focus-area tagging {len(texts) / tag_time:>12,.0f} items/sec  ({tagged:,} items tagged)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,38 @@
 """
 RSS Feed Discovery Script
 Automatically discovers RSS feeds for all sources by checking common patterns.
+
+Sources are probed concurrently (with a per-host limit), and each source stops
+at the first candidate that turns out to be a feed. Candidates are rejected
+from the first few KB of a ranged GET rather than downloaded and parsed whole.
+Results (found and not found) are cached in sources/state/feed_discovery.json,
+so repeated runs only re-probe sources whose cached result has expired.
+
+Usage:
+    python discover_rss.py                  # Probe sources without a cached result
+    python discover_rss.py --refresh        # Ignore the cache and probe everything
+    python discover_rss.py --diff           # Preview the config changes for found feeds
+    python discover_rss.py --update         # Show the changes and write them into the configs
 """
 
+import argparse
+import asyncio
+import difflib
 import json
 import os
 import re
 import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
 import requests
 from bs4 import BeautifulSoup
 import feedparser
+import http_client
+import source_registry
+from state_io import atomic_write_json, read_json, update_json
 
 # Common RSS feed URL patterns to try
 RSS_PATTERNS = [
@@ -31,11 +51,26 @@ RSS_PATTERNS = [
     '/index.xml',
 ]
 
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) RSS Feed Discovery Bot'
-}
+HEADERS = http_client.HTML_HEADERS
 
 REQUEST_TIMEOUT = 10
+# Candidate URLs are cheap to skip; only retry once on transient errors
+PROBE_RETRIES = 1
+# Enough of a response to see its root element; the rest is never downloaded
+PROBE_BYTES = 4096
+MAX_CONCURRENCY = 10
+PER_HOST_LIMIT = 2
+
+CACHE_PATH = Path(__file__).parent.parent / 'sources' / 'state' / 'feed_discovery.json'
+# How long a cached result is trusted before the source is probed again
+CACHE_TTL = {
+    'found': timedelta(days=30),
+    'not_found': timedelta(days=7),
+    'error': timedelta(days=1),  # Homepage unreachable; may be a transient outage
+}
+
+FEED_ROOT = re.compile(r'<(rss|feed|rdf:RDF)[\s>]', re.I)
+HTML_ROOT = re.compile(r'<(html|body)[\s>]', re.I)
 
 
 def is_valid_feed(content: str) -> bool:
@@ -52,6 +87,14 @@ def is_valid_feed(content: str) -> bool:
         return False
 
 
+def looks_like_feed(head: bytes) -> bool:
+    """Whether the start of a response has an RSS/Atom/RDF root element (before any HTML)."""
+    text = head.decode('utf-8', errors='ignore')
+    feed_match = FEED_ROOT.search(text)
+    html_match = HTML_ROOT.search(text)
+    return bool(feed_match) and (not html_match or feed_match.start() < html_match.start())
+
+
 def find_rss_in_html(html: str, base_url: str) -> list:
     """Extract RSS feed URLs from HTML link tags."""
     feeds = []
@@ -76,7 +119,77 @@ def find_rss_in_html(html: str, base_url: str) -> list:
     return feeds
 
 
-def discover_feed_for_url(base_url: str) -> dict:
+def probe_feed(url: str) -> str | None:
+    """
+    Final URL (after redirects) if `url` serves a feed, else None.
+
+    Only the first PROBE_BYTES are requested (and read, if the server ignores
+    Range), so HTML pages and error pages are rejected without downloading them.
+    """
+    headers = {**http_client.FEED_HEADERS, 'Range': f'bytes=0-{PROBE_BYTES - 1}'}
+    try:
+        response = http_client.get(url, headers=headers, timeout=REQUEST_TIMEOUT, allow_redirects=True,
+                                   retries=PROBE_RETRIES, stream=True)
+    except requests.RequestException:
+        return None
+    try:
+        if response.status_code not in (200, 206):
+            return None
+        head = response.raw.read(PROBE_BYTES, decode_content=True)
+    except Exception:
+        return None
+    finally:
+        response.close()
+    return response.url if looks_like_feed(head) else None
+
+
+def confirm_feed(url: str) -> bool:
+    """Full fetch and parse of the one candidate a source settles on."""
+    try:
+        response = http_client.get(url, headers=http_client.FEED_HEADERS, timeout=REQUEST_TIMEOUT,
+                                   retries=PROBE_RETRIES)
+    except requests.RequestException:
+        return False
+    return response.status_code == 200 and is_valid_feed(response.text)
+
+
+class ProbeSlots:
+    """Global and per-host concurrency limits shared by every probe in a run."""
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, per_host_limit: int = PER_HOST_LIMIT):
+        self.global_slots = asyncio.Semaphore(max_concurrency)
+        self.host_slots: dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(per_host_limit))
+
+    async def run(self, url: str, func, *args):
+        """Run a blocking request function in a thread once a slot for url's host is free."""
+        # Host slot first so requests queued for a busy host don't hold global slots
+        async with self.host_slots[http_client.host_of(url)]:
+            async with self.global_slots:
+                return await asyncio.to_thread(func, *args)
+
+
+async def _first_feed(candidates: list[str], slots: ProbeSlots) -> str | None:
+    """
+    Probe candidates concurrently; return the highest-ranked feed (first in
+    list order), cancelling the probes ranked below it.
+
+    Results are taken in candidate order rather than completion order, so the
+    same feed wins on every run however fast each path answers.
+    """
+    tasks = [asyncio.create_task(slots.run(url, probe_feed, url)) for url in candidates]
+    try:
+        for task in tasks:
+            feed_url = await task
+            if feed_url and await slots.run(feed_url, confirm_feed, feed_url):
+                return feed_url
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return None
+
+
+async def discover_feed_async(base_url: str, slots: ProbeSlots) -> dict:
     """Try to discover RSS feed for a given URL."""
     result = {
         'url': base_url,
@@ -92,11 +205,14 @@ def discover_feed_for_url(base_url: str) -> dict:
     parsed = urlparse(base_url)
     base_domain = f"{parsed.scheme}://{parsed.netloc}"
 
-    feeds_to_try = []
+    html_feeds = []
 
     # First, try to fetch the homepage and look for RSS links in HTML
+    def fetch_homepage():
+        return http_client.get(base_url, headers=HEADERS, timeout=REQUEST_TIMEOUT, allow_redirects=True)
+
     try:
-        response = requests.get(base_url, headers=HEADERS, timeout=REQUEST_TIMEOUT, allow_redirects=True)
+        response = await slots.run(base_url, fetch_homepage)
         if response.status_code == 200:
             content_type = response.headers.get('content-type', '').lower()
 
@@ -109,40 +225,77 @@ def discover_feed_for_url(base_url: str) -> dict:
 
             # Extract feeds from HTML
             html_feeds = find_rss_in_html(response.text, base_url)
-            feeds_to_try.extend(html_feeds)
     except Exception as e:
         result['error'] = f"Failed to fetch homepage: {str(e)[:50]}"
+        if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+            return result  # Every candidate on this host would fail the same way
 
     # Add common patterns to try
+    pattern_feeds = []
     for pattern in RSS_PATTERNS:
-        feeds_to_try.append(urljoin(base_domain, pattern))
-        feeds_to_try.append(urljoin(base_url, pattern))
+        pattern_feeds.append(urljoin(base_domain, pattern))
+        pattern_feeds.append(urljoin(base_url, pattern))
 
-    # Remove duplicates while preserving order
+    # Feeds the page advertises are preferred over guessed URLs, so they are
+    # probed first as their own round; duplicates are dropped, order preserved
     seen = set()
-    unique_feeds = []
-    for f in feeds_to_try:
-        if f not in seen:
-            seen.add(f)
-            unique_feeds.append(f)
-
-    # Try each potential feed URL
-    for feed_url in unique_feeds:
-        try:
-            response = requests.get(feed_url, headers=HEADERS, timeout=REQUEST_TIMEOUT, allow_redirects=True)
-            if response.status_code == 200:
-                if is_valid_feed(response.text):
-                    result['feed_url'] = response.url  # Use final URL after redirects
-                    result['method'] = 'discovered'
-                    return result
-        except:
-            continue
+    rounds = []
+    for candidates in (html_feeds, pattern_feeds):
+        unique_feeds = [f for f in candidates if not (f in seen or seen.add(f))]
+        if unique_feeds:
+            rounds.append(unique_feeds)
+
+    for unique_feeds in rounds:
+        feed_url = await _first_feed(unique_feeds, slots)
+        if feed_url:
+            result['feed_url'] = feed_url  # Final URL after redirects
+            result['method'] = 'discovered'
+            return result
 
     return result
 
 
-def process_source(source: dict) -> dict:
-    """Process a single source and try to find its RSS feed."""
+def load_cache(path: Path = CACHE_PATH) -> dict:
+    """Cached discovery results keyed by source URL."""
+    return read_json(path, default={}) or {}
+
+
+def cached_result(cache: dict, source: dict, now: datetime) -> dict | None:
+    """The source's cached result, if it has not expired."""
+    entry = cache.get(source.get('url', ''))
+    if not entry:
+        return None
+    try:
+        checked_at = datetime.fromisoformat(entry['checked_at'])
+    except (KeyError, ValueError):
+        return None
+    if now - checked_at > CACHE_TTL.get(entry.get('status'), timedelta(0)):
+        return None
+    return entry
+
+
+def save_cache(results: list, path: Path = CACHE_PATH):
+    """Record freshly probed results (cached ones keep their original timestamp)."""
+    now = datetime.now(timezone.utc).isoformat()
+    fresh = {}
+    for r in results:
+        if r.get('cached') or r['status'] not in ('found', 'not_found'):
+            continue
+        status = 'error' if r['status'] == 'not_found' and r.get('error') else r['status']
+        fresh[r['url']] = {
+            'id': r['id'],
+            'status': status,
+            'rss': r.get('rss'),
+            'method': r.get('method'),
+            'error': r.get('error'),
+            'checked_at': now
+        }
+    if fresh:
+        update_json(path, lambda cache: cache.update(fresh), default={})
+
+
+def skip_result(source: dict) -> dict | None:
+    """Result for sources that are not probed at all, or None."""
     source_id = source.get('id', 'unknown')
     url = source.get('url', '')
     existing_rss = source.get('rss')
@@ -165,89 +318,181 @@ def process_source(source: dict) -> dict:
             'status': 'skipped_type',
             'type': source_type
         }
+    return None
 
-    print(f"  Checking {source_id}...", end=' ', flush=True)
-    result = discover_feed_for_url(url)
 
-    if result['feed_url']:
-        print(f"✓ Found: {result['feed_url'][:60]}")
+def source_result(source: dict, result: dict, cached: bool = False) -> dict:
+    """Per-source result from a discovery (or cache) result."""
+    source_id = source.get('id', 'unknown')
+    url = source.get('url', '')
+    marker = " (cached)" if cached else ""
+
+    if result.get('feed_url') or result.get('rss'):
+        feed_url = result.get('feed_url') or result.get('rss')
+        print(f"  {source_id}: ✓ Found{marker}: {feed_url[:60]}")
         return {
             'id': source_id,
             'url': url,
             'status': 'found',
-            'rss': result['feed_url'],
-            'method': result['method']
+            'rss': feed_url,
+            'method': result.get('method'),
+            'cached': cached
         }
     else:
-        print(f"✗ No feed")
+        print(f"  {source_id}: ✗ No feed{marker}")
         return {
             'id': source_id,
             'url': url,
             'status': 'not_found',
-            'error': result.get('error')
+            'error': result.get('error'),
+            'cached': cached
         }
 
 
-def load_sources(config_dir: Path) -> list:
-    """Load all sources from config files."""
-    all_sources = []
-
-    for tier_dir in sorted(config_dir.iterdir()):
-        if tier_dir.is_dir() and tier_dir.name.startswith('tier'):
-            for json_file in tier_dir.glob('*.json'):
-                try:
-                    with open(json_file) as f:
-                        data = json.load(f)
-                        sources = data.get('sources', [])
-                        for source in sources:
-                            source['_tier'] = tier_dir.name
-                            source['_file'] = str(json_file)
-                        all_sources.extend(sources)
-                except Exception as e:
-                    print(f"Error loading {json_file}: {e}")
+def discover_all(sources: list, cache: dict | None = None, max_concurrency: int = MAX_CONCURRENCY,
+                 per_host_limit: int = PER_HOST_LIMIT) -> list:
+    """
+    Results for every source: skipped and unexpired cached sources without any
+    request, the rest probed concurrently.
+    """
+    now = datetime.now(timezone.utc)
+    results = []
+    to_probe = []
+    for source in sources:
+        skipped = skip_result(source)
+        cached = None if skipped else cached_result(cache or {}, source, now)
+        if skipped:
+            results.append(skipped)
+        elif cached:
+            results.append(source_result(source, cached, cached=True))
+        else:
+            to_probe.append(source)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=max_concurrency))
+        slots = ProbeSlots(max_concurrency, per_host_limit)
+
+        async def probe(source: dict) -> dict:
+            try:
+                result = await discover_feed_async(source.get('url', ''), slots)
+            except Exception as e:
+                result = {'error': str(e)[:50]}
+            # Runs on the event loop thread, so progress lines don't interleave
+            return source_result(source, result)
+
+        return await asyncio.gather(*(probe(s) for s in to_probe))
+
+    if to_probe:
+        print(f"Probing {len(to_probe)} sources ({len(results)} cached or skipped)")
+        results.extend(asyncio.run(run()))
+    return results
+
+
+def config_files(config_dir: Path) -> list[Path]:
+    """Tier config files, in tier order."""
+    return [
+        json_file
+        for tier_dir in sorted(config_dir.iterdir())
+        if tier_dir.is_dir() and tier_dir.name.startswith('tier')
+        for json_file in sorted(tier_dir.glob('*.json'))
+    ]
+
+
+def index_source_configs(config_dir: Path) -> tuple[dict, dict]:
+    """
+    One pass over the tier configs: the parsed files, and a source-id index
+    of where each id occurs as (file, position in its sources list).
+
+    Some ids occur in more than one tier, so an id maps to every occurrence.
+    """
+    documents = {}
+    locations: dict[str, list[tuple[Path, int]]] = defaultdict(list)
+    for json_file in config_files(config_dir):
+        try:
+            with open(json_file) as f:
+                text = f.read()
+            documents[json_file] = (text, json.loads(text))
+        except Exception as e:
+            print(f"Error loading {json_file}: {e}")
+            continue
+        for position, source in enumerate(documents[json_file][1].get('sources', [])):
+            locations[source.get('id')].append((json_file, position))
+    return documents, locations
 
-    return all_sources
 
+def plan_config_updates(results: list, config_dir: Path) -> dict[Path, tuple[str, dict, list]]:
+    """
+    Apply discovered feeds to the configs in memory.
 
-def update_source_configs(results: list, config_dir: Path):
-    """Update source config files with discovered RSS feeds."""
-    # Group results by file
-    updates_by_file = {}
+    A feed is applied to every occurrence of the source id that has the same
+    URL and no rss yet. Returns {file: (original text, updated data, updated
+    ids)} for files that change.
+    """
+    documents, locations = index_source_configs(config_dir)
+    changed: dict[Path, list] = defaultdict(list)
     for result in results:
-        if result['status'] == 'found':
-            # Find the source in config files
-            for tier_dir in config_dir.iterdir():
-                if tier_dir.is_dir() and tier_dir.name.startswith('tier'):
-                    for json_file in tier_dir.glob('*.json'):
-                        file_path = str(json_file)
-                        if file_path not in updates_by_file:
-                            updates_by_file[file_path] = []
-                        updates_by_file[file_path].append(result)
-
-    # Update each file
-    for file_path, updates in updates_by_file.items():
-        try:
-            with open(file_path) as f:
-                data = json.load(f)
-
-            update_ids = {u['id']: u['rss'] for u in updates}
-            updated_count = 0
-
-            for source in data.get('sources', []):
-                if source.get('id') in update_ids and not source.get('rss'):
-                    source['rss'] = update_ids[source['id']]
-                    source['method'] = 'rss'
-                    updated_count += 1
-
-            if updated_count > 0:
-                with open(file_path, 'w') as f:
-                    json.dump(data, f, indent=2)
-                print(f"Updated {updated_count} sources in {Path(file_path).name}")
-        except Exception as e:
-            print(f"Error updating {file_path}: {e}")
+        if result['status'] != 'found':
+            continue
+        for json_file, position in locations.get(result['id'], []):
+            source = documents[json_file][1]['sources'][position]
+            if source.get('rss') or source.get('url', '') != result['url']:
+                continue
+            source['rss'] = result['rss']
+            source['method'] = 'rss'
+            changed[json_file].append(result['id'])
+    return {json_file: (*documents[json_file], ids) for json_file, ids in changed.items()}
+
+
+def config_diff(plan: dict, config_dir: Path) -> list[str]:
+    """Unified diff of the planned config changes."""
+    lines = []
+    for json_file, (text, data, _) in plan.items():
+        name = str(json_file.relative_to(config_dir.parent.parent))
+        lines.extend(difflib.unified_diff(
+            text.splitlines(), json.dumps(data, indent=2).splitlines(),
+            fromfile=f"a/{name}", tofile=f"b/{name}", lineterm=''
+        ))
+    return lines
+
+
+def update_source_configs(results: list, config_dir: Path, write: bool = True) -> dict:
+    """
+    Update source config files with discovered RSS feeds.
+
+    Prints a diff of the changes; with write=True each changed file is then
+    written once, atomically. Returns the plan (see plan_config_updates).
+    """
+    plan = plan_config_updates(results, config_dir)
+    if not plan:
+        print("No config changes: every discovered feed is already configured")
+        return plan
+
+    for line in config_diff(plan, config_dir):
+        print(line)
+
+    if write:
+        for json_file, (_, data, ids) in plan.items():
+            try:
+                atomic_write_json(json_file, data)
+                print(f"Updated {len(ids)} sources in {json_file.name}")
+            except OSError as e:
+                print(f"Error updating {json_file}: {e}")
+    return plan
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Discover RSS feeds for sources that lack one")
+    parser.add_argument("--update", action="store_true", help="Write discovered feeds into the source configs")
+    parser.add_argument("--diff", action="store_true",
+                        help="Show the config changes --update would make, without writing them")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached results and probe every source")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY,
+                        help=f"Max requests in flight (default: {MAX_CONCURRENCY})")
+    parser.add_argument("--per-host", type=int, default=PER_HOST_LIMIT,
+                        help=f"Max requests in flight per host (default: {PER_HOST_LIMIT})")
+    args = parser.parse_args()
+
     # Find config directory
     script_dir = Path(__file__).parent
     config_dir = script_dir.parent / 'sources' / 'config'
@@ -262,7 +507,9 @@ def main():
 
     # Load all sources
     print("\nLoading sources...")
-    sources = load_sources(config_dir)
+    registry = source_registry.load()
+    registry.log_problems()
+    sources = registry.select(enabled_only=False)
     print(f"Loaded {len(sources)} sources")
 
     # Filter sources that might have RSS
@@ -272,17 +519,9 @@ def main():
 
     # Process sources
     print("\n" + "-" * 60)
-    results = []
-
-    # Use threading for faster processing
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = {executor.submit(process_source, s): s for s in eligible_sources}
-        for future in as_completed(futures):
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                print(f"Error: {e}")
+    cache = {} if args.refresh else load_cache()
+    results = discover_all(eligible_sources, cache, args.concurrency, args.per_host)
+    save_cache(results)
 
     # Summary
     print("\n" + "=" * 60)
@@ -298,6 +537,11 @@ def main():
     print(f"No RSS feed: {len(not_found)}")
     print(f"Already had RSS: {len(already_has)}")
     print(f"Skipped (court/govt): {len(skipped)}")
+    print(f"From cache: {sum(1 for r in results if r.get('cached'))}")
+
+    print()
+    for line in http_client.latency_report_lines():
+        print(line)
 
     if found:
         print("\n" + "-" * 60)
@@ -310,13 +554,17 @@ def main():
     if found:
         output_file = script_dir / 'discovered_feeds.json'
         with open(output_file, 'w') as f:
-            json.dump(found, f, indent=2)
+            json.dump([{k: v for k, v in r.items() if k != 'cached'} for r in found], f, indent=2)
         print(f"\nResults saved to {output_file}")
 
-        # Auto-update if --update flag is passed
-        if len(sys.argv) > 1 and sys.argv[1] == '--update':
-            update_source_configs(found, config_dir)
-            print("\nConfig files updated automatically.")
+        # Preview with --diff; write with --update
+        if args.update or args.diff:
+            print("\n" + "-" * 60)
+            print("CONFIG CHANGES:" if args.update else "CONFIG CHANGES (preview, run with --update to apply):")
+            print("-" * 60)
+            plan = update_source_configs(found, config_dir, write=args.update)
+            if args.update and plan:
+                print("\nConfig files updated automatically.")
 
 
 if __name__ == '__main__':
@@ -4,24 +4,71 @@ PDF Download Helper for TMT Legal Intelligence System
 
 Usage:
     python scripts/download_pdf.py <url> <output_filename>
+    python scripts/download_pdf.py --from-items                  # PDFs linked from new_items.json
+    python scripts/download_pdf.py --from-items=new_items.ndjson --workers=8
+    python scripts/download_pdf.py --list=urls.txt --per-host=2  # One URL (optionally a filename) per line
+    python scripts/download_pdf.py --migrate                     # Move existing PDFs into the store
 
 Example:
     python scripts/download_pdf.py "https://example.com/document.pdf" "2025-01-12_MeitY_AI-Framework.pdf"
 
 The file will be saved to sources/downloaded/
+
+Bulk mode downloads concurrently with a per-host limit. Transfers go to a
+".part" file and an interrupted one resumes with an HTTP Range request on
+the next attempt (or the next run). The ETag or Last-Modified saved next to
+it is sent as If-Range, so a file changed on the server is fetched afresh.
+Each file's size, SHA-256 and timing is recorded in
+sources/downloaded/download_manifest.json; URLs already in the manifest
+with their file present are skipped.
+
+PDFs are stored once by content: sources/downloaded/store/ab/<sha256>.pdf.
+The date-prefixed name is a symlink to the stored file (a hard link where
+symlinks are unavailable, or only a manifest entry where neither works).
+A download whose content is already stored is not written again, and its
+manifest entry says so (duplicate: true), so it need not be re-extracted.
 """
 
+import argparse
+import hashlib
 import sys
 import os
+import threading
+import time
 import requests
-from datetime import datetime
+import urllib3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 from pathlib import Path
+from urllib.parse import urlparse
+
+import http_client
+from item_stream import iter_records
+from state_io import atomic_write_json, read_json, update_json
 
 # Configuration
-DOWNLOAD_DIR = Path(__file__).parent.parent / "sources" / "downloaded"
-USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+PROJECT_ROOT = Path(__file__).parent.parent
+DOWNLOAD_DIR = PROJECT_ROOT / "sources" / "downloaded"
+MANIFEST_PATH = DOWNLOAD_DIR / "download_manifest.json"
+STORE_DIR = DOWNLOAD_DIR / "store"
 TIMEOUT = 30  # seconds
 
+# Bulk mode
+DEFAULT_WORKERS = 6
+DEFAULT_PER_HOST = 2
+RESUME_ATTEMPTS = 3           # Range-request retries after a transfer breaks off
+
+# Adaptive chunk size: grow while chunks arrive quickly, shrink when they stall
+MIN_CHUNK_SIZE = 16 * 1024
+START_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+FAST_CHUNK_SECONDS = 0.1
+SLOW_CHUNK_SECONDS = 1.0
+
+_host_slots: dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+_store_lock = threading.Lock()
+
 
 def sanitize_filename(filename: str) -> str:
     """Remove or replace invalid filename characters."""
@@ -35,6 +82,282 @@ def sanitize_filename(filename: str) -> str:
     return filename
 
 
+def default_filename(url: str) -> str:
+    """Date-prefixed file name taken from the URL's last path segment."""
+    date_prefix = datetime.now().strftime("%Y-%m-%d")
+    url_filename = url.split("/")[-1].split("?")[0]
+    if not url_filename.endswith(".pdf"):
+        url_filename += ".pdf"
+    return f"{date_prefix}_{sanitize_filename(url_filename)}"
+
+
+def next_chunk_size(chunk_size: int, seconds: float) -> int:
+    """Double the chunk size after a fast read, halve it after a slow one."""
+    if seconds < FAST_CHUNK_SECONDS:
+        return min(MAX_CHUNK_SIZE, chunk_size * 2)
+    if seconds > SLOW_CHUNK_SECONDS:
+        return max(MIN_CHUNK_SIZE, chunk_size // 2)
+    return chunk_size
+
+
+def _host_slot(host: str, limit: int) -> threading.BoundedSemaphore:
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(limit)
+        return _host_slots[host]
+
+
+def store_path(sha256: str) -> Path:
+    """Where a PDF with this content hash lives in the store."""
+    return STORE_DIR / sha256[:2] / f"{sha256}.pdf"
+
+
+def link_name(output_path: Path, target: Path) -> str:
+    """
+    Make the readable output_path point at a stored file.
+
+    Returns "symlink", "hardlink", or "manifest" when neither is possible
+    (the name then exists only as a manifest entry).
+    """
+    if output_path.is_symlink() or output_path.exists():
+        output_path.unlink()
+    try:
+        os.symlink(os.path.relpath(target, output_path.parent), output_path)
+        return "symlink"
+    except OSError:
+        pass
+    try:
+        os.link(target, output_path)
+        return "hardlink"
+    except OSError:
+        return "manifest"
+
+
+def store_file(path: Path, output_path: Path, sha256: str) -> dict:
+    """
+    Move a finished file into the store, or drop it if that content is
+    already stored, and link the readable name to the stored copy.
+    """
+    target = store_path(sha256)
+    with _store_lock:
+        duplicate = target.exists()
+        if duplicate:
+            path.unlink()
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(path, target)
+        link = link_name(output_path, target)
+    return {"store_path": str(target), "duplicate": duplicate, "link": link}
+
+
+def resume_validator(response) -> str | None:
+    """
+    The response's strong validator for If-Range: a strong ETag, else
+    Last-Modified (weak ETags may not be used with If-Range).
+    """
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def discard_partial(part_path: Path, validator_path: Path):
+    """Remove a partial download and its saved validator."""
+    part_path.unlink(missing_ok=True)
+    validator_path.unlink(missing_ok=True)
+
+
+def fetch_to_file(url: str, output_path: Path, per_host: int = DEFAULT_PER_HOST) -> dict:
+    """
+    Download url via "<output>.part" into the store, linked as output_path,
+    resuming with Range requests.
+
+    An existing .part file (from a broken transfer in this or an earlier run)
+    is continued rather than restarted. The ETag or Last-Modified it was
+    downloaded under is kept in "<output>.part.json" and sent as If-Range, so
+    the server sends the whole file again if it changed in the meantime; a
+    .part file without a saved validator is discarded. Never raises for HTTP
+    or network errors: the result dict has success/error plus size, sha256,
+    seconds, content_type, how many bytes were resumed, and store_path,
+    duplicate and link (see store_file).
+    """
+    part_path = output_path.with_name(output_path.name + ".part")
+    validator_path = part_path.with_name(part_path.name + ".json")
+    result = {
+        "url": url,
+        "path": str(output_path),
+        "success": False,
+        "size": 0,
+        "sha256": None,
+        "seconds": 0.0,
+        "content_type": None,
+        "resumed_bytes": 0,
+        "error": None
+    }
+    saved = read_json(validator_path, default={})
+    validator = saved.get("validator") if isinstance(saved, dict) and saved.get("url") == url else None
+    start = time.monotonic()
+
+    with _host_slot(http_client.host_of(url), per_host):
+        for attempt in range(RESUME_ATTEMPTS + 1):
+            if not validator:
+                discard_partial(part_path, validator_path)  # Cannot tell whether it is still the same file
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            # Identity encoding keeps Range offsets equal to bytes on disk
+            headers = {**http_client.PDF_HEADERS, "Accept-Encoding": "identity"}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                headers["If-Range"] = validator
+
+            try:
+                response = http_client.get(url, headers=headers, timeout=TIMEOUT, stream=True)
+                if response.status_code == 416 and offset:
+                    # Range starts at or past the end: the .part file is complete if it is exactly that long
+                    response.close()
+                    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+                    if total.isdigit() and int(total) == offset:
+                        break
+                    discard_partial(part_path, validator_path)
+                    validator = None
+                    result["error"] = f"416 for bytes={offset}- (Content-Range: {total or 'missing'})"
+                    continue
+                response.raise_for_status()
+
+                result["content_type"] = response.headers.get("content-type", "")
+                if response.status_code == 206:
+                    result["resumed_bytes"] += offset
+                    mode = "ab"
+                else:
+                    mode = "wb"  # Server ignored the range (or the file changed): start over
+                    validator = resume_validator(response)
+                    if validator:
+                        atomic_write_json(validator_path, {"url": url, "validator": validator})
+                    else:
+                        validator_path.unlink(missing_ok=True)
+
+                chunk_size = START_CHUNK_SIZE
+                with response, open(part_path, mode) as f:
+                    while True:
+                        chunk_start = time.monotonic()
+                        chunk = response.raw.read(chunk_size, decode_content=True)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        chunk_size = next_chunk_size(chunk_size, time.monotonic() - chunk_start)
+                break
+            except requests.HTTPError as e:
+                if e.response is not None:
+                    e.response.close()
+                result["error"] = str(e)
+                result["seconds"] = round(time.monotonic() - start, 2)
+                return result
+            except (requests.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+                # Broken transfer: keep the .part file and continue it with a Range request
+                result["error"] = str(e)
+                if attempt >= RESUME_ATTEMPTS:
+                    result["seconds"] = round(time.monotonic() - start, 2)
+                    return result
+        else:
+            result["seconds"] = round(time.monotonic() - start, 2)
+            return result  # Every attempt got a 416 that did not match the .part file
+
+    validator_path.unlink(missing_ok=True)
+    sha256 = file_sha256(part_path)
+    result.update(
+        success=True,
+        error=None,
+        size=part_path.stat().st_size,
+        sha256=sha256,
+        seconds=round(time.monotonic() - start, 2),
+        **store_file(part_path, output_path, sha256)
+    )
+    return result
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(MAX_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def relative_path(path: str) -> str:
+    """Manifest paths are relative to the project root so the manifest works in any checkout."""
+    try:
+        return str(Path(os.path.abspath(path)).relative_to(os.path.abspath(PROJECT_ROOT)))
+    except ValueError:
+        return str(path)
+
+
+def record_results(manifest_path: Path, results: list[dict]):
+    """Add results to the manifest: per-URL entries, stored objects and their names, bytes saved."""
+    results = [
+        {**r, "path": relative_path(r["path"]), **({"store_path": relative_path(r["store_path"])}
+                                                    if r.get("store_path") else {})}
+        for r in results
+    ]
+
+    def record(data: dict) -> dict:
+        files = data.setdefault("files", {})
+        objects = data.setdefault("objects", {})
+        stats = data.setdefault("stats", {"duplicates": 0, "bytes_saved": 0})
+        for result in results:
+            files[result["url"]] = result
+            if not result.get("success"):
+                continue
+            entry = objects.setdefault(result["sha256"], {
+                "store_path": result["store_path"],
+                "size": result["size"],
+                "names": [],
+                "urls": []
+            })
+            name = Path(result["path"]).name
+            if name not in entry["names"]:
+                entry["names"].append(name)
+            if result["url"] not in entry["urls"]:
+                entry["urls"].append(result["url"])
+            if result.get("duplicate"):
+                stats["duplicates"] += 1
+                stats["bytes_saved"] += result["size"]
+        data["updated_at"] = datetime.now(timezone.utc).isoformat()
+        return data
+
+    update_json(manifest_path, record, default={})
+
+
+def migrate_to_store(manifest_path: Path = MANIFEST_PATH) -> list[dict]:
+    """
+    Move PDFs saved before the store existed into it, replacing them with links.
+
+    Names already linked to the store (symlinks, or hard links to the stored
+    object from an earlier run) are skipped, so running it again records nothing.
+    """
+    results = []
+    for path in sorted(DOWNLOAD_DIR.glob("*.pdf")):
+        if path.is_symlink():
+            continue
+        stat = path.stat()
+        size = stat.st_size
+        sha256 = file_sha256(path)
+        if stat.st_nlink > 1 and store_path(sha256).exists() and os.path.samefile(path, store_path(sha256)):
+            continue
+        staged = path.with_name(path.name + ".part")
+        os.replace(path, staged)
+        results.append({
+            "url": f"file:{path.name}",
+            "path": str(path),
+            "success": True,
+            "size": size,
+            "sha256": sha256,
+            **store_file(staged, path, sha256)
+        })
+    if results:
+        record_results(manifest_path, results)
+    return results
+
+
 def download_pdf(url: str, filename: str = None) -> str:
     """
     Download a PDF from the given URL.
@@ -51,56 +374,189 @@ def download_pdf(url: str, filename: str = None) -> str:
 
     # Generate filename if not provided
     if not filename:
-        date_prefix = datetime.now().strftime("%Y-%m-%d")
-        url_filename = url.split("/")[-1].split("?")[0]
-        if not url_filename.endswith(".pdf"):
-            url_filename += ".pdf"
-        filename = f"{date_prefix}_{sanitize_filename(url_filename)}"
+        filename = default_filename(url)
 
     output_path = DOWNLOAD_DIR / filename
 
-    # Download with proper headers
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/pdf,*/*",
-    }
-
     print(f"Downloading: {url}")
     print(f"Saving to: {output_path}")
 
-    try:
-        response = requests.get(url, headers=headers, timeout=TIMEOUT, stream=True)
-        response.raise_for_status()
+    result = fetch_to_file(url, output_path)
+    result["downloaded_at"] = datetime.now(timezone.utc).isoformat()
+    record_results(MANIFEST_PATH, [result])
+    if not result["success"]:
+        print(f"Error downloading: {result['error']}")
+        sys.exit(1)
 
-        # Check if it's actually a PDF
-        content_type = response.headers.get("content-type", "")
-        if "pdf" not in content_type.lower() and not url.endswith(".pdf"):
-            print(f"Warning: Content-Type is {content_type}, may not be a PDF")
+    # Check if it's actually a PDF
+    content_type = result["content_type"] or ""
+    if "pdf" not in content_type.lower() and not url.endswith(".pdf"):
+        print(f"Warning: Content-Type is {content_type}, may not be a PDF")
 
-        # Save the file
-        with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+    print(f"Downloaded successfully: {result['size']:,} bytes in {result['seconds']:.1f}s")
+    if result["duplicate"]:
+        print(f"Same content already stored ({result['store_path']}); not written again")
+    return str(output_path)
 
-        file_size = output_path.stat().st_size
-        print(f"Downloaded successfully: {file_size:,} bytes")
-        return str(output_path)
 
-    except requests.RequestException as e:
-        print(f"Error downloading: {e}")
-        sys.exit(1)
+def is_pdf_url(url: str) -> bool:
+    return urlparse(url).path.lower().endswith(".pdf")
+
+
+def pdf_links_from_items(path: Path) -> list[dict]:
+    """PDF URLs from a new_items.json (or NDJSON stream): notable_links of page changes, and items."""
+    if path.suffix in (".ndjson", ".gz"):
+        page_changes, items = [], []
+        for record in iter_records(path):
+            if record.get("record") == "page_change":
+                page_changes.append(record)
+            elif record.get("record") == "item":
+                items.append(record)
+    else:
+        data = read_json(path, default={}) or {}
+        page_changes, items = data.get("page_changes", []), data.get("items", [])
+
+    links = []
+    for change in page_changes:
+        for link in change.get("notable_links", []):
+            if is_pdf_url(link.get("url", "")):
+                links.append({"url": link["url"], "source_id": change.get("source_id"), "title": link.get("text")})
+    for item in items:
+        if is_pdf_url(item.get("url") or ""):
+            links.append({"url": item["url"], "source_id": item.get("source_id"), "title": item.get("title")})
+    return links
+
+
+def links_from_list(path: Path) -> list[dict]:
+    """Read "url [filename]" lines, ignoring blanks and # comments."""
+    links = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        parts = line.strip().split(maxsplit=1)
+        if parts and not parts[0].startswith("#"):
+            links.append({"url": parts[0], "filename": parts[1] if len(parts) > 1 else None})
+    return links
+
+
+def plan_downloads(links: list[dict], manifest: dict) -> tuple[list[dict], int]:
+    """
+    Drop duplicate URLs and ones already downloaded (per the manifest), and
+    give each remaining link a unique output file name. Returns (jobs, skipped).
+    """
+    jobs, seen_urls, used_names, skipped = [], set(), set(), 0
+    for link in links:
+        url = link["url"]
+        if url in seen_urls:
+            continue
+        seen_urls.add(url)
+
+        entry = manifest.get(url)
+        if entry and entry.get("success") and (PROJECT_ROOT / (entry.get("store_path") or entry["path"])).exists():
+            skipped += 1
+            continue
+
+        # Reuse the name of an interrupted download so its .part file is resumed
+        if entry and entry.get("path"):
+            filename = Path(entry["path"]).name
+        else:
+            filename = sanitize_filename(link["filename"]) if link.get("filename") else default_filename(url)
+        if filename in used_names:
+            stem, ext = os.path.splitext(filename)
+            filename = f"{stem}_{hashlib.sha256(url.encode()).hexdigest()[:8]}{ext}"
+        used_names.add(filename)
+        jobs.append({**link, "output_path": DOWNLOAD_DIR / filename})
+    return jobs, skipped
+
+
+def download_bulk(links: list[dict], workers: int = DEFAULT_WORKERS, per_host: int = DEFAULT_PER_HOST,
+                  manifest_path: Path = MANIFEST_PATH) -> list[dict]:
+    """Download links concurrently and record each result in the manifest."""
+    DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = (read_json(manifest_path, default={}) or {}).get("files", {})
+    jobs, skipped = plan_downloads(links, manifest)
+    print(f"{len(jobs)} to download, {skipped} already downloaded")
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(fetch_to_file, job["url"], job["output_path"], per_host): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            result = future.result()
+            result["source_id"] = job.get("source_id")
+            result["title"] = job.get("title")
+            result["downloaded_at"] = datetime.now(timezone.utc).isoformat()
+            results.append(result)
+
+            if result["success"]:
+                resumed = f", resumed at {result['resumed_bytes']:,}" if result["resumed_bytes"] else ""
+                status = "[dup]   " if result["duplicate"] else "[ok]    "
+                print(f"  {status} {result['size']:>12,} bytes {result['seconds']:>6.1f}s{resumed}  {result['url']}")
+            else:
+                print(f"  [failed] {result['url']}: {result['error']}")
+
+    if results:
+        record_results(manifest_path, results)
+    return results
 
 
 def main():
-    if len(sys.argv) < 2:
-        print(__doc__)
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Download PDFs for TMT Legal Intelligence")
+    parser.add_argument("url", nargs="?", help="PDF URL (single download)")
+    parser.add_argument("filename", nargs="?", help="Output file name in sources/downloaded/")
+    parser.add_argument("--from-items", nargs="?", const=str(DOWNLOAD_DIR / "new_items.json"),
+                        help="Download PDFs linked from new_items.json / .ndjson (default: new_items.json)")
+    parser.add_argument("--list", type=str, help="Text file with one URL (and optional file name) per line")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Bulk mode: concurrent downloads (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help=f"Bulk mode: concurrent downloads per host (default: {DEFAULT_PER_HOST})")
+    parser.add_argument("--manifest", type=str, help=f"Bulk mode: manifest path (default: {MANIFEST_PATH})")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Move PDFs already in sources/downloaded/ into the store, replacing them with links")
+    args = parser.parse_args()
+
+    manifest_path = Path(args.manifest) if args.manifest else MANIFEST_PATH
+    if args.migrate:
+        results = migrate_to_store(manifest_path)
+        duplicates = [r for r in results if r["duplicate"]]
+        print(f"Moved {len(results) - len(duplicates)} PDFs into {STORE_DIR}, "
+              f"dropped {len(duplicates)} duplicate copies ({sum(r['size'] for r in duplicates):,} bytes saved)")
+        return
+
+    if not (args.from_items or args.list):
+        if not args.url:
+            print(__doc__)
+            sys.exit(1)
+        result = download_pdf(args.url, args.filename)
+        print(f"\nFile saved: {result}")
+        return
 
-    url = sys.argv[1]
-    filename = sys.argv[2] if len(sys.argv) > 2 else None
+    links = []
+    for path, reader in ((args.from_items, pdf_links_from_items), (args.list, links_from_list)):
+        if path:
+            if not Path(path).exists():
+                print(f"Error: File not found: {path}")
+                sys.exit(1)
+            links.extend(reader(Path(path)))
+    if not links:
+        print("No PDF links found")
+        return
 
-    result = download_pdf(url, filename)
-    print(f"\nFile saved: {result}")
+    start = time.monotonic()
+    results = download_bulk(links, args.workers, args.per_host, manifest_path)
+
+    failed = [r for r in results if not r["success"]]
+    duplicates = [r for r in results if r.get("duplicate")]
+    print("-" * 40)
+    print(f"Downloaded {len(results) - len(failed)}/{len(results)} PDFs, "
+          f"{sum(r['size'] for r in results):,} bytes in {time.monotonic() - start:.1f}s")
+    print(f"Already stored: {len(duplicates)} ({sum(r['size'] for r in duplicates):,} bytes not written again)")
+    stats = (read_json(manifest_path, default={}) or {}).get("stats", {})
+    print(f"Store total: {stats.get('duplicates', 0)} duplicates, {stats.get('bytes_saved', 0):,} bytes saved")
+    print(f"Manifest: {manifest_path}")
+    for line in http_client.latency_report_lines():
+        print(line)
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
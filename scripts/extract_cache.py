@@ -0,0 +1,176 @@
+"""
+Content-Addressed Extraction Cache for TMT Legal Intelligence
+
+extract_text.py keeps extracted text here so the same PDF is never
+extracted twice, whatever it was called when download_pdf.py saved it:
+
+- Documents are keyed by the SHA-256 of the PDF bytes plus the extractor
+  (library and version), and list the fingerprints of their pages
+- Page text is keyed by a fingerprint of the page's content (its content
+  streams and fonts) plus the extractor, so a re-downloaded PDF with a few
+  changed pages only needs those pages re-extracted
+- The cache is bounded by total text size; least recently used documents
+  (and pages no remaining document uses) are evicted first
+
+Usage:
+    import extract_cache
+
+    conn = extract_cache.connect()
+    pages = extract_cache.lookup_document(conn, sha256, extractor)
+"""
+
+import hashlib
+import json
+import sqlite3
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+CACHE_PATH = PROJECT_ROOT / "sources" / "state" / "extract_cache.db"
+
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024  # Total cached page text
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def connect(db_path: Path = CACHE_PATH) -> sqlite3.Connection:
+    """Open (and create if needed) the cache DB; safe to use from several processes."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS documents (
+            sha256 TEXT,
+            extractor TEXT,
+            page_keys TEXT,
+            last_used TEXT,
+            PRIMARY KEY (sha256, extractor)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pages (
+            page_key TEXT,
+            extractor TEXT,
+            text TEXT,
+            size INTEGER,
+            PRIMARY KEY (page_key, extractor)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_last_used ON documents(last_used)")
+    conn.commit()
+    return conn
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def lookup_pages(conn: sqlite3.Connection, page_keys: list[str], extractor: str) -> dict[str, str]:
+    """Cached text for whichever of these page fingerprints are known."""
+    found = {}
+    unique = list(dict.fromkeys(page_keys))
+    for i in range(0, len(unique), 500):
+        chunk = unique[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT page_key, text FROM pages WHERE extractor = ? AND page_key IN ({placeholders})",
+            [extractor, *chunk]
+        )
+        found.update(rows)
+    return found
+
+
+def lookup_document(conn: sqlite3.Connection, sha256: str, extractor: str) -> list[str] | None:
+    """Per-page text for a known PDF (in page order), or None on a miss."""
+    row = conn.execute(
+        "SELECT page_keys FROM documents WHERE sha256 = ? AND extractor = ?", (sha256, extractor)
+    ).fetchone()
+    if not row:
+        return None
+    page_keys = json.loads(row[0])
+    texts = lookup_pages(conn, page_keys, extractor)
+    if len(texts) < len(set(page_keys)):
+        return None  # Pages evicted underneath the document
+    with conn:
+        conn.execute("UPDATE documents SET last_used = ? WHERE sha256 = ? AND extractor = ?",
+                     (_now(), sha256, extractor))
+    return [texts[key] for key in page_keys]
+
+
+def store_pages(conn: sqlite3.Connection, extractor: str, page_keys: list[str], texts: list[str]):
+    """Store page text as it is extracted (before the whole document is done)."""
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO pages (page_key, extractor, text, size) VALUES (?, ?, ?, ?)",
+            [(key, extractor, text, len(text.encode("utf-8"))) for key, text in zip(page_keys, texts)]
+        )
+
+
+def store_document(conn: sqlite3.Connection, sha256: str, extractor: str, page_keys: list[str],
+                   texts: list[str] | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+    """
+    Store a document's page list (and page text, unless already stored with
+    store_pages), then evict down to max_bytes.
+    """
+    if texts is not None:
+        store_pages(conn, extractor, page_keys, texts)
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO documents (sha256, extractor, page_keys, last_used) VALUES (?, ?, ?, ?)",
+            (sha256, extractor, json.dumps(page_keys), _now())
+        )
+    evict(conn, max_bytes)
+
+
+def cache_size(conn: sqlite3.Connection) -> int:
+    """Total bytes of cached page text."""
+    return conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+
+def evict(conn: sqlite3.Connection, max_bytes: int = DEFAULT_MAX_BYTES) -> int:
+    """
+    Drop least recently used documents until the page text fits in max_bytes.
+
+    Pages still used by a remaining document are kept; pages no document
+    uses (left by an interrupted extraction) go first. Returns documents evicted.
+    """
+    total = cache_size(conn)
+    if total <= max_bytes:
+        return 0
+
+    sizes = {(key, extractor): size for key, extractor, size in conn.execute(
+        "SELECT page_key, extractor, size FROM pages")}
+    documents = [
+        (sha256, extractor, set(json.loads(page_keys)))
+        for sha256, extractor, page_keys in conn.execute(
+            "SELECT sha256, extractor, page_keys FROM documents ORDER BY last_used")
+    ]
+    refcounts = Counter((key, extractor) for _, extractor, keys in documents for key in keys)
+
+    evicted_documents = []
+    orphan_pages = [page for page in sizes if not refcounts[page]]
+    total -= sum(sizes[page] for page in orphan_pages)
+    for sha256, extractor, keys in documents:
+        if total <= max_bytes:
+            break
+        evicted_documents.append((sha256, extractor))
+        for key in keys:
+            refcounts[(key, extractor)] -= 1
+            if refcounts[(key, extractor)] == 0:
+                orphan_pages.append((key, extractor))
+                total -= sizes.get((key, extractor), 0)
+
+    with conn:
+        conn.executemany("DELETE FROM documents WHERE sha256 = ? AND extractor = ?", evicted_documents)
+        conn.executemany("DELETE FROM pages WHERE page_key = ? AND extractor = ?", orphan_pages)
+    return len(evicted_documents)
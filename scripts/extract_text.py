@@ -4,11 +4,29 @@ PDF Text Extraction Helper for TMT Legal Intelligence System
 
 Usage:
     python scripts/extract_text.py <pdf_path> [output_path]
+    python scripts/extract_text.py <pdf_path> --workers=4       # Split pages across 4 processes
+    python scripts/extract_text.py <directory or glob> [output_dir] --workers=4  # Batch mode
 
 Example:
     python scripts/extract_text.py sources/downloaded/2025-01-12_MeitY_AI-Framework.pdf
+    python scripts/extract_text.py sources/downloaded/2025-01-12_TRAI-Consultation.pdf --workers=8
+    python scripts/extract_text.py "sources/downloaded/*.pdf" --workers=4
+    python scripts/extract_text.py sources/downloaded/2025-01-12_Gazette.pdf --stream
+    python scripts/extract_text.py sources/downloaded/2025-01-12_Gazette.pdf --resume
 
 If output_path is not provided, text will be saved alongside the PDF with .txt extension.
+In batch mode, PDFs are spread across the worker processes and each file's
+timing is reported.
+
+Extracted text is cached per page in sources/state/extract_cache.db, keyed by
+the PDF's SHA-256 and page content, so re-running on the same document (under
+any file name) is near-instant and a re-downloaded PDF only re-extracts the
+pages that changed. Use --no-cache to bypass it.
+
+With --stream, each page is written to the output as soon as it is extracted
+and progress is reported. If extraction fails partway, the pages written so
+far are kept and a resume point is saved next to the output
+(<output>.resume.json); re-run with --resume to continue from there.
 
 Requirements:
     pip install pdfplumber
@@ -17,20 +35,34 @@ Requirements:
     pip install PyPDF2
 """
 
+import argparse
+import glob
+import hashlib
 import sys
 import os
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Iterator
+
+import extract_cache
+from state_io import atomic_write_json, read_json
 
 # Try different PDF libraries
 PDF_LIBRARY = None
 
 try:
     import pdfplumber
+    from pdfminer.pdftypes import PDFStream, resolve1, resolve_all, stream_value
     PDF_LIBRARY = "pdfplumber"
+    EXTRACTOR = f"pdfplumber-{pdfplumber.__version__}"
 except ImportError:
     try:
         import PyPDF2
         PDF_LIBRARY = "pypdf2"
+        EXTRACTOR = f"pypdf2-{PyPDF2.__version__}"
     except ImportError:
         print("Error: No PDF library found.")
         print("Please install one of:")
@@ -38,40 +70,340 @@ except ImportError:
         print("  pip install PyPDF2")
         sys.exit(1)
 
+# Page batches handed to each worker: small enough to balance uneven pages,
+# large enough that reopening the PDF per batch stays cheap
+MIN_PAGES_PER_TASK = 4
+TASKS_PER_WORKER = 3
+
+# Streaming mode: pages between progress lines and resume checkpoints
+CHECKPOINT_EVERY = 10
+NO_TEXT_PLACEHOLDER = "[No text extracted - PDF may be scanned/image-based]"
+
+
+def format_pages(pages) -> str:
+    """Join (page_number, text) pairs in the "--- Page i ---" format, skipping empty pages."""
+    return "\n\n".join(f"--- Page {i} ---\n{text}" for i, text in pages if text)
 
-def extract_with_pdfplumber(pdf_path: Path) -> str:
-    """Extract text using pdfplumber (better for complex PDFs)."""
-    text_parts = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for i, page in enumerate(pdf.pages, 1):
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(f"--- Page {i} ---\n{page_text}")
-    return "\n\n".join(text_parts)
 
+def count_words(text: str) -> int:
+    """Words in a page's text. Both modes count this way, so "--- Page i ---" headers never count."""
+    return len(text.split())
 
-def extract_with_pypdf2(pdf_path: Path) -> str:
-    """Extract text using PyPDF2 (fallback)."""
-    text_parts = []
+
+def count_pages(pdf_path: Path) -> int:
+    """Number of pages in the PDF."""
+    if PDF_LIBRARY == "pdfplumber":
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
     with open(pdf_path, "rb") as f:
-        reader = PyPDF2.PdfReader(f)
-        for i, page in enumerate(reader.pages, 1):
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(f"--- Page {i} ---\n{page_text}")
-    return "\n\n".join(text_parts)
+        return len(PyPDF2.PdfReader(f).pages)
+
+
+def page_fingerprints(pdf_path: Path) -> list[str]:
+    """
+    One hash per page of what its text is drawn from: the content streams,
+    Form XObjects and fonts (name, encoding and ToUnicode map, which decide
+    what characters the glyph codes become). Much cheaper than extracting the text.
+    """
+    fingerprints = []
+    if PDF_LIBRARY == "pdfplumber":
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                page_obj = page.page_obj
+                digest = hashlib.sha256()
+                for stream in page_obj.contents:
+                    digest.update(stream_value(stream).get_data())
+                resources = resolve1(page_obj.resources) or {}
+                for name, font in sorted((resolve1(resources.get("Font")) or {}).items()):
+                    font = resolve1(font)
+                    digest.update(f"{name}={font.get('BaseFont')}".encode())
+                    for key in ("Encoding", "ToUnicode"):
+                        value = resolve1(font.get(key))
+                        if isinstance(value, PDFStream):
+                            digest.update(value.get_data())
+                        elif value is not None:
+                            digest.update(repr(resolve_all(value)).encode())
+                for name, xobject in sorted((resolve1(resources.get("XObject")) or {}).items()):
+                    xobject = stream_value(xobject)
+                    if str(xobject.get("Subtype")).endswith("Form"):
+                        digest.update(name.encode() + xobject.get_data())
+                fingerprints.append(digest.hexdigest())
+    else:
+        with open(pdf_path, "rb") as f:
+            for page in PyPDF2.PdfReader(f).pages:
+                digest = hashlib.sha256()
+                contents = page.get_contents()
+                if contents is not None:
+                    digest.update(contents.get_data())
+                resources = page.get("/Resources") or {}
+                for name, font in sorted((resources.get("/Font") or {}).items()):
+                    font = font.get_object()
+                    digest.update(f"{name}={font.get('/BaseFont')}".encode())
+                    for key in ("/Encoding", "/ToUnicode"):
+                        value = font.get(key)
+                        value = value.get_object() if value is not None else None
+                        if isinstance(value, PyPDF2.generic.StreamObject):
+                            digest.update(value.get_data())
+                        elif value is not None:
+                            digest.update(repr(value).encode())
+                for name, xobject in sorted((resources.get("/XObject") or {}).items()):
+                    xobject = xobject.get_object()
+                    if xobject.get("/Subtype") == "/Form":
+                        digest.update(name.encode() + xobject.get_data())
+                fingerprints.append(digest.hexdigest())
+    return fingerprints
+
+
+def iter_pages(pdf_path: str, indices: list[int]) -> Iterator[tuple[int, str]]:
+    """Yield (page_number, text) for the given pages (0-based indices), one page at a time."""
+    if PDF_LIBRARY == "pdfplumber":
+        with pdfplumber.open(pdf_path) as pdf:
+            for i in indices:
+                page = pdf.pages[i]
+                text = page.extract_text() or ""
+                page.close()  # Drop the page's cached layout before the next one
+                yield i + 1, text
+    else:
+        with open(pdf_path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            for i in indices:
+                yield i + 1, reader.pages[i].extract_text() or ""
+
+
+def extract_pages(pdf_path: str, indices: list[int]) -> list[tuple[int, str]]:
+    """
+    Extract the given pages (0-based indices) as (page_number, text) pairs.
+
+    Opens the PDF itself, so it can run in a worker process.
+    """
+    return list(iter_pages(pdf_path, indices))
+
+
+def page_batches(indices: list[int], workers: int) -> list[list[int]]:
+    """Split page indices into contiguous batches for the pool."""
+    size = max(MIN_PAGES_PER_TASK, -(-len(indices) // (workers * TASKS_PER_WORKER)))
+    return [indices[i:i + size] for i in range(0, len(indices), size)]
+
+
+def iter_page_texts(pdf_path: Path, indices: list[int], workers: int = 1) -> Iterator[tuple[int, str]]:
+    """
+    Yield pages in page order, extracted across a process pool if workers > 1.
+
+    At most workers * 2 batches are in flight at a time, so memory stays
+    bounded however long the document is.
+    """
+    indices = sorted(indices)
+    batches = page_batches(indices, workers)
+    if workers <= 1 or len(batches) <= 1:
+        yield from iter_pages(str(pdf_path), indices)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+        remaining = iter(batches)
+        in_flight = deque()
+        for batch in remaining:
+            in_flight.append(executor.submit(extract_pages, str(pdf_path), batch))
+            if len(in_flight) >= workers * 2:
+                break
+        while in_flight:
+            pages = in_flight.popleft().result()
+            batch = next(remaining, None)
+            if batch is not None:
+                in_flight.append(executor.submit(extract_pages, str(pdf_path), batch))
+            yield from pages
+
+
+def extract_pdf(pdf_path: Path, workers: int = 1, use_cache: bool = True,
+                max_cache_bytes: int = extract_cache.DEFAULT_MAX_BYTES) -> tuple[str, dict]:
+    """
+    Extract text with the available library, reusing cached pages where possible.
+
+    Returns the text and a cache report: {"cache": "hit" | "partial" | "miss" | "off",
+    "pages": total pages, "extracted": pages actually extracted, "words": words in the pages}.
+    """
+    if not use_cache:
+        page_count = count_pages(pdf_path)
+        pages = list(iter_page_texts(pdf_path, range(page_count), workers))
+        return format_pages(pages), {"cache": "off", "pages": page_count, "extracted": page_count,
+                                     "words": sum(count_words(text) for _, text in pages)}
+
+    conn = extract_cache.connect()
+    try:
+        sha256 = extract_cache.file_sha256(pdf_path)
+        texts = extract_cache.lookup_document(conn, sha256, EXTRACTOR)
+        if texts is not None:
+            return format_pages(enumerate(texts, 1)), {"cache": "hit", "pages": len(texts), "extracted": 0,
+                                                       "words": sum(map(count_words, texts))}
+
+        # Unknown file: reuse any pages already extracted from other versions of it
+        page_keys = page_fingerprints(pdf_path)
+        cached = extract_cache.lookup_pages(conn, page_keys, EXTRACTOR)
+        missing = [i for i, key in enumerate(page_keys) if key not in cached]
+        extracted = dict(iter_page_texts(pdf_path, missing, workers))
+        texts = [cached[key] if key in cached else extracted[i + 1] for i, key in enumerate(page_keys)]
+
+        extract_cache.store_document(conn, sha256, EXTRACTOR, page_keys, texts, max_cache_bytes)
+    finally:
+        conn.close()
+
+    status = "miss" if len(missing) == len(page_keys) else "partial"
+    return format_pages(enumerate(texts, 1)), {"cache": status, "pages": len(page_keys), "extracted": len(missing),
+                                               "words": sum(map(count_words, texts))}
+
+
+def resume_path(output_path: Path) -> Path:
+    """Where streaming mode keeps the resume point for an output file."""
+    return output_path.with_name(output_path.name + ".resume.json")
+
 
+def iter_document(pdf_path: Path, start: int, workers: int, conn, sha256: str,
+                  report: dict) -> Iterator[tuple[int, str, str | None]]:
+    """
+    Yield (page_number, text, page_key) from page index `start` on, taking
+    pages from the cache where possible. page_key is set only for pages that
+    were newly extracted (and should be cached).
+    """
+    texts = extract_cache.lookup_document(conn, sha256, EXTRACTOR) if conn else None
+    if texts is not None:
+        report.update(cache="hit", pages=len(texts))
+        for i in range(start, len(texts)):
+            yield i + 1, texts[i], None
+        return
+
+    if conn is None:
+        report["pages"] = count_pages(pdf_path)
+        for number, text in iter_page_texts(pdf_path, range(start, report["pages"]), workers):
+            report["extracted"] += 1
+            yield number, text, None
+        return
+
+    page_keys = page_fingerprints(pdf_path)
+    report["pages"] = len(page_keys)
+    report["page_keys"] = page_keys
+    cached = extract_cache.lookup_pages(conn, page_keys[start:], EXTRACTOR)
+    missing = [i for i in range(start, len(page_keys)) if page_keys[i] not in cached]
+    report["cache"] = "miss" if len(missing) == len(page_keys) else "partial"
+
+    extracted = iter_page_texts(pdf_path, missing, workers)
+    for i in range(start, len(page_keys)):
+        if page_keys[i] in cached:
+            yield i + 1, cached[page_keys[i]], None
+        else:
+            _, text = next(extracted)
+            report["extracted"] += 1
+            yield i + 1, text, page_keys[i]
 
-def extract_text(pdf_path: str, output_path: str = None) -> str:
+
+def extract_streaming(pdf_path: Path, output_path: Path, workers: int = 1, use_cache: bool = True,
+                      max_cache_bytes: int = extract_cache.DEFAULT_MAX_BYTES, resume: bool = False,
+                      progress: bool = True) -> dict:
+    """
+    Extract a PDF writing each page to output_path as soon as it is ready.
+
+    Every CHECKPOINT_EVERY pages the output is flushed and a resume point
+    (next page and output size) is saved. A failure keeps the pages written
+    so far and the resume point; resume=True continues from it.
+
+    Returns a report: complete, pages, next_page, words, extracted, cache, error.
+    """
+    sha256 = extract_cache.file_sha256(pdf_path)
+    checkpoint_file = resume_path(output_path)
+    report = {"complete": False, "pages": 0, "next_page": 1, "words": 0, "extracted": 0,
+              "cache": "miss" if use_cache else "off", "error": None}
+
+    state = read_json(checkpoint_file) if resume else None
+    if state and (state.get("sha256") != sha256 or not output_path.exists()):
+        print(f"Resume point does not match {pdf_path}; starting from page 1")
+        state = None
+    if state:
+        report["next_page"] = state["next_page"]
+        print(f"Resuming at page {state['next_page']}")
+    wrote_any = bool(state and state.get("wrote_any"))
+
+    conn = extract_cache.connect() if use_cache else None
+    start = time.monotonic()
+    pending_keys, pending_texts = [], []
+
+    def checkpoint():
+        f.flush()
+        os.fsync(f.fileno())
+        if conn and pending_keys:
+            extract_cache.store_pages(conn, EXTRACTOR, pending_keys, pending_texts)
+            pending_keys.clear()
+            pending_texts.clear()
+        atomic_write_json(checkpoint_file, {
+            "pdf": str(pdf_path),
+            "sha256": sha256,
+            "next_page": report["next_page"],
+            "offset": f.tell(),
+            "wrote_any": wrote_any,
+            "pages": report["pages"]
+        })
+
+    with open(output_path, "r+" if state else "w", encoding="utf-8") as f:
+        if state:
+            f.seek(state["offset"])
+            f.truncate()
+        try:
+            pages = iter_document(pdf_path, report["next_page"] - 1, workers, conn, sha256, report)
+            for number, text, page_key in pages:
+                if text:
+                    if wrote_any:
+                        f.write("\n\n")
+                    f.write(f"--- Page {number} ---\n{text}")
+                    wrote_any = True
+                    report["words"] += count_words(text)
+                if page_key:
+                    pending_keys.append(page_key)
+                    pending_texts.append(text)
+                report["next_page"] = number + 1
+
+                if number % CHECKPOINT_EVERY == 0:
+                    checkpoint()
+                    if progress:
+                        print(f"  Page {number}/{report['pages']} "
+                              f"({100 * number // max(1, report['pages'])}%), {time.monotonic() - start:.1f}s")
+
+            if not wrote_any:
+                f.write(NO_TEXT_PLACEHOLDER)
+            f.flush()
+            if conn:
+                if pending_keys:
+                    extract_cache.store_pages(conn, EXTRACTOR, pending_keys, pending_texts)
+                if report.get("page_keys"):
+                    extract_cache.store_document(conn, sha256, EXTRACTOR, report["page_keys"],
+                                                 max_bytes=max_cache_bytes)
+            checkpoint_file.unlink(missing_ok=True)
+            report["complete"] = True
+        except Exception as e:
+            report["error"] = str(e)
+            checkpoint()
+        finally:
+            report.pop("page_keys", None)
+            if conn:
+                conn.close()
+
+    return report
+
+
+def extract_text(pdf_path: str, output_path: str = None, workers: int = 1, use_cache: bool = True,
+                 max_cache_bytes: int = extract_cache.DEFAULT_MAX_BYTES, stream: bool = False,
+                 resume: bool = False) -> str:
     """
     Extract text from a PDF file.
 
     Args:
         pdf_path: Path to the PDF file
         output_path: Optional path for output. If not provided, uses same name with .txt
+        workers: Number of processes to split the pages across (1 = no pool)
+        use_cache: Reuse (and store) text in the extraction cache
+        max_cache_bytes: Size bound for the extraction cache
+        stream: Write pages as they are extracted; on failure keep the partial
+            output and a resume point instead of exiting
+        resume: Continue a failed streaming extraction from its resume point
 
     Returns:
-        Path to the extracted text file
+        Path to the extracted text file (partial if a streaming extraction failed)
     """
     pdf_path = Path(pdf_path)
 
@@ -89,13 +421,25 @@ def extract_text(pdf_path: str, output_path: str = None) -> str:
         output_path = pdf_path.with_suffix(".txt")
 
     print(f"Extracting text from: {pdf_path}")
-    print(f"Using library: {PDF_LIBRARY}")
+    print(f"Using library: {PDF_LIBRARY}" + (f" ({workers} workers)" if workers > 1 else ""))
+
+    start = time.monotonic()
+    if stream or resume:
+        report = extract_streaming(pdf_path, output_path, workers, use_cache, max_cache_bytes, resume)
+        if not report["complete"]:
+            print(f"Error extracting text at page {report['next_page']}: {report['error']}")
+            print(f"Partial output ({report['next_page'] - 1} of {report['pages']} pages) kept in: {output_path}")
+            print(f"Resume with: python scripts/extract_text.py {pdf_path} {output_path} --resume")
+            return str(output_path)
+        if not report["words"] and not resume:
+            print("Warning: No text extracted. PDF may be image-based (scanned).")
+        print(f"Extracted {report['words']:,} words in {time.monotonic() - start:.1f}s "
+              f"(cache: {report['cache']}, {report['extracted']}/{report['pages']} pages extracted)")
+        print(f"Saved to: {output_path}")
+        return str(output_path)
 
     try:
-        if PDF_LIBRARY == "pdfplumber":
-            text = extract_with_pdfplumber(pdf_path)
-        else:
-            text = extract_with_pypdf2(pdf_path)
+        text, cache_report = extract_pdf(pdf_path, workers, use_cache, max_cache_bytes)
     except Exception as e:
         print(f"Error extracting text: {e}")
         sys.exit(1)
@@ -103,29 +447,149 @@ def extract_text(pdf_path: str, output_path: str = None) -> str:
     if not text.strip():
         print("Warning: No text extracted. PDF may be image-based (scanned).")
         print("Consider using OCR tools like pytesseract for scanned documents.")
-        text = "[No text extracted - PDF may be scanned/image-based]"
+        text = NO_TEXT_PLACEHOLDER
 
     # Save the text
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(text)
 
-    word_count = len(text.split())
-    print(f"Extracted {word_count:,} words")
+    word_count = cache_report["words"]
+    print(f"Extracted {word_count:,} words in {time.monotonic() - start:.1f}s "
+          f"(cache: {cache_report['cache']}, {cache_report['extracted']}/{cache_report['pages']} pages extracted)")
     print(f"Saved to: {output_path}")
 
     return str(output_path)
 
 
+def extract_file(pdf_path: str, output_path: str, use_cache: bool = True,
+                 max_cache_bytes: int = extract_cache.DEFAULT_MAX_BYTES, stream: bool = False,
+                 resume: bool = False) -> dict:
+    """Extract one PDF in a worker process (batch mode) and report words and timing."""
+    result = {"pdf": pdf_path, "output": output_path, "success": False, "words": 0, "seconds": 0.0}
+    start = time.monotonic()
+    if stream or resume:
+        report = extract_streaming(Path(pdf_path), Path(output_path), use_cache=use_cache,
+                                   max_cache_bytes=max_cache_bytes, resume=resume, progress=False)
+        result.update(success=report["complete"], words=report["words"], cache=report["cache"])
+        if not report["complete"]:
+            result["error"] = f"page {report['next_page']}: {report['error']} (partial output kept, use --resume)"
+        result["seconds"] = round(time.monotonic() - start, 2)
+        return result
+
+    try:
+        text, cache_report = extract_pdf(Path(pdf_path), use_cache=use_cache, max_cache_bytes=max_cache_bytes)
+        result["cache"] = cache_report["cache"]
+        if not text.strip():
+            result["warning"] = "No text extracted - PDF may be scanned/image-based"
+            text = NO_TEXT_PLACEHOLDER
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        result["words"] = cache_report["words"]
+        result["success"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = round(time.monotonic() - start, 2)
+    return result
+
+
+def find_pdfs(pattern: str) -> list[Path]:
+    """PDFs in a directory, or matching a glob pattern."""
+    path = Path(pattern)
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if p.suffix.lower() == ".pdf")
+    return sorted(Path(p) for p in glob.glob(pattern, recursive=True) if p.lower().endswith(".pdf"))
+
+
+def extract_batch(pdf_paths: list[Path], output_dir: Path = None, workers: int = 1, use_cache: bool = True,
+                  max_cache_bytes: int = extract_cache.DEFAULT_MAX_BYTES, stream: bool = False,
+                  resume: bool = False) -> list[dict]:
+    """
+    Extract many PDFs, spreading whole files across a process pool.
+
+    Largest files are submitted first so one big gazette does not finish
+    last on an otherwise idle pool. Identical PDFs (the same stored download
+    under several names, or plain copies) are extracted once and the text is
+    copied to the others. Text is saved next to each PDF, or in output_dir if given.
+    """
+    if output_dir:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    def output_for(pdf: Path) -> str:
+        return str((output_dir / pdf.name).with_suffix(".txt") if output_dir else pdf.with_suffix(".txt"))
+
+    copies: dict[str, list[Path]] = {}
+    for pdf in sorted(pdf_paths, key=lambda p: p.stat().st_size, reverse=True):
+        copies.setdefault(extract_cache.file_sha256(pdf), []).append(pdf)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(extract_file, str(pdfs[0]), output_for(pdfs[0]),
+                            use_cache, max_cache_bytes, stream, resume): pdfs
+            for pdfs in copies.values()
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result["success"]:
+                print(f"  {result['seconds']:>7.2f}s  {result['words']:>9,} words  "
+                      f"[{result['cache']:<7}]  {result['pdf']}")
+            else:
+                print(f"  {result['seconds']:>7.2f}s  FAILED                      {result['pdf']}: {result['error']}")
+                continue
+
+            for duplicate in futures[future][1:]:
+                shutil.copyfile(result["output"], output_for(duplicate))
+                results.append({**result, "pdf": str(duplicate), "output": output_for(duplicate),
+                                "seconds": 0.0, "cache": "dup", "duplicate_of": result["pdf"]})
+                print(f"  {0:>7.2f}s  {result['words']:>9,} words  [dup    ]  {duplicate}")
+    return results
+
+
 def main():
-    if len(sys.argv) < 2:
-        print(__doc__)
+    parser = argparse.ArgumentParser(description="Extract text from PDFs")
+    parser.add_argument("pdf_path", help="PDF file, directory of PDFs, or glob pattern (quote it)")
+    parser.add_argument("output_path", nargs="?", help="Output .txt file (or output directory in batch mode)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes to use: pages of one PDF, or files in batch mode (default: 1)")
+    parser.add_argument("--no-cache", action="store_true", help="Always extract; do not read or write the cache")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write each page as it is extracted, with progress and a resume point on failure")
+    parser.add_argument("--resume", action="store_true", help="Continue a failed --stream extraction")
+    parser.add_argument("--cache-max-mb", type=int, default=extract_cache.DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Evict least recently used documents above this much cached text "
+                             f"(default: {extract_cache.DEFAULT_MAX_BYTES // (1024 * 1024)})")
+    args = parser.parse_args()
+
+    max_cache_bytes = args.cache_max_mb * 1024 * 1024
+    is_batch = Path(args.pdf_path).is_dir() or glob.has_magic(args.pdf_path)
+    if not is_batch:
+        result = extract_text(args.pdf_path, args.output_path, workers=args.workers,
+                              use_cache=not args.no_cache, max_cache_bytes=max_cache_bytes,
+                              stream=args.stream, resume=args.resume)
+        if (args.stream or args.resume) and resume_path(Path(result)).exists():
+            sys.exit(1)
+        print(f"\nText file saved: {result}")
+        return
+
+    pdf_paths = find_pdfs(args.pdf_path)
+    if not pdf_paths:
+        print(f"Error: No PDFs found for: {args.pdf_path}")
         sys.exit(1)
 
-    pdf_path = sys.argv[1]
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    print(f"Extracting {len(pdf_paths)} PDFs with {args.workers} workers (library: {PDF_LIBRARY})")
+    start = time.monotonic()
+    results = extract_batch(pdf_paths, Path(args.output_path) if args.output_path else None, args.workers,
+                            use_cache=not args.no_cache, max_cache_bytes=max_cache_bytes,
+                            stream=args.stream, resume=args.resume)
 
-    result = extract_text(pdf_path, output_path)
-    print(f"\nText file saved: {result}")
+    failed = [r for r in results if not r["success"]]
+    print("-" * 40)
+    print(f"Extracted {len(results) - len(failed)}/{len(results)} PDFs, "
+          f"{sum(r['words'] for r in results):,} words in {time.monotonic() - start:.1f}s "
+          f"(sum of per-file time: {sum(r['seconds'] for r in results):.1f}s)")
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
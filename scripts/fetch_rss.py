@@ -9,41 +9,68 @@ Usage:
     python fetch_rss.py --tier=1              # Fetch Tier 1 RSS sources
     python fetch_rss.py --tier=1 --dry-run    # Preview without saving
     python fetch_rss.py --all                 # Fetch all tiers with RSS
+    python fetch_rss.py --all --engine=async  # Concurrent fetch with per-host limits
+    python fetch_rss.py --all --format=ndjson # Stream items to new_items.ndjson as they arrive
+    python fetch_rss.py --tier=2 --merge      # Add to new_items.json (tiers run as parallel processes)
+    python fetch_rss.py --all --due-only      # Only sources due per check_frequency and observed cadence
+    python fetch_rss.py --all --due-only --dry-run  # Report which sources would be fetched
+    python fetch_rss.py --all --near-dup-days=7     # Fold stories already covered in the last week
+    python fetch_rss.py --all --no-near-dup         # Keep every outlet's copy of a story
+
+Links are canonicalized before dedup (see url_canon.py): seen_items is keyed
+on the canonical URL, so tracking parameters, http/https, www, AMP variants
+and trailing slashes no longer make an old article look new.
 """
 
 import argparse
+import asyncio
 import hashlib
 import json
 import logging
-import os
 import sqlite3
 import sys
 import time
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+from urllib.parse import urlparse
 
 try:
     import feedparser
-    import requests
 except ImportError:
-    print("Error: Required packages not installed. Run: pip install feedparser requests")
+    print("Error: Required packages not installed. Run: pip install feedparser")
     sys.exit(1)
 
-# Request settings
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) TMT-Legal-Intelligence/1.0",
-    "Accept": "application/rss+xml, application/xml, text/xml, */*"
-}
+import http_client
+import near_dup
+import scheduler
+import source_registry
+import url_canon
+from item_stream import NDJSONWriter, merge_run_summary
+from keyword_matcher import FocusAreaTagger, compile_keywords, load_focus_area_keywords
+from state_io import atomic_write_json, file_lock, update_json
+
+# Request settings (shared User-Agent, pooling and retries live in http_client)
+HEADERS = http_client.FEED_HEADERS
 REQUEST_TIMEOUT = 30
 
+# Max URLs per "IN (...)" lookup (kept under SQLite's variable limit)
+SQL_CHUNK_SIZE = 500
+
+# Async engine limits
+ASYNC_MAX_CONCURRENCY = 20  # Fetches in flight across all hosts
+ASYNC_PER_HOST_LIMIT = 2    # Fetches in flight against a single host
+
 # Setup paths
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 SOURCES_CONFIG_DIR = PROJECT_ROOT / "sources" / "config"
 STATE_DIR = PROJECT_ROOT / "sources" / "state"
 OUTPUT_DIR = PROJECT_ROOT / "sources" / "downloaded"
+FOCUS_KEYWORDS_FILE = SOURCES_CONFIG_DIR / "focus-area-keywords.json"
 
 # Ensure directories exist
 STATE_DIR.mkdir(parents=True, exist_ok=True)
@@ -51,6 +78,7 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 # Database path
 DB_PATH = STATE_DIR / "seen_items.db"
+DB_TIMEOUT = 60  # seconds to wait for a lock held by another process
 
 # Logging setup
 logging.basicConfig(
@@ -63,7 +91,10 @@ logger = logging.getLogger(__name__)
 
 def init_database() -> sqlite3.Connection:
     """Initialize SQLite database for tracking seen items."""
-    conn = sqlite3.connect(DB_PATH)
+    # Wait for other processes (e.g. another tier) instead of failing on a locked DB
+    conn = sqlite3.connect(DB_PATH, timeout=DB_TIMEOUT)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
     conn.execute("""
         CREATE TABLE IF NOT EXISTS seen_items (
             url TEXT PRIMARY KEY,
@@ -80,7 +111,25 @@ def init_database() -> sqlite3.Connection:
     conn.execute("""
         CREATE INDEX IF NOT EXISTS idx_first_seen ON seen_items(first_seen)
     """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS feed_validators (
+            source_id TEXT PRIMARY KEY,
+            url TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            body_hash TEXT,
+            checked_at TEXT
+        )
+    """)
+    url_canon.init_raw_links_table(conn)
     conn.commit()
+
+    # Rows stored before links were canonicalized are rewritten once
+    migration = url_canon.migrate_seen_items(conn, get_url_rules())
+    if migration:
+        stats = migration["seen_items"]
+        logger.info(f"Canonicalized seen_items URLs: {stats['rewritten']} keys rewritten, "
+                    f"{stats['merged']} duplicates merged")
     return conn
 
 
@@ -89,46 +138,67 @@ def content_hash(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
 
 
-def load_source_configs(tiers: list[int]) -> list[dict]:
-    """Load source configurations for specified tiers."""
-    tier_dirs = {
-        1: "tier1-critical",
-        2: "tier2-high",
-        3: "tier3-standard",
-        4: "tier4-regular",
-        5: "tier5-periodic"
+def load_feed_validators(conn: sqlite3.Connection) -> dict[str, dict]:
+    """Load stored HTTP validators (ETag / Last-Modified / body hash) per source."""
+    cursor = conn.execute("SELECT source_id, url, etag, last_modified, body_hash FROM feed_validators")
+    return {
+        row[0]: {"url": row[1], "etag": row[2], "last_modified": row[3], "body_hash": row[4]}
+        for row in cursor.fetchall()
     }
 
-    sources = []
-    for tier in tiers:
-        tier_dir = SOURCES_CONFIG_DIR / tier_dirs.get(tier, "")
-        if not tier_dir.exists():
-            logger.warning(f"Tier {tier} directory not found: {tier_dir}")
-            continue
-
-        for config_file in tier_dir.glob("*.json"):
-            try:
-                with open(config_file) as f:
-                    config = json.load(f)
-                    # Filter for RSS sources only
-                    rss_sources = [
-                        s for s in config.get("sources", [])
-                        if s.get("method") == "rss" and s.get("enabled", True)
-                    ]
-                    for source in rss_sources:
-                        source["tier"] = tier
-                    sources.extend(rss_sources)
-            except (json.JSONDecodeError, KeyError) as e:
-                logger.error(f"Error loading {config_file}: {e}")
-
-    return sources
-
-
-def fetch_single_feed(source: dict) -> dict[str, Any]:
-    """Fetch a single RSS feed and return parsed items."""
+
+def save_feed_validators(conn: sqlite3.Connection, results: list[dict]):
+    """Store validators from successful fetches for the next conditional GET (caller commits)."""
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [
+        (r["source_id"], r["url"], r.get("etag"), r.get("last_modified"), r.get("body_hash"), now)
+        for r in results
+        if r["success"] and r.get("body_hash")
+    ]
+    conn.executemany("""
+        INSERT OR REPLACE INTO feed_validators (source_id, url, etag, last_modified, body_hash, checked_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+
+
+@lru_cache(maxsize=1)
+def get_focus_tagger() -> FocusAreaTagger:
+    """Focus-area tagger compiled once per run from focus-area-keywords.json."""
+    return FocusAreaTagger(load_focus_area_keywords(FOCUS_KEYWORDS_FILE))
+
+
+@lru_cache(maxsize=1)
+def get_url_rules() -> dict[str, dict]:
+    """Per-host url_rules from the source configs, loaded once per run."""
+    return url_canon.host_rules()
+
+
+def load_source_configs(tiers: list[int]) -> list[dict]:
+    """Enabled RSS sources for the specified tiers, from the shared source registry."""
+    registry = source_registry.load()
+    registry.log_problems(logger)
+    return registry.select(tiers=tiers, methods=["rss"])
+
+
+def fetch_single_feed(source: dict, validators: dict | None = None) -> dict[str, Any]:
+    """
+    Fetch a single RSS feed and return parsed items.
+
+    If validators from a previous run are given (etag, last_modified, body_hash),
+    a conditional GET is sent and parsing is skipped when the feed is unchanged.
+    """
     source_id = source.get("id", "unknown")
     rss_url = source.get("rss", source.get("url"))
-    filter_keywords = source.get("filter_keywords", [])
+    # Compiled once per distinct keyword list; "keywords" only tag, never filter
+    filter_matcher = compile_keywords(source.get("filter_keywords", []))
+    tag_matcher = compile_keywords(source.get("keywords", []))
+    focus_tagger = get_focus_tagger()
+    url_rules = get_url_rules()
+
+    # Ignore validators stored for a different feed URL
+    if validators and validators.get("url") != rss_url:
+        validators = None
+    validators = validators or {}
 
     result = {
         "source_id": source_id,
@@ -136,16 +206,47 @@ def fetch_single_feed(source: dict) -> dict[str, Any]:
         "url": rss_url,
         "success": False,
         "items": [],
-        "error": None
+        "error": None,
+        "not_modified": None,  # "http_304" or "body_hash" when unchanged
+        "etag": validators.get("etag"),
+        "last_modified": validators.get("last_modified"),
+        "body_hash": validators.get("body_hash"),
+        "bytes_received": 0,
+        "raw_links": []  # Each item's link as published, for the canonical_duplicates stat
     }
 
+    headers = dict(HEADERS)
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
     try:
         logger.info(f"Fetching: {source_id} ({rss_url})")
 
         # Use requests library for better SSL handling (especially on macOS)
-        response = requests.get(rss_url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+        response = http_client.get(rss_url, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
 
+        if response.status_code == 304:
+            result["success"] = True
+            result["not_modified"] = "http_304"
+            logger.info(f"  Not modified (304): {source_id}")
+            return result
+
+        result["bytes_received"] = len(response.content)
+        result["etag"] = response.headers.get("ETag")
+        result["last_modified"] = response.headers.get("Last-Modified")
+        body_hash = hashlib.sha256(response.content).hexdigest()
+
+        # Server ignored the validators but sent the same bytes
+        if body_hash == validators.get("body_hash"):
+            result["success"] = True
+            result["not_modified"] = "body_hash"
+            logger.info(f"  Not modified (same content): {source_id}")
+            return result
+        result["body_hash"] = body_hash
+
         # Parse the fetched content with feedparser
         feed = feedparser.parse(response.content)
 
@@ -155,15 +256,20 @@ def fetch_single_feed(source: dict) -> dict[str, Any]:
 
         for entry in feed.entries:
             title = entry.get("title", "")
-            link = entry.get("link", "")
+            # Feedburner keeps the publisher's link in origLink
+            raw_link = entry.get("feedburner_origlink") or entry.get("link", "")
+            link = url_canon.resolve_redirect(raw_link, url_rules)
+            canonical_url = url_canon.canonicalize(link, url_rules)
             summary = entry.get("summary", entry.get("description", ""))
             published = entry.get("published", entry.get("updated", ""))
 
-            # Apply keyword filter if specified
-            if filter_keywords:
-                text_to_search = f"{title} {summary}".lower()
-                if not any(kw.lower() in text_to_search for kw in filter_keywords):
-                    continue
+            # Apply keyword filter if specified, keeping what matched
+            text_to_search = f"{title} {summary}".lower()
+            matched_keywords = filter_matcher.find_lowered(text_to_search)
+            if filter_matcher and not matched_keywords:
+                continue
+            matched_keywords |= tag_matcher.find_lowered(text_to_search)
+            matched_areas = focus_tagger.tag_lowered(text_to_search)
 
             # Clean up summary (remove HTML, truncate)
             if summary:
@@ -172,12 +278,16 @@ def fetch_single_feed(source: dict) -> dict[str, Any]:
                 summary = re.sub(r"<[^>]+>", "", summary)
                 summary = summary[:300] + "..." if len(summary) > 300 else summary
 
+            result["raw_links"].append(raw_link)
             result["items"].append({
                 "title": title,
-                "url": link,
+                "url": url_canon.clean_url(link, url_rules),
+                "canonical_url": canonical_url,
                 "published": published,
                 "snippet": summary,
-                "focus_areas": source.get("focus_areas", [])
+                "focus_areas": source.get("focus_areas", []),
+                "matched_keywords": sorted(matched_keywords, key=str.lower),
+                "matched_focus_areas": matched_areas
             })
 
         result["success"] = True
@@ -190,53 +300,76 @@ def fetch_single_feed(source: dict) -> dict[str, Any]:
     return result
 
 
-def filter_new_items(conn: sqlite3.Connection, items: list[dict], source_id: str) -> list[dict]:
-    """Filter out items that have already been seen."""
-    new_items = []
-    cursor = conn.cursor()
+def seen_key(item: dict) -> str:
+    """The URL an item is stored under in seen_items."""
+    return item.get("canonical_url") or item.get("url", "")
 
-    for item in items:
-        url = item.get("url", "")
-        if not url:
-            continue
 
-        cursor.execute("SELECT url FROM seen_items WHERE url = ?", (url,))
-        if cursor.fetchone() is None:
-            new_items.append(item)
+def filter_new_items(conn: sqlite3.Connection, items: list[dict], source_id: str,
+                     claimed: set[str] | None = None) -> list[dict]:
+    """
+    Filter out items that have already been seen.
 
-    return new_items
+    Items are keyed on their canonical URL (falling back to the link), looked
+    up in chunks rather than one query per item. If a `claimed` set is passed
+    it is shared across calls in the same run, so a URL that appears in two
+    feeds only gets through once.
+    """
+    claimed = claimed if claimed is not None else set()
+    candidates = []
+    for item in items:
+        url = seen_key(item)
+        if url and url not in claimed:
+            claimed.add(url)
+            candidates.append(item)
 
+    urls = [seen_key(item) for item in candidates]
+    seen = set()
+    for i in range(0, len(urls), SQL_CHUNK_SIZE):
+        chunk = urls[i:i + SQL_CHUNK_SIZE]
+        placeholders = ",".join("?" * len(chunk))
+        cursor = conn.execute(f"SELECT url FROM seen_items WHERE url IN ({placeholders})", chunk)
+        seen.update(row[0] for row in cursor)
 
-def mark_items_seen(conn: sqlite3.Connection, items: list[dict], source_id: str):
-    """Mark items as seen in the database."""
-    now = datetime.now(timezone.utc).isoformat()
+    return [item for item in candidates if seen_key(item) not in seen]
 
-    for item in items:
-        url = item.get("url", "")
-        if not url:
-            continue
-
-        try:
-            conn.execute("""
-                INSERT OR IGNORE INTO seen_items (url, title, source_id, content_hash, first_seen, published)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                url,
-                item.get("title", ""),
-                source_id,
-                content_hash(item.get("title", "") + item.get("snippet", "")),
-                now,
-                item.get("published", "")
-            ))
-        except sqlite3.Error as e:
-            logger.error(f"Database error marking item seen: {e}")
 
-    conn.commit()
+def mark_items_seen(conn: sqlite3.Connection, items: list[dict], source_id: str | None = None):
+    """
+    Mark items as seen in the database.
 
+    Each item's own "source_id" is used when present. Does not commit, so a
+    whole run can be written in one transaction.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [
+        (
+            seen_key(item),
+            item.get("title", ""),
+            item.get("source_id", source_id),
+            content_hash(item.get("title", "") + item.get("snippet", "")),
+            now,
+            item.get("published", "")
+        )
+        for item in items
+        if seen_key(item)
+    ]
 
-def fetch_all_feeds(sources: list[dict], max_workers: int = 5, delay: float = 1.0) -> list[dict]:
-    """Fetch all RSS feeds with rate limiting."""
+    try:
+        conn.executemany("""
+            INSERT OR IGNORE INTO seen_items (url, title, source_id, content_hash, first_seen, published)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+    except sqlite3.Error as e:
+        logger.error(f"Database error marking items seen: {e}")
+
+
+def fetch_all_feeds(sources: list[dict], max_workers: int = 5, delay: float = 1.0,
+                    validators: dict[str, dict] | None = None,
+                    on_result: Callable[[dict], None] | None = None) -> list[dict]:
+    """Fetch all RSS feeds with rate limiting, calling on_result as each one completes."""
     results = []
+    validators = validators or {}
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = {}
@@ -244,21 +377,101 @@ def fetch_all_feeds(sources: list[dict], max_workers: int = 5, delay: float = 1.
             # Stagger submissions to avoid hammering servers
             if i > 0:
                 time.sleep(delay / max_workers)
-            futures[executor.submit(fetch_single_feed, source)] = source
+            validator = validators.get(source.get("id", "unknown"))
+            futures[executor.submit(fetch_single_feed, source, validator)] = source
 
         for future in as_completed(futures):
             result = future.result()
             results.append(result)
+            if on_result:
+                on_result(result)
 
     return results
 
 
+def feed_host(url: str) -> str:
+    """Hostname used to group sources for per-host concurrency limits."""
+    host = (urlparse(url).hostname or "").lower()
+    return host.removeprefix("www.")
+
+
+async def _fetch_all_feeds_async(sources: list[dict], validators: dict[str, dict],
+                                 max_concurrency: int, per_host_limit: int,
+                                 on_result: Callable[[dict], None] | None) -> list[dict]:
+    global_slots = asyncio.Semaphore(max_concurrency)
+    host_slots: dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(per_host_limit))
+
+    async def fetch(source: dict) -> dict:
+        host = feed_host(source.get("rss", source.get("url", "")))
+        # Take the host slot first so queued requests for a busy host
+        # don't hold global slots that other hosts could use
+        async with host_slots[host]:
+            async with global_slots:
+                validator = validators.get(source.get("id", "unknown"))
+                result = await asyncio.to_thread(fetch_single_feed, source, validator)
+        # Runs on the event loop thread, so callers can use main-thread resources
+        if on_result:
+            on_result(result)
+        return result
+
+    return await asyncio.gather(*(fetch(s) for s in sources))
+
+
+def fetch_all_feeds_async(sources: list[dict], max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+                          per_host_limit: int = ASYNC_PER_HOST_LIMIT,
+                          validators: dict[str, dict] | None = None,
+                          on_result: Callable[[dict], None] | None = None) -> list[dict]:
+    """
+    Fetch all RSS feeds concurrently with a global cap and a per-host cap.
+
+    Wall time is bounded by the slowest host rather than the number of sources.
+    Results use the same dict format as fetch_single_feed; on_result is called
+    on the calling thread as each one completes.
+    """
+    async def run() -> list[dict]:
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=max_concurrency))
+        return await _fetch_all_feeds_async(sources, validators or {}, max_concurrency, per_host_limit, on_result)
+
+    return asyncio.run(run())
+
+
+def merge_fetch_output(existing: dict | None, output: dict) -> dict:
+    """Merge this run's output into an existing new_items.json from another run (e.g. another tier)."""
+    if not isinstance(existing, dict) or "items" not in existing:
+        return output
+
+    known_urls = {seen_key(item) for item in existing["items"]}
+    existing["items"].extend(item for item in output["items"] if seen_key(item) not in known_urls)
+    existing["new_items_count"] = len(existing["items"])
+    merge_run_summary(existing, output)
+    return existing
+
+
 def main():
     parser = argparse.ArgumentParser(description="Fetch RSS feeds for TMT Legal Intelligence")
     parser.add_argument("--tier", type=int, choices=[1, 2, 3, 4, 5], help="Tier to fetch (1-5)")
     parser.add_argument("--all", action="store_true", help="Fetch all tiers")
     parser.add_argument("--dry-run", action="store_true", help="Preview without saving to database")
-    parser.add_argument("--output", type=str, help="Output file path (default: new_items.json)")
+    parser.add_argument("--output", type=str, help="Output file path (default: new_items.json / new_items.ndjson)")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json",
+                        help="json: one document at the end; ndjson: one line per item as results complete")
+    parser.add_argument("--gzip", action="store_true", help="With --format=ndjson, write new_items.ndjson.gz")
+    parser.add_argument("--merge", action="store_true",
+                        help="Add to the existing output instead of replacing it (for tiers run in parallel)")
+    parser.add_argument("--engine", choices=["threads", "async"], default="threads",
+                        help="Fetch engine (default: threads)")
+    parser.add_argument("--max-concurrency", type=int, default=ASYNC_MAX_CONCURRENCY,
+                        help=f"Async engine: max fetches in flight (default: {ASYNC_MAX_CONCURRENCY})")
+    parser.add_argument("--per-host", type=int, default=ASYNC_PER_HOST_LIMIT,
+                        help=f"Async engine: max fetches in flight per host (default: {ASYNC_PER_HOST_LIMIT})")
+    parser.add_argument("--due-only", action="store_true",
+                        help="Only fetch sources that are due (check_frequency, adapted to how often they publish)")
+    parser.add_argument("--near-dup-days", type=int, default=near_dup.DEFAULT_LOOKBACK_DAYS,
+                        help="Drop items covering a story another source reported in the last N days "
+                             f"(default: {near_dup.DEFAULT_LOOKBACK_DAYS})")
+    parser.add_argument("--no-near-dup", action="store_true",
+                        help="Keep near-duplicate items from different sources as separate items")
     args = parser.parse_args()
 
     # Determine which tiers to fetch
@@ -281,9 +494,28 @@ def main():
 
     # Initialize database
     conn = init_database()
-
-    # Fetch all feeds
-    results = fetch_all_feeds(sources)
+    scheduler.init_schedule_table(conn)
+    near_dup.init_tables(conn)
+
+    # Skip sources that are not due yet
+    if args.due_only:
+        if args.dry_run:
+            for line in scheduler.format_report(conn, sources):
+                logger.info(line)
+        sources, not_due = scheduler.select_due(conn, sources)
+        logger.info(f"{len(sources)} sources due, {len(not_due)} skipped until their next check")
+        if not sources:
+            conn.close()
+            return
+
+    # Stream items to NDJSON as they are accepted, or build one JSON document at the end
+    stream = None
+    if args.format == "ndjson" and not args.dry_run:
+        default_name = "new_items.ndjson.gz" if args.gzip else "new_items.ndjson"
+        output_path = Path(args.output) if args.output else OUTPUT_DIR / default_name
+        stream = NDJSONWriter(output_path, append=args.merge, shared=True)
+    else:
+        output_path = Path(args.output) if args.output else OUTPUT_DIR / "new_items.json"
 
     # Process results and filter new items
     all_new_items = []
@@ -292,30 +524,120 @@ def main():
         "successful": 0,
         "failed": 0,
         "total_items": 0,
-        "new_items": 0
+        "new_items": 0,
+        "duplicates_in_run": 0,
+        "canonical_duplicates": 0,
+        "near_duplicates": 0,
+        "near_duplicates_earlier": 0,
+        "not_modified": 0,
+        "not_modified_304": 0,
+        "not_modified_hash": 0,
+        "not_modified_sources": [],
+        "bytes_received": 0
     }
 
-    for result in results:
-        if result["success"]:
-            fetch_stats["successful"] += 1
-            fetch_stats["total_items"] += len(result["items"])
-
-            # Filter to new items only
-            new_items = filter_new_items(conn, result["items"], result["source_id"])
-            fetch_stats["new_items"] += len(new_items)
-
-            for item in new_items:
-                item["source_id"] = result["source_id"]
-                item["source_name"] = result["source_name"]
-                item["method"] = "rss"
-                all_new_items.append(item)
-
-            # Mark as seen (unless dry run)
-            if not args.dry_run:
-                mark_items_seen(conn, new_items, result["source_id"])
-        else:
+    claimed_urls: set[str] = set()  # URLs already accepted from another feed this run
+    raw_links: dict[str, str] = {}  # Published link -> canonical key, stored in seen_raw_links
+    accepted_items = []  # Every new URL, including near-duplicates folded into another item
+    # The same story from several outlets becomes one item with alternate_sources
+    dedup = None if args.no_near_dup else near_dup.NearDuplicateIndex(conn, args.near_dup_days)
+    new_by_source: dict[str, int] = defaultdict(int)
+
+    def process_result(result: dict):
+        fetch_stats["bytes_received"] += result.get("bytes_received", 0)
+        if not result["success"]:
             fetch_stats["failed"] += 1
             logger.warning(f"Failed: {result['source_id']} - {result['error']}")
+            return
+
+        fetch_stats["successful"] += 1
+
+        if result.get("not_modified"):
+            fetch_stats["not_modified"] += 1
+            if result["not_modified"] == "http_304":
+                fetch_stats["not_modified_304"] += 1
+            else:
+                fetch_stats["not_modified_hash"] += 1
+            fetch_stats["not_modified_sources"].append(result["source_id"])
+            return
+        fetch_stats["total_items"] += len(result["items"])
+
+        # Items that reach the seen_items lookup (not already taken by another feed this run)
+        looked_up, looked_up_keys = [], set()
+        for item, raw_link in zip(result["items"], result.get("raw_links", [])):
+            key = seen_key(item)
+            if key and key not in claimed_urls and key not in looked_up_keys:
+                looked_up_keys.add(key)
+                looked_up.append((item, raw_link))
+
+        # Filter to new items only
+        claimed_before = len(claimed_urls)
+        new_items = filter_new_items(conn, result["items"], result["source_id"], claimed_urls)
+        fetch_stats["new_items"] += len(new_items)
+        new_by_source[result["source_id"]] += len(new_items)
+        with_url = sum(1 for item in result["items"] if seen_key(item))
+        fetch_stats["duplicates_in_run"] += with_url - (len(claimed_urls) - claimed_before)
+
+        # Already seen, but under a published link never stored before: keyed on
+        # the raw link (as before canonicalization) these would have come out new
+        accepted = {id(item) for item in new_items}
+        repeats = [raw_link for item, raw_link in looked_up
+                   if id(item) not in accepted and raw_link != seen_key(item) and raw_link not in raw_links]
+        fetch_stats["canonical_duplicates"] += len(url_canon.unseen_raw_links(conn, repeats))
+        for item, raw_link in zip(result["items"], result.get("raw_links", [])):
+            if seen_key(item):
+                raw_links.setdefault(raw_link, seen_key(item))
+
+        for item in new_items:
+            item["source_id"] = result["source_id"]
+            item["source_name"] = result["source_name"]
+            item["method"] = "rss"
+            accepted_items.append(item)
+            match = dedup.add(item) if dedup else None
+            if match:
+                # Streamed items can't be changed, so the copy follows as its own record
+                if stream and "duplicate_of" in match:
+                    stream.write("alternate", {**near_dup.alternate_source(item),
+                                               "duplicate_of": match["duplicate_of"]["url"]})
+                continue
+            all_new_items.append(item)
+            if stream:
+                stream.write("item", item)
+
+    # Fetch all feeds, sending validators from the previous run
+    validators = load_feed_validators(conn)
+    start = time.monotonic()
+    if args.engine == "async":
+        results = fetch_all_feeds_async(sources, args.max_concurrency, args.per_host,
+                                        validators=validators, on_result=process_result)
+    else:
+        results = fetch_all_feeds(sources, validators=validators, on_result=process_result)
+    logger.info(f"Fetched {len(results)} feeds in {time.monotonic() - start:.1f}s ({args.engine} engine)")
+
+    if dedup:
+        fetch_stats["near_duplicates"] = dedup.stats["clustered"]
+        fetch_stats["near_duplicates_earlier"] = dedup.stats["earlier"]
+        if not stream:
+            # Canonical copy: the highest-tier source, then the longest snippet
+            tier_of = {source.get("id"): source.get("tier", 5) for source in sources}
+            all_new_items = dedup.canonical_items(
+                rank=lambda item: (tier_of.get(item["source_id"], 5), -len(item.get("snippet") or ""))
+            )
+
+    # Mark as seen, store validators and update the schedule in a single transaction (unless dry run)
+    if not args.dry_run:
+        sources_by_id = {source.get("id"): source for source in sources}
+        outcomes = [
+            (sources_by_id[r["source_id"]], r["success"], new_by_source[r["source_id"]] > 0)
+            for r in results if r["source_id"] in sources_by_id
+        ]
+        with conn:
+            mark_items_seen(conn, accepted_items)
+            url_canon.record_raw_links(conn, raw_links)
+            if dedup:
+                dedup.record()
+            save_feed_validators(conn, results)
+            scheduler.record_checks(conn, outcomes)
 
     conn.close()
 
@@ -331,31 +653,26 @@ def main():
     }
 
     # Identify websearch sources for this tier (for Claude to process)
-    for tier in tiers:
-        tier_dirs = {1: "tier1-critical", 2: "tier2-high", 3: "tier3-standard", 4: "tier4-regular", 5: "tier5-periodic"}
-        tier_dir = SOURCES_CONFIG_DIR / tier_dirs.get(tier, "")
-        if tier_dir.exists():
-            for config_file in tier_dir.glob("*.json"):
-                try:
-                    with open(config_file) as f:
-                        config = json.load(f)
-                        websearch_sources = [
-                            s["id"] for s in config.get("sources", [])
-                            if s.get("method") == "websearch" and s.get("enabled", True)
-                        ]
-                        output["websearch_pending"].extend(websearch_sources)
-                except Exception:
-                    pass
+    output["websearch_pending"] = [
+        s["id"] for s in source_registry.load().select(tiers=tiers, methods=["websearch"])
+    ]
 
     # Write output
-    output_path = Path(args.output) if args.output else OUTPUT_DIR / "new_items.json"
-
     if args.dry_run:
         logger.info("=== DRY RUN - Not saving to database ===")
         print(json.dumps(output, indent=2))
+    elif stream:
+        stream.write("fetch_run", {
+            key: output[key] for key in ("fetched_at", "tiers", "stats", "new_items_count", "websearch_pending")
+        })
+        stream.close()
+        logger.info(f"Streamed {stream.counts['item']} items to: {output_path}")
+    elif args.merge:
+        update_json(output_path, lambda existing: merge_fetch_output(existing, output))
+        logger.info(f"Output merged into: {output_path}")
     else:
-        with open(output_path, "w") as f:
-            json.dump(output, f, indent=2)
+        with file_lock(output_path):
+            atomic_write_json(output_path, output)
         logger.info(f"Output saved to: {output_path}")
 
     # Summary
@@ -364,8 +681,17 @@ def main():
     logger.info(f"  Sources checked: {fetch_stats['total_sources']}")
     logger.info(f"  Successful: {fetch_stats['successful']}")
     logger.info(f"  Failed: {fetch_stats['failed']}")
+    logger.info(f"  Not modified: {fetch_stats['not_modified']} "
+                f"(304: {fetch_stats['not_modified_304']}, same content: {fetch_stats['not_modified_hash']})")
+    logger.info(f"  Bytes received: {fetch_stats['bytes_received']:,}")
     logger.info(f"  Total items found: {fetch_stats['total_items']}")
+    logger.info(f"  Duplicates across feeds: {fetch_stats['duplicates_in_run']}")
+    logger.info(f"  Repeats caught by URL canonicalization: {fetch_stats['canonical_duplicates']}")
     logger.info(f"  NEW items: {fetch_stats['new_items']}")
+    logger.info(f"  Near-duplicates folded: {fetch_stats['near_duplicates']} in this run, "
+                f"{fetch_stats['near_duplicates_earlier']} already covered in the last {args.near_dup_days} days")
+    logger.info(f"  Items output: {len(all_new_items)}")
+    http_client.log_latency_report(logger)
 
 
 if __name__ == "__main__":
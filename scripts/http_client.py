@@ -0,0 +1,232 @@
+"""
+Shared HTTP Client for TMT Legal Intelligence
+
+One place for the HTTP behaviour of fetch_rss.py, monitor_pages.py,
+discover_rss.py and download_pdf.py:
+
+- A pooled requests.Session per worker thread, so keep-alive connections
+  (and their DNS lookups and TLS handshakes) are reused across requests
+- A cap on concurrent requests per host across all threads; with
+  stream=True the slot is held until the response is closed, so the limit
+  covers reading the body too
+- Retries with exponential backoff and full jitter on connection errors,
+  timeouts, 429 and 5xx, honouring Retry-After
+- Per-host latency statistics for the end-of-run report
+
+Usage:
+    import http_client
+
+    response = http_client.get(url, headers=http_client.FEED_HEADERS, timeout=30)
+    http_client.log_latency_report(logger)
+"""
+
+import email.utils
+import logging
+import random
+import threading
+import time
+import weakref
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# One User-Agent for every script; some government sites reject non-browser agents
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 TMT-Legal-Intelligence/1.0"
+)
+BASE_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept-Language": "en-US,en;q=0.5"
+}
+FEED_HEADERS = {**BASE_HEADERS, "Accept": "application/rss+xml, application/xml, text/xml, */*"}
+HTML_HEADERS = {**BASE_HEADERS, "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"}
+PDF_HEADERS = {**BASE_HEADERS, "Accept": "application/pdf,*/*"}
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 3           # Retries after the first attempt
+BACKOFF_BASE = 1.0            # Seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 30.0
+RETRY_AFTER_MAX = 120.0       # Never wait longer than this for a Retry-After
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+HOST_CONNECTION_LIMIT = 4     # Concurrent requests per host across all threads
+
+logger = logging.getLogger(__name__)
+
+_thread_local = threading.local()
+_host_slots: dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_latencies: dict[str, list[float]] = defaultdict(list)
+_counters: dict[str, dict[str, int]] = defaultdict(lambda: {"retries": 0, "errors": 0})
+
+
+def host_of(url: str) -> str:
+    """Hostname a request counts against for limits and stats."""
+    return (urlparse(url).hostname or "").lower()
+
+
+def get_session() -> requests.Session:
+    """The calling thread's pooled session (created on first use)."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=HOST_CONNECTION_LIMIT)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(BASE_HEADERS)
+        _thread_local.session = session
+    return session
+
+
+def _host_slot(host: str) -> threading.BoundedSemaphore:
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(HOST_CONNECTION_LIMIT)
+        return _host_slots[host]
+
+
+def _hold_until_closed(response: requests.Response, slot: threading.BoundedSemaphore):
+    """Release a streamed response's host slot when it is closed (or garbage-collected)."""
+    release = weakref.finalize(response, slot.release)
+    response_ref = weakref.ref(response)  # No reference cycle, so dropping the response frees the slot
+
+    def close():
+        current = response_ref()
+        try:
+            if current is not None:
+                requests.Response.close(current)
+        finally:
+            release()
+
+    response.close = close
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    """Seconds requested by a Retry-After header (delta or HTTP date), if any."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry attempt (0-based)."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _record(host: str, elapsed: float | None = None, retry: bool = False, error: bool = False):
+    with _stats_lock:
+        if elapsed is not None:
+            _latencies[host].append(elapsed)
+        if retry:
+            _counters[host]["retries"] += 1
+        if error:
+            _counters[host]["errors"] += 1
+
+
+def request(method: str, url: str, retries: int = DEFAULT_RETRIES,
+            timeout: float = DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    """
+    Send a request through the thread's pooled session with retries.
+
+    Returns the final response (which may still be an error status; callers
+    use raise_for_status as before). Connection errors and timeouts are
+    re-raised once retries are exhausted. A stream=True response keeps its
+    host slot until it is closed, so close it (or use it in a with block).
+    """
+    session = get_session()
+    host = host_of(url)
+    slot = _host_slot(host)
+
+    for attempt in range(retries + 1):
+        start = time.monotonic()
+        slot.acquire()
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except BaseException as e:
+            slot.release()
+            if not isinstance(e, (requests.ConnectionError, requests.Timeout)):
+                raise
+            _record(host, error=True)
+            if attempt >= retries:
+                raise
+            wait = _backoff(attempt)
+            logger.debug(f"Retrying {url} in {wait:.1f}s after {type(e).__name__}")
+        else:
+            if kwargs.get("stream"):
+                _hold_until_closed(response, slot)
+            else:
+                slot.release()
+            _record(host, elapsed=time.monotonic() - start)
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+            retry_after = _retry_after(response)
+            wait = min(retry_after, RETRY_AFTER_MAX) if retry_after is not None else _backoff(attempt)
+            logger.debug(f"Retrying {url} in {wait:.1f}s after HTTP {response.status_code}")
+            response.close()
+
+        _record(host, retry=True)
+        time.sleep(wait)
+
+    raise AssertionError("unreachable")
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET with pooling, per-host limits and retries (see request)."""
+    return request("GET", url, **kwargs)
+
+
+def head(url: str, **kwargs) -> requests.Response:
+    """HEAD with pooling, per-host limits and retries (see request)."""
+    kwargs.setdefault("allow_redirects", True)
+    return request("HEAD", url, **kwargs)
+
+
+def latency_report() -> dict[str, dict]:
+    """Per-host request count, retries, errors and latency (ms) for this process."""
+    report = {}
+    with _stats_lock:
+        hosts = set(_latencies) | set(_counters)
+        for host in sorted(hosts):
+            samples = sorted(_latencies.get(host, []))
+            entry = {
+                "requests": len(samples),
+                "retries": _counters[host]["retries"],
+                "errors": _counters[host]["errors"]
+            }
+            if samples:
+                entry["mean_ms"] = round(1000 * sum(samples) / len(samples), 1)
+                entry["p95_ms"] = round(1000 * samples[min(len(samples) - 1, int(0.95 * len(samples)))], 1)
+                entry["max_ms"] = round(1000 * samples[-1], 1)
+            report[host] = entry
+    return report
+
+
+def latency_report_lines(limit: int = 10) -> list[str]:
+    """Human-readable report lines for the slowest hosts by mean latency."""
+    report = latency_report()
+    if not report:
+        return []
+    slowest = sorted(report.items(), key=lambda kv: kv[1].get("mean_ms", 0), reverse=True)[:limit]
+    lines = [f"Per-host latency (slowest {len(slowest)} of {len(report)} hosts):"]
+    for host, entry in slowest:
+        lines.append(f"  {host}: {entry['requests']} requests, mean {entry.get('mean_ms', '-')} ms, "
+                     f"p95 {entry.get('p95_ms', '-')} ms, retries {entry['retries']}, errors {entry['errors']}")
+    return lines
+
+
+def log_latency_report(log: logging.Logger, limit: int = 10):
+    """Log latency_report_lines() at INFO level."""
+    for line in latency_report_lines(limit):
+        log.info(line)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Streaming NDJSON Output for TMT Legal Intelligence
+
+fetch_rss.py and monitor_pages.py can write their results as NDJSON (one
+JSON record per line, optionally gzip-compressed) instead of one large JSON
+document. Records are appended as results complete, and readers can stream
+the file without loading it whole. Every record has a "record" field:
+
+    item         A new RSS item (same fields as items[] in new_items.json)
+    alternate    Another source's copy of an earlier item (duplicate_of = its url),
+                 folded into that item's alternate_sources when compacted
+    page_change  A changed page (same fields as page_changes[])
+    fetch_run    Summary written at the end of a fetch_rss.py run
+    page_run     Summary written at the end of a monitor_pages.py run
+
+Usage:
+    python item_stream.py compact sources/downloaded/new_items.ndjson
+    python item_stream.py compact new_items.ndjson.gz --output=new_items.json
+    python item_stream.py stats sources/downloaded/new_items.ndjson
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import IO, Iterator
+
+from state_io import atomic_write_json, file_lock
+
+logger = logging.getLogger(__name__)
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class NDJSONWriter:
+    """
+    Thread-safe NDJSON writer that flushes after every record.
+
+    Paths ending in .gz are gzip-compressed; appending adds a new gzip member,
+    which gzip readers treat as one continuous stream.
+
+    With shared=True other processes may append to the same file: each record
+    is written under the file lock by opening, appending and closing the file,
+    so records from different processes never interleave (for .gz files each
+    record becomes its own gzip member).
+    """
+
+    def __init__(self, path: Path, append: bool = False, shared: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.shared = shared
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+        if shared:
+            self._file = None
+            if not append:
+                with file_lock(self.path):
+                    _open(self.path, "w").close()
+        else:
+            self._file = _open(self.path, "a" if append else "w")
+
+    def write(self, record_type: str, data: dict):
+        line = json.dumps({"record": record_type, **data}, ensure_ascii=False)
+        with self._lock:
+            if self.shared:
+                with file_lock(self.path), _open(self.path, "a") as f:
+                    f.write(line + "\n")
+            else:
+                self._file.write(line + "\n")
+                self._file.flush()
+            self.counts[record_type] += 1
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+
+    def __enter__(self) -> "NDJSONWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_records(path: Path) -> Iterator[dict]:
+    """Yield records one at a time, skipping a truncated final line from an interrupted run."""
+    with _open(Path(path), "r") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable line {line_number} in {path}")
+
+
+def merge_run_summary(document: dict, summary: dict) -> dict:
+    """
+    Fold one fetch run's summary (fetched_at, tiers, stats, websearch_pending)
+    into a document, so separate per-tier runs add up instead of overwriting.
+    """
+    if summary.get("fetched_at") and (document.get("fetched_at") or "") < summary["fetched_at"]:
+        document["fetched_at"] = summary["fetched_at"]
+    document["tiers"] = sorted(set(document.get("tiers", [])) | set(summary.get("tiers", [])))
+
+    pending = document.setdefault("websearch_pending", [])
+    pending.extend(s for s in summary.get("websearch_pending", []) if s not in pending)
+
+    stats = document.setdefault("stats", {})
+    for key, value in summary.get("stats", {}).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            stats[key] = stats.get(key, 0) + value
+        elif isinstance(value, list):
+            stats[key] = stats.get(key, []) + value
+        else:
+            stats[key] = value
+    return document
+
+
+def compact(path: Path) -> dict:
+    """Build the classic new_items.json document from an NDJSON stream."""
+    document = {
+        "fetched_at": None,
+        "tiers": [],
+        "stats": {},
+        "new_items_count": 0,
+        "items": [],
+        "page_changes": [],
+        "websearch_pending": []
+    }
+
+    items_by_url = {}
+    for record in iter_records(path):
+        record_type = record.pop("record", None)
+        if record_type == "item":
+            document["items"].append(record)
+            items_by_url.setdefault(record.get("url"), record)
+        elif record_type == "alternate":
+            canonical = items_by_url.get(record.pop("duplicate_of", None))
+            if canonical is not None:
+                canonical.setdefault("alternate_sources", []).append(record)
+        elif record_type == "page_change":
+            document["page_changes"].append(record)
+        elif record_type == "fetch_run":
+            merge_run_summary(document, record)
+        elif record_type == "page_run":
+            # One page_run per monitor_pages run (e.g. per tier): their stats add up
+            stats = document.setdefault("page_monitor_stats", {})
+            for key, value in record.get("stats", {}).items():
+                stats[key] = stats.get(key, 0) + value
+
+    document["new_items_count"] = len(document["items"])
+    return document
+
+
+def default_compact_path(path: Path) -> Path:
+    """new_items.ndjson(.gz) -> new_items.json"""
+    name = path.name.removesuffix(".gz").removesuffix(".ndjson")
+    return path.with_name(f"{name}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Work with NDJSON item streams")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    compact_parser = sub.add_parser("compact", help="Write the classic JSON document from a stream")
+    compact_parser.add_argument("path", type=str, help="NDJSON (or .ndjson.gz) file")
+    compact_parser.add_argument("--output", type=str, help="Output path (default: same name with .json)")
+
+    stats_parser = sub.add_parser("stats", help="Count records by type")
+    stats_parser.add_argument("path", type=str, help="NDJSON (or .ndjson.gz) file")
+
+    args = parser.parse_args()
+    path = Path(args.path)
+    if not path.exists():
+        print(f"Error: File not found: {path}")
+        sys.exit(1)
+
+    if args.command == "compact":
+        output_path = Path(args.output) if args.output else default_compact_path(path)
+        document = compact(path)
+        with file_lock(output_path):
+            atomic_write_json(output_path, document)
+        print(f"Compacted {document['new_items_count']} items and "
+              f"{len(document['page_changes'])} page changes into {output_path}")
+    else:
+        counts = Counter(record.get("record") for record in iter_records(path))
+        for record_type, count in sorted(counts.items(), key=lambda kv: str(kv[0])):
+            print(f"  {record_type}: {count}")
+
+
+if __name__ == "__main__":
+    main()
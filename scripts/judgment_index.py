@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Judgment Index Builder for TMT Legal Intelligence
+
+Builds the indices in sources/judgements/indices/ from the metadata.json of
+every judgment folder (sources/judgements/YYYY-<area>-<title>/):
+
+    master-index.json             Every judgment's summary entry + statistics
+    by-focus-area.json            focus area -> judgment ids
+    by-court.json                 court -> judgment ids
+    by-year.json                  year -> judgment ids
+    by-statute-interpreted.json   statute provision -> judgment ids
+    landmark-cases.json           landmark judgments, highest landmark_score first
+
+Builds are incremental: master-index.json records each metadata file's size
+and hash, so only judgments whose metadata changed are re-read, and an index
+file is only rewritten (atomically) when its content changes. File mtimes,
+which change on every checkout, are only kept in a local cache
+(sources/state/judgment_index_cache.json) to skip re-hashing unchanged files.
+
+query() answers "judgments in focus area X, court Y, year Z" from the
+precomputed indices without opening any metadata file.
+
+Usage:
+    python judgment_index.py build                    # Update the indices
+    python judgment_index.py build --rebuild          # Re-read every metadata file
+    python judgment_index.py query --area=IT-Act --court="Supreme Court of India" --year=2015
+    python judgment_index.py query --landmark --json
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from state_io import atomic_write_json, file_lock, read_json
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+JUDGEMENTS_DIR = PROJECT_ROOT / "sources" / "judgements"
+INDICES_DIR = JUDGEMENTS_DIR / "indices"
+MASTER_INDEX = INDICES_DIR / "master-index.json"
+STAT_CACHE = PROJECT_ROOT / "sources" / "state" / "judgment_index_cache.json"
+
+INDEX_FILES = {
+    "by_focus_area": "by-focus-area.json",
+    "by_court": "by-court.json",
+    "by_year": "by-year.json",
+    "by_statute_interpreted": "by-statute-interpreted.json",
+    "landmark_cases": "landmark-cases.json"
+}
+INDEX_VERSION = "1.0"
+YEAR_PREFIX = re.compile(r"^(\d{4})")
+
+# Summary fields copied from metadata.json into master-index.json
+ENTRY_FIELDS = [
+    "case_name", "citation", "court", "bench_type", "judgment_date", "case_number",
+    "focus_areas", "statutes_interpreted", "landmark", "landmark_score",
+    "precedential_value", "appeal_status", "tags"
+]
+
+
+def judgment_entry(folder: Path, metadata: dict, fingerprint: dict) -> dict:
+    """Summary entry for one judgment, as stored in master-index.json."""
+    entry = {"id": folder.name, "path": str(folder.relative_to(PROJECT_ROOT))}
+    entry.update({field: metadata.get(field) for field in ENTRY_FIELDS if metadata.get(field) is not None})
+    year_match = YEAR_PREFIX.match(str(metadata.get("judgment_date") or "")) or YEAR_PREFIX.match(folder.name)
+    entry["year"] = year_match.group(1) if year_match else None
+    entry["focus_areas"] = list(entry.get("focus_areas") or [])
+    entry["landmark"] = bool(entry.get("landmark"))
+    entry["metadata"] = fingerprint
+    return entry
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def scan_judgments(previous: dict[str, dict], rebuild: bool = False,
+                   stat_cache: dict[str, dict] | None = None) -> tuple[list[dict], dict, dict]:
+    """
+    Entries for every judgment folder with a metadata.json.
+
+    Entries whose metadata file is unchanged (same size and hash) are reused
+    from `previous` without parsing the file. A file whose size and mtime
+    match `stat_cache` isn't re-hashed. Returns (entries, stats, new stat cache).
+    """
+    stats = {"judgments": 0, "reused": 0, "updated": 0, "removed": 0, "errors": []}
+    stat_cache = stat_cache or {}
+    new_cache = {}
+    entries = []
+    for metadata_path in sorted(JUDGEMENTS_DIR.glob("*/metadata.json")):
+        folder = metadata_path.parent
+        stat = metadata_path.stat()
+        cached = stat_cache.get(folder.name, {})
+        if cached.get("size") == stat.st_size and cached.get("mtime_ns") == stat.st_mtime_ns and not rebuild:
+            sha256 = cached["sha256"]
+        else:
+            sha256 = _sha256(metadata_path)
+        new_cache[folder.name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+
+        fingerprint = {"size": stat.st_size, "sha256": sha256}
+        old = None if rebuild else previous.get(folder.name)
+        if old and old.get("metadata") == fingerprint:
+            entries.append(old)
+            stats["reused"] += 1
+            continue
+
+        try:
+            with open(metadata_path, encoding="utf-8") as f:
+                metadata = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            stats["errors"].append(f"{metadata_path.relative_to(PROJECT_ROOT)}: {e}")
+            if old:
+                entries.append(old)  # Keep the last good entry until the file is fixed
+            continue
+        entries.append(judgment_entry(folder, metadata, fingerprint))
+        stats["updated"] += 1
+
+    stats["judgments"] = len(entries)
+    stats["removed"] = len(set(previous) - {entry["id"] for entry in entries})
+    return entries, stats, new_cache
+
+
+def _sort_key(entry: dict):
+    """Newest judgment first."""
+    return entry.get("judgment_date") or entry.get("year") or ""
+
+
+def _group(entries: list[dict], keys_of) -> dict[str, list[str]]:
+    groups: dict[str, list[str]] = {}
+    for entry in sorted(entries, key=_sort_key, reverse=True):
+        for key in keys_of(entry):
+            if key:
+                groups.setdefault(str(key), []).append(entry["id"])
+    return dict(sorted(groups.items()))
+
+
+def build_indices(entries: list[dict], existing_areas: list[str]) -> dict[str, dict]:
+    """Index file contents (without version/last_updated) keyed by index name."""
+    by_focus_area = {area: [] for area in existing_areas}
+    by_focus_area.update(_group(entries, lambda e: e["focus_areas"]))
+    landmarks = sorted(
+        (e for e in entries if e["landmark"]),
+        key=lambda e: (e.get("landmark_score") or 0, _sort_key(e)), reverse=True
+    )
+    courts = sorted({e["court"] for e in entries if e.get("court")})
+
+    return {
+        "by_focus_area": {"focus_areas": by_focus_area},
+        "by_court": {"courts": _group(entries, lambda e: [e.get("court")])},
+        "by_year": {"years": _group(entries, lambda e: [e.get("year")])},
+        "by_statute_interpreted": {"statutes": _group(entries, lambda e: e.get("statutes_interpreted") or [])},
+        "landmark_cases": {"landmark_cases": [
+            {key: e.get(key) for key in ("id", "case_name", "court", "year", "landmark_score")}
+            for e in landmarks
+        ]},
+        "master": {
+            "indices": INDEX_FILES,
+            "statistics": {
+                "total_judgments": len(entries),
+                "landmark_cases": len(landmarks),
+                "courts_covered": courts
+            },
+            "judgments": sorted(entries, key=lambda e: e["id"])
+        }
+    }
+
+
+def _write_if_changed(path: Path, content: dict, today: str) -> bool:
+    """Write an index atomically unless only version/last_updated would change."""
+    current = read_json(path, default={}) or {}
+    if {k: v for k, v in current.items() if k not in ("version", "last_updated")} == content:
+        return False
+    atomic_write_json(path, {"version": INDEX_VERSION, "last_updated": today, **content})
+    return True
+
+
+def update_indices(rebuild: bool = False) -> dict:
+    """Bring every index file up to date with the judgment metadata. Returns build stats."""
+    with file_lock(MASTER_INDEX):
+        master = read_json(MASTER_INDEX, default={}) or {}
+        previous = {entry["id"]: entry for entry in master.get("judgments", []) if "id" in entry}
+        stat_cache = read_json(STAT_CACHE, default={}) or {}
+        entries, stats, new_cache = scan_judgments(previous, rebuild, stat_cache)
+        if new_cache != stat_cache:
+            atomic_write_json(STAT_CACHE, new_cache)
+
+        existing_areas = list((read_json(INDICES_DIR / INDEX_FILES["by_focus_area"], default={}) or {})
+                              .get("focus_areas", {}))
+        indices = build_indices(entries, existing_areas)
+
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        written = []
+        for name, filename in INDEX_FILES.items():
+            if _write_if_changed(INDICES_DIR / filename, indices[name], today):
+                written.append(filename)
+        if _write_if_changed(MASTER_INDEX, indices["master"], today):
+            written.append(MASTER_INDEX.name)
+    stats["written"] = written
+    return stats
+
+
+def _load_index(name: str) -> dict:
+    filename = MASTER_INDEX.name if name == "master" else INDEX_FILES[name]
+    return read_json(INDICES_DIR / filename, default={}) or {}
+
+
+def query(focus_area: str | None = None, court: str | None = None, year: str | int | None = None,
+          statute: str | None = None, landmark: bool = False) -> list[dict]:
+    """
+    Judgments matching every given filter (case-insensitive), newest first,
+    answered from the index files alone. Returns master-index entries.
+    """
+    def lookup(index: dict, key) -> set[str]:
+        wanted = str(key).lower()
+        return {i for name, ids in index.items() if name.lower() == wanted for i in ids}
+
+    candidates: set[str] | None = None
+    filters = [
+        ("by_focus_area", "focus_areas", focus_area),
+        ("by_court", "courts", court),
+        ("by_year", "years", year),
+        ("by_statute_interpreted", "statutes", statute)
+    ]
+    for name, field, value in filters:
+        if value is None:
+            continue
+        ids = lookup(_load_index(name).get(field, {}), value)
+        candidates = ids if candidates is None else candidates & ids
+    if landmark:
+        ids = {case["id"] for case in _load_index("landmark_cases").get("landmark_cases", [])}
+        candidates = ids if candidates is None else candidates & ids
+
+    judgments = _load_index("master").get("judgments", [])
+    matches = [e for e in judgments if candidates is None or e["id"] in candidates]
+    return sorted(matches, key=_sort_key, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the judgment indices")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = sub.add_parser("build", help="Update the indices from judgment metadata")
+    build_parser.add_argument("--rebuild", action="store_true", help="Re-read every metadata file")
+
+    query_parser = sub.add_parser("query", help="List judgments from the indices")
+    query_parser.add_argument("--area", help="Focus area (e.g. IT-Act)")
+    query_parser.add_argument("--court", help='Court (e.g. "Supreme Court of India")')
+    query_parser.add_argument("--year", help="Year of judgment")
+    query_parser.add_argument("--statute", help='Statute provision (e.g. "IT Act Sec 69A")')
+    query_parser.add_argument("--landmark", action="store_true", help="Only landmark judgments")
+    query_parser.add_argument("--json", action="store_true", help="Print full entries as JSON")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        stats = update_indices(rebuild=args.rebuild)
+        print(f"Judgments: {stats['judgments']} ({stats['updated']} updated, {stats['reused']} unchanged, "
+              f"{stats['removed']} removed)")
+        print(f"Rewrote: {', '.join(stats['written']) or 'nothing (indices already current)'}")
+        for error in stats["errors"]:
+            print(f"  Skipped {error}", file=sys.stderr)
+        sys.exit(1 if stats["errors"] else 0)
+
+    results = query(args.area, args.court, args.year, args.statute, args.landmark)
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+    print(f"{len(results)} judgments")
+    for entry in results:
+        marker = " [landmark]" if entry.get("landmark") else ""
+        print(f"  {entry.get('judgment_date') or entry.get('year') or '????'}  {entry.get('case_name', entry['id'])}"
+              f" - {entry.get('court', 'unknown court')}{marker}")
+        print(f"      {entry['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Compiled Keyword Matcher for TMT Legal Intelligence
+
+Matches keyword lists against item text without re-lowercasing every keyword
+on every check, and reports which keywords matched. Used by fetch_rss.py for filter_keywords
+and for tagging items with the focus areas whose keywords they mention.
+
+Usage:
+    from keyword_matcher import compile_keywords, FocusAreaTagger
+
+    matcher = compile_keywords(["data protection", "DPDP"])
+    matcher.find("MeitY notifies DPDP Rules")   # -> {"DPDP"}
+
+    tagger = FocusAreaTagger({"Data-Protection": ["DPDP", "personal data"]})
+    tagger.tag("MeitY notifies DPDP Rules")     # -> {"Data-Protection": ["DPDP"]}
+"""
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive matcher for a fixed keyword list, prepared once.
+
+    By default keywords match anywhere in the text (the same behaviour as
+    `kw.lower() in text.lower()`). With whole_words=True they only match
+    when not surrounded by letters or digits, so "AI" does not match "said".
+
+    Keywords are lowercased up front and the text once per call, then checked
+    with plain substring tests. For the short lists in the source configs this
+    beats a single combined regex in CPython (see bench_keyword_matcher.py);
+    whole-word boundaries are only checked for keywords that already occur.
+    """
+
+    def __init__(self, keywords: Iterable[str], whole_words: bool = False):
+        # Keep the first spelling of each keyword, keyed by its lowercase form
+        self._keywords: dict[str, str] = {}
+        for kw in keywords:
+            if kw and kw.strip():
+                self._keywords.setdefault(kw.strip().lower(), kw.strip())
+
+        self.whole_words = whole_words
+        self._lowered = tuple(self._keywords)
+        self._boundaries = {
+            kw: re.compile(rf"(?<!\w){re.escape(kw)}(?!\w)")
+            for kw in self._lowered
+        } if whole_words else {}
+
+    def __bool__(self) -> bool:
+        return bool(self._keywords)
+
+    @property
+    def keywords(self) -> list[str]:
+        return list(self._keywords.values())
+
+    def _occurs(self, kw: str, lowered: str) -> bool:
+        if kw not in lowered:
+            return False
+        return not self.whole_words or self._boundaries[kw].search(lowered) is not None
+
+    def matches(self, text: str) -> bool:
+        """Return True if any keyword occurs in text."""
+        lowered = text.lower()
+        return any(self._occurs(kw, lowered) for kw in self._lowered)
+
+    def find(self, text: str) -> set[str]:
+        """Return every keyword (in its configured spelling) that occurs in text."""
+        return self.find_lowered(text.lower())
+
+    def find_lowered(self, lowered: str) -> set[str]:
+        """Like find(), for text the caller has already lowercased (shared across matchers)."""
+        return {self._keywords[kw] for kw in self._lowered if self._occurs(kw, lowered)}
+
+
+class FocusAreaTagger:
+    """Tags text with the focus areas whose keywords it mentions."""
+
+    def __init__(self, area_keywords: dict[str, list[str]], whole_words: bool = True):
+        self._area_of: dict[str, list[str]] = {}
+        for area, keywords in area_keywords.items():
+            for kw in keywords:
+                self._area_of.setdefault(kw.strip().lower(), []).append(area)
+        self.matcher = KeywordMatcher(
+            [kw for keywords in area_keywords.values() for kw in keywords],
+            whole_words=whole_words
+        )
+
+    def tag(self, text: str) -> dict[str, list[str]]:
+        """Return {focus_area: [matched keywords]} for text."""
+        return self.tag_lowered(text.lower())
+
+    def tag_lowered(self, lowered: str) -> dict[str, list[str]]:
+        """Like tag(), for text the caller has already lowercased."""
+        areas: dict[str, list[str]] = {}
+        for kw in sorted(self.matcher.find_lowered(lowered), key=str.lower):
+            for area in self._area_of[kw.lower()]:
+                areas.setdefault(area, []).append(kw)
+        return areas
+
+
+@lru_cache(maxsize=None)
+def _compile_cached(keywords: tuple[str, ...], whole_words: bool) -> KeywordMatcher:
+    return KeywordMatcher(keywords, whole_words=whole_words)
+
+
+def compile_keywords(keywords: Iterable[str], whole_words: bool = False) -> KeywordMatcher:
+    """Return a compiled matcher, reusing one already built for the same list in this run."""
+    return _compile_cached(tuple(keywords), whole_words)
+
+
+def load_focus_area_keywords(path: Path) -> dict[str, list[str]]:
+    """Load the {focus_area: [keywords]} map, or an empty map if the file is missing."""
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f).get("focus_areas", {})
@@ -2,26 +2,70 @@
 """
 Page Monitor for TMT Legal Intelligence
 
-Monitors configured web pages for changes using content hashing.
-Detects when pages have been updated and flags them for Claude to review.
+Monitors configured web pages for changes and flags them for Claude to review.
+
+Each page's main content area is reduced to its set of links and content
+blocks (paragraphs, list items, table rows, headings). A snapshot of both is
+kept in sources/state/page_snapshots.json, and a page only counts as changed
+when links or blocks were added since the snapshot; only those additions are
+reported. Entries stay in the snapshot for SNAPSHOT_KEEP_DAYS after they were
+last seen, so rotating banners and carousels don't come back as new. The
+whole-page hash in page_hashes.json is still kept for reference.
+
+The snapshot also tracks each page's extracted text length and link count.
+An empty or collapsed extraction (JS-rendered or blocked page) is reported
+as a failure rather than a stable hash, and the page's fallbacks are tried
+in order; a page that stays empty is only re-fetched every EMPTY_RETRY_DAYS:
+
+    "fallbacks": [                                    # On the source or a section
+        {"type": "url", "url": "https://example.gov.in/press-releases-list"},
+        {"type": "rss", "url": "https://example.gov.in/rss.xml"},
+        {"type": "sitemap", "url": "https://example.gov.in/sitemap.xml"}
+    ]
+
+Noisy regions can be left out per source:
+
+    "ignore": {
+        "selectors": ["#visitor-counter", ".ticker"],   # CSS selectors to drop
+        "patterns": ["Visitors: [0-9,]+"]                # Regexes removed from text and links
+    }
 
 Usage:
     python monitor_pages.py --tier=1              # Monitor Tier 1 webfetch sources
     python monitor_pages.py --tier=1 --dry-run    # Preview without saving
     python monitor_pages.py --all                 # Monitor all tiers
+    python monitor_pages.py --all --max-hosts=4   # Limit hosts checked in parallel
+    python monitor_pages.py --all --format=ndjson # Append page changes to new_items.ndjson
+    python monitor_pages.py --all --due-only      # Only sources due per check_frequency and observed cadence
+
+Sources with "method": "sitemap" are checked through their sitemap instead
+(conditional GET, child sitemaps of an index only re-read when their lastmod
+moves). URLs that are new, or whose lastmod changed, since the last run are
+added to new_items as items; the pages themselves are only checked (as for
+webfetch) when the site has no sitemap:
+
+    {"id": "...", "url": "https://example.gov.in", "method": "sitemap",
+     "sitemap": "https://example.gov.in/sitemap.xml",      # Default: /sitemap.xml
+     "sitemap_include": ["/press-release/", "/notification"]}  # Regexes URLs must match
 """
 
 import argparse
+import gzip
 import hashlib
 import json
 import logging
-import os
+import re
 import sys
 import time
+from collections import defaultdict
+from statistics import median
+from xml.etree import ElementTree
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Callable
+from urllib.parse import urljoin, urlparse
 
 try:
     import requests
@@ -31,10 +75,36 @@ except ImportError:
     print("Run: pip install requests beautifulsoup4")
     sys.exit(1)
 
+import http_client
+import scheduler
+import source_registry
+from item_stream import NDJSONWriter
+from state_io import read_json, update_json
+
+# Optional: only needed for "rss" fallbacks
+try:
+    import feedparser
+except ImportError:
+    feedparser = None
+
+# Optional faster HTML parser backends
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+try:
+    import lxml  # noqa: F401 - used by BeautifulSoup as the "lxml" feature
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
 # Setup paths
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
-SOURCES_CONFIG_DIR = PROJECT_ROOT / "sources" / "config"
 STATE_DIR = PROJECT_ROOT / "sources" / "state"
 OUTPUT_DIR = PROJECT_ROOT / "sources" / "downloaded"
 
@@ -42,8 +112,10 @@ OUTPUT_DIR = PROJECT_ROOT / "sources" / "downloaded"
 STATE_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-# State file for page hashes
+# State files for page hashes and link/block snapshots
 HASHES_FILE = STATE_DIR / "page_hashes.json"
+SNAPSHOTS_FILE = STATE_DIR / "page_snapshots.json"
+SITEMAP_STATE_FILE = STATE_DIR / "sitemap_state.json"
 
 # Logging setup
 logging.basicConfig(
@@ -53,30 +125,72 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Request settings
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5"
-}
+# Request settings (shared User-Agent, pooling and retries live in http_client)
+HEADERS = http_client.HTML_HEADERS
 TIMEOUT = 30
 
+# Scheduling: hosts are checked in parallel, requests to one host are spaced out.
+# A source can override the delay with "request_delay" (seconds) in its config.
+DEFAULT_MAX_HOSTS = 8
+DEFAULT_HOST_DELAY = 2.0
+
+# Page parsing
+NOISE_TAGS = ["script", "style", "nav", "footer", "header", "aside"]
+BLOCK_TAGS = ["p", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "dt", "dd", "blockquote", "pre"]
+MAX_LINKS = 20  # parse_page returns the first 20 links; changes report up to 20 new links
+MAX_NEW_BLOCKS = 10  # New blocks reported per changed page
+MIN_BLOCK_CHARS = 20  # Shorter blocks (dates, counters, "Read more") are not tracked
+SNAPSHOT_KEEP_DAYS = 30  # Forget links/blocks not seen for this long
+
+# Extraction health: a page whose extraction comes back empty or collapsed is a
+# failure, not a stable hash. Healthy checks are kept to know what "normal" is.
+MIN_TEXT_CHARS = 50  # Less main-content text than this is an empty extraction
+COLLAPSE_RATIO = 0.25  # Below this share of the page's median text/links is a collapse
+MIN_HISTORY = 3  # Healthy checks needed before collapses are judged
+EXTRACTION_HISTORY = 14  # Healthy checks kept per page
+EMPTY_BACKOFF_RUNS = 3  # After this many empty checks in a row...
+EMPTY_RETRY_DAYS = 7  # ...only re-fetch the page this often (fallbacks still run)
+
+# Sitemap sources ("method": "sitemap")
+SITEMAP_SECTION = "sitemap"
+MAX_CHILD_SITEMAPS = 50  # Newest child sitemaps read from a sitemap index
+MAX_SITEMAP_ITEMS = 100  # New/modified URLs reported per source per run
+SITEMAP_RETRY_DAYS = 7  # Probe again for a sitemap that was missing
+
 
 def load_page_hashes() -> dict:
     """Load previously stored page hashes."""
-    if HASHES_FILE.exists():
-        try:
-            with open(HASHES_FILE) as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return {}
-    return {}
+    return read_json(HASHES_FILE, {})
+
+
+def update_page_hashes(updates: dict) -> dict:
+    """
+    Merge this run's hashes into the state file under the lock.
+
+    Other processes (e.g. another tier) may have saved hashes since this run
+    loaded them; re-reading under the lock keeps their updates.
+    """
+    return update_json(HASHES_FILE, lambda hashes: hashes.update(updates), default={})
+
+
+def load_page_snapshots() -> dict:
+    """Load the stored link/block snapshots, keyed like page_hashes.json."""
+    return read_json(SNAPSHOTS_FILE, {})
+
+
+def update_page_snapshots(updates: dict) -> dict:
+    """Merge this run's snapshots into the state file under the lock."""
+    return update_json(SNAPSHOTS_FILE, lambda snapshots: snapshots.update(updates), default={})
 
 
-def save_page_hashes(hashes: dict):
-    """Save page hashes to state file."""
-    with open(HASHES_FILE, "w") as f:
-        json.dump(hashes, f, indent=2)
+def load_sitemap_state() -> dict:
+    """Load the stored sitemap entries and validators, keyed by source id."""
+    return read_json(SITEMAP_STATE_FILE, {})
+
+
+def update_sitemap_state(updates: dict) -> dict:
+    """Merge this run's sitemap state into the state file under the lock."""
+    return update_json(SITEMAP_STATE_FILE, lambda state: state.update(updates), default={})
 
 
 def content_hash(text: str) -> str:
@@ -86,93 +200,274 @@ def content_hash(text: str) -> str:
     return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
 
 
-def extract_main_content(html: str, url: str) -> str:
-    """Extract main content from HTML, ignoring navigation/footer."""
-    soup = BeautifulSoup(html, "html.parser")
+def available_parsers() -> list[str]:
+    """HTML parser backends usable in this environment, fastest first."""
+    parsers = []
+    if SelectolaxParser is not None:
+        parsers.append("selectolax")
+    if LXML_AVAILABLE:
+        parsers.append("lxml")
+    parsers.append("html.parser")
+    return parsers
+
+
+def resolve_parser(name: str = "auto") -> str:
+    """Map a --parser choice to an installed backend, falling back to html.parser."""
+    parsers = available_parsers()
+    if name == "auto":
+        return parsers[0]
+    if name not in parsers:
+        logger.warning(f"Parser backend '{name}' not installed, using html.parser")
+        return "html.parser"
+    return name
+
+
+def notable_link(text: str, href: str, base_url: str) -> dict | None:
+    """Build a link entry, or None for short and navigation/footer links."""
+    if not text or len(text) < 5:
+        return None
+
+    # Skip navigation/footer links
+    if any(x in text.lower() for x in ["home", "about", "contact", "privacy", "terms"]):
+        return None
+
+    return {
+        "text": text[:100],
+        "url": urljoin(base_url, href)
+    }
+
+
+def _parse_with_bs4(html: str, base_url: str, features: str,
+                    ignore_selectors: tuple[str, ...] = ()) -> tuple[str, list[dict], list[str]]:
+    soup = BeautifulSoup(html, features)
 
-    # Remove script, style, nav, footer elements
-    for tag in soup(["script", "style", "nav", "footer", "header", "aside"]):
+    # Remove script, style, nav, footer elements and the source's noisy regions
+    for tag in soup(NOISE_TAGS):
         tag.decompose()
+    for selector in ignore_selectors:
+        for tag in soup.select(selector):
+            tag.decompose()
 
     # Try to find main content area
     main = soup.find("main") or soup.find("article") or soup.find("div", {"class": "content"})
-    if main:
-        text = main.get_text(separator=" ", strip=True)
-    else:
-        text = soup.get_text(separator=" ", strip=True)
+    area = main or soup
+    text = area.get_text(separator=" ", strip=True)
 
-    return text
+    links = []
+    for a in area.find_all("a", href=True):
+        link = notable_link(a.get_text(strip=True), a.get("href", ""), base_url)
+        if link:
+            links.append(link)
+    blocks = [block.get_text(separator=" ", strip=True) for block in area.find_all(BLOCK_TAGS)]
 
+    return text, links, blocks
 
-def extract_links(html: str, base_url: str) -> list[dict]:
-    """Extract notable links from the page."""
-    from urllib.parse import urljoin
 
-    soup = BeautifulSoup(html, "html.parser")
-    links = []
+def _parse_with_selectolax(html: str, base_url: str,
+                           ignore_selectors: tuple[str, ...] = ()) -> tuple[str, list[dict], list[str]]:
+    tree = SelectolaxParser(html)
+    tree.strip_tags(NOISE_TAGS)
+    for selector in ignore_selectors:
+        for node in tree.css(selector):
+            node.decompose()
 
-    # Look for links in main content areas
-    main_area = soup.find("main") or soup.find("article") or soup.find("div", {"class": "content"}) or soup
+    area = (tree.css_first("main") or tree.css_first("article")
+            or tree.css_first("div.content") or tree.root)
+    if area is None:
+        return "", [], []
+    text = area.text(separator=" ", strip=True)
 
-    for a in main_area.find_all("a", href=True)[:20]:  # Limit to first 20 links
-        href = a.get("href", "")
-        text = a.get_text(strip=True)
+    links = []
+    for a in area.css("a[href]"):
+        link = notable_link(a.text(strip=True), a.attributes.get("href") or "", base_url)
+        if link:
+            links.append(link)
+    blocks = [block.text(separator=" ", strip=True) for block in area.css(", ".join(BLOCK_TAGS))]
 
-        if not text or len(text) < 5:
-            continue
+    return text, links, blocks
 
-        # Skip navigation/footer links
-        if any(x in text.lower() for x in ["home", "about", "contact", "privacy", "terms"]):
-            continue
 
-        full_url = urljoin(base_url, href)
-        links.append({
-            "text": text[:100],
-            "url": full_url
-        })
+def page_structure(html: str, base_url: str, parser: str = "html.parser",
+                   ignore_selectors: tuple[str, ...] = ()) -> tuple[str, list[dict], list[str]]:
+    """
+    Parse a page once and return (main content text, every notable link, block texts).
 
-    return links
+    Navigation, header, footer, aside, script and style elements are dropped,
+    as is anything matching ignore_selectors, and the text, links and blocks
+    all come from the main content area.
+    """
+    if parser == "selectolax":
+        return _parse_with_selectolax(html, base_url, ignore_selectors)
+    return _parse_with_bs4(html, base_url, parser, ignore_selectors)
 
 
-def load_source_configs(tiers: list[int]) -> list[dict]:
-    """Load source configurations for specified tiers."""
-    tier_dirs = {
-        1: "tier1-critical",
-        2: "tier2-high",
-        3: "tier3-standard",
-        4: "tier4-regular",
-        5: "tier5-periodic"
-    }
+def parse_page(html: str, base_url: str, parser: str = "html.parser") -> tuple[str, list[dict]]:
+    """Parse a page once and return (main content text, first MAX_LINKS notable links)."""
+    text, links, _ = page_structure(html, base_url, parser)
+    return text, links[:MAX_LINKS]
 
-    sources = []
-    for tier in tiers:
-        tier_dir = SOURCES_CONFIG_DIR / tier_dirs.get(tier, "")
-        if not tier_dir.exists():
-            logger.warning(f"Tier {tier} directory not found: {tier_dir}")
-            continue
 
-        for config_file in tier_dir.glob("*.json"):
-            try:
-                with open(config_file) as f:
-                    config = json.load(f)
-                    # Filter for webfetch sources only
-                    webfetch_sources = [
-                        s for s in config.get("sources", [])
-                        if s.get("method") == "webfetch" and s.get("enabled", True)
-                    ]
-                    for source in webfetch_sources:
-                        source["tier"] = tier
-                    sources.extend(webfetch_sources)
-            except (json.JSONDecodeError, KeyError) as e:
-                logger.error(f"Error loading {config_file}: {e}")
-
-    return sources
-
-
-def check_single_page(source: dict, url: str, section_name: str, stored_hashes: dict) -> dict:
-    """Check a single page for changes."""
+def load_source_configs(tiers: list[int]) -> list[dict]:
+    """Enabled webfetch and sitemap sources for the specified tiers, from the shared source registry."""
+    registry = source_registry.load()
+    registry.log_problems(logger)
+    return registry.select(tiers=tiers, methods=["webfetch", "sitemap"])
+
+
+@lru_cache(maxsize=256)
+def _compile_ignore_patterns(patterns: tuple[str, ...]) -> re.Pattern | None:
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+
+def ignore_rules(source: dict) -> tuple[tuple[str, ...], re.Pattern | None]:
+    """(CSS selectors, combined regex) from a source's "ignore" config."""
+    ignore = source.get("ignore") or {}
+    return tuple(ignore.get("selectors", [])), _compile_ignore_patterns(tuple(ignore.get("patterns", [])))
+
+
+def block_key(text: str) -> str:
+    """Snapshot key for a content block (hash of its normalized text)."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def page_elements(text: str, links: list[dict], blocks: list[str],
+                  pattern: re.Pattern | None) -> tuple[str, dict[str, dict], dict[str, str]]:
+    """
+    Apply a source's ignore patterns and key the page's parts for the snapshot.
+
+    Returns (text, links by URL, block texts by block_key). Pattern matches
+    are cut out of the text and blocks; links whose text or URL match are dropped.
+    """
+    if pattern:
+        text = pattern.sub(" ", text)
+        links = [link for link in links if not (pattern.search(link["text"]) or pattern.search(link["url"]))]
+        blocks = [pattern.sub(" ", block) for block in blocks]
+
+    links_by_url = {}
+    for link in links:
+        links_by_url.setdefault(link["url"], link)
+    blocks_by_key = {}
+    for block in blocks:
+        block = " ".join(block.split())
+        if len(block) >= MIN_BLOCK_CHARS:
+            blocks_by_key.setdefault(block_key(block), block)
+    return text, links_by_url, blocks_by_key
+
+
+def diff_snapshot(previous: dict | None, links: dict[str, dict], blocks: dict[str, str],
+                  today: str) -> tuple[list[dict], list[str], dict]:
+    """
+    Compare a page's links and blocks with its stored snapshot.
+
+    Returns (added links, added blocks, new snapshot). The snapshot maps each
+    link URL and block key to the date it was last seen; entries not seen for
+    SNAPSHOT_KEEP_DAYS are dropped.
+    """
+    cutoff = (datetime.fromisoformat(today) - timedelta(days=SNAPSHOT_KEEP_DAYS)).strftime("%Y-%m-%d")
+    snapshot = {}
+    added = {}
+    for field, current in (("links", links), ("blocks", blocks)):
+        known = (previous or {}).get(field, {})
+        added[field] = [value for key, value in current.items() if key not in known]
+        kept = {key: seen for key, seen in known.items() if seen >= cutoff}
+        kept.update(dict.fromkeys(current, today))
+        snapshot[field] = kept
+    return added["links"], added["blocks"], snapshot
+
+
+def extraction_problem(text_length: int, link_count: int, history: list[list]) -> str | None:
+    """
+    Why an extraction looks broken, or None if it looks normal.
+
+    Empty means less than MIN_TEXT_CHARS of text (JS-rendered or blocked
+    pages). Collapsed means far less text, or far fewer links, than the
+    page's median over its recent healthy checks.
+    """
+    if text_length < MIN_TEXT_CHARS:
+        return f"empty extraction ({text_length} chars, {link_count} links)"
+    if len(history) >= MIN_HISTORY:
+        typical_text = median(entry[1] for entry in history)
+        typical_links = median(entry[2] for entry in history)
+        if text_length < typical_text * COLLAPSE_RATIO or (
+                typical_links >= 5 and link_count < typical_links * COLLAPSE_RATIO):
+            return (f"extraction collapsed ({text_length} chars, {link_count} links; "
+                    f"usually {typical_text:.0f} chars, {typical_links:.0f} links)")
+    return None
+
+
+def page_fallbacks(source: dict, section_name: str) -> list[dict]:
+    """Fallbacks for a page: the section's own "fallbacks", else the source's."""
+    for section in source.get("sections", []):
+        if section.get("name", "main") == section_name and "fallbacks" in section:
+            return section["fallbacks"]
+    return source.get("fallbacks", [])
+
+
+def parse_sitemap(content: bytes) -> tuple[str, list[dict]]:
+    """
+    Parse a sitemap into ("urlset" or "sitemapindex", entries). Entries have
+    loc, lastmod and title (from Google News <news:title>, else None).
+    """
+    root = ElementTree.fromstring(content)
+    kind = "sitemapindex" if root.tag.endswith("sitemapindex") else "urlset"
+    entries = []
+    for node in root.iterfind("{*}sitemap" if kind == "sitemapindex" else "{*}url"):
+        loc = (node.findtext("{*}loc") or "").strip()
+        if loc:
+            entries.append({
+                "loc": loc,
+                "lastmod": (node.findtext("{*}lastmod") or "").strip() or None,
+                "title": (node.findtext("{*}news/{*}title") or "").strip() or None
+            })
+    return kind, entries
+
+
+def fetch_fallback(fallback: dict, source: dict, parser: str = "html.parser") -> tuple[str, list[dict], list[str]]:
+    """
+    Fetch a configured fallback and return it in page_structure's shape.
+
+    "url" is another HTML page for the same content, "rss" a feed whose entries
+    stand in for links and blocks, "sitemap" a sitemap whose URLs (with their
+    lastmod) do.
+    """
+    url = fallback["url"]
+    kind = fallback.get("type", "url")
+    response = http_client.get(url, headers=HEADERS, timeout=TIMEOUT)
+    response.raise_for_status()
+
+    if kind == "rss":
+        if feedparser is None:
+            raise ValueError("feedparser is not installed")
+        entries = [entry for entry in feedparser.parse(response.content).entries if entry.get("link")]
+        links = [{"text": entry.get("title", entry["link"])[:100], "url": entry["link"]} for entry in entries]
+        blocks = [f"{entry.get('title', '')} {entry.get('summary', '')}" for entry in entries]
+        return " ".join(blocks), links, blocks
+    if kind == "sitemap":
+        _, entries = parse_sitemap(response.content)
+        links = [{"text": e["loc"][:100], "url": e["loc"]} for e in entries]
+        blocks = [f"{e['loc']} {e['lastmod'] or ''}" for e in entries]
+        return " ".join(blocks), links, blocks
+    return page_structure(response.text, url, parser, ignore_rules(source)[0])
+
+
+def check_single_page(source: dict, url: str, section_name: str, stored_hashes: dict,
+                      parser: str = "html.parser", snapshots: dict | None = None) -> dict:
+    """
+    Check a single page for added links or content blocks.
+
+    Without a stored snapshot (first check) the page is only recorded.
+    Empty or collapsed extractions are failures: the page's fallbacks are
+    tried, and a page that stays empty is only re-fetched every
+    EMPTY_RETRY_DAYS. The result's "snapshot" is what to store for the page.
+    """
     source_id = source.get("id", "unknown")
     hash_key = f"{source_id}:{section_name}"
+    previous = (snapshots or {}).get(hash_key) or {}
+    health = dict(previous.get("extraction", {}))
+    fallbacks = page_fallbacks(source, section_name)
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
     result = {
         "source_id": source_id,
@@ -184,29 +479,89 @@ def check_single_page(source: dict, url: str, section_name: str, stored_hashes:
         "new_hash": None,
         "old_hash": stored_hashes.get(hash_key),
         "notable_links": [],
+        "new_blocks": [],
+        "snapshot": None,
+        "fallback": None,  # "<type>:<url>" when a fallback supplied the content
+        "extraction_failed": False,
+        "skipped": False,
         "error": None,
         "last_checked": datetime.now(timezone.utc).isoformat()
     }
 
+    # Known-empty page: don't spend a request on it until the retry is due
+    retry_after = (datetime.fromisoformat(health.get("last_attempt", "2000-01-01"))
+                   + timedelta(days=EMPTY_RETRY_DAYS)).strftime("%Y-%m-%d")
+    primary_broken = health.get("empty_runs", 0) >= EMPTY_BACKOFF_RUNS and today < retry_after
+    if primary_broken and not fallbacks:
+        result["skipped"] = True
+        result["error"] = f"Skipped: extraction empty for {health['empty_runs']} runs, retrying on {retry_after}"
+        logger.info(f"Skipping: {source_id} - {section_name} (empty for {health['empty_runs']} runs)")
+        return result
+
+    ignore_selectors, ignore_pattern = ignore_rules(source)
     try:
-        logger.info(f"Checking: {source_id} - {section_name}")
-        response = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
-        response.raise_for_status()
-
-        # Extract main content and hash it
-        content = extract_main_content(response.text, url)
-        new_hash = content_hash(content)
-        result["new_hash"] = new_hash
-
-        # Compare with stored hash
-        old_hash = stored_hashes.get(hash_key)
-        if old_hash is None:
-            logger.info(f"  First check - storing initial hash")
-            result["change_detected"] = False  # First time, not a "change"
-        elif old_hash != new_hash:
-            logger.info(f"  CHANGE DETECTED!")
+        extracted, problem = None, None
+        if primary_broken:
+            problem = f"extraction empty for {health['empty_runs']} runs"
+            logger.info(f"Checking: {source_id} - {section_name} via fallback ({problem})")
+        else:
+            logger.info(f"Checking: {source_id} - {section_name}")
+            response = http_client.get(url, headers=HEADERS, timeout=TIMEOUT)
+            response.raise_for_status()
+
+            # Parse once: text for the hash, links and blocks for the snapshot
+            extracted = page_structure(response.text, url, parser, ignore_selectors)
+            text_length = len(" ".join(extracted[0].split()))
+            problem = extraction_problem(text_length, len(extracted[1]), health.get("history", []))
+            health["last_attempt"] = today
+            if problem:
+                health["empty_runs"] = health.get("empty_runs", 0) + 1
+                logger.warning(f"  {problem}")
+            else:
+                health["empty_runs"] = 0
+                health["history"] = (health.get("history", []) + [[today, text_length, len(extracted[1])]])[
+                    -EXTRACTION_HISTORY:]
+
+        if problem:
+            extracted = None
+            for fallback in fallbacks:
+                via = f"{fallback.get('type', 'url')}:{fallback['url']}"
+                try:
+                    candidate = fetch_fallback(fallback, source, parser)
+                except (requests.RequestException, ElementTree.ParseError, ValueError) as e:
+                    logger.warning(f"  Fallback {via} failed: {e}")
+                    continue
+                if len(candidate[0].strip()) >= MIN_TEXT_CHARS or candidate[1]:
+                    extracted, result["fallback"] = candidate, via
+                    logger.info(f"  Using fallback {via}")
+                    break
+
+        if extracted is None:
+            # Keep the last good snapshot, only the extraction stats move on
+            result["extraction_failed"] = True
+            result["error"] = f"Extraction failed: {problem}" + (" (fallbacks failed too)" if fallbacks else "")
+            result["snapshot"] = {**previous, "extraction": health}
+            return result
+
+        content, links, blocks = page_elements(*extracted, ignore_pattern)
+        result["new_hash"] = content_hash(content)
+
+        # Compare with the stored snapshot; only additions count as a change.
+        # Switching between the page and a fallback starts a new baseline.
+        baseline = previous if "links" in previous and previous.get("via") == result["fallback"] else None
+        new_links, new_blocks, snapshot = diff_snapshot(baseline, links, blocks, today)
+        result["snapshot"] = {**snapshot, "extraction": health}
+        if result["fallback"]:
+            result["snapshot"]["via"] = result["fallback"]
+        if baseline is None:
+            logger.info(f"  First check - storing initial snapshot")  # First time, not a "change"
+        elif new_links or new_blocks:
+            logger.info(f"  CHANGE DETECTED: {len(new_links)} new links, {len(new_blocks)} new blocks")
             result["change_detected"] = True
-            result["notable_links"] = extract_links(response.text, url)
+            result["notable_links"] = new_links[:MAX_LINKS]
+            result["new_blocks"] = [block[:300] for block in new_blocks[:MAX_NEW_BLOCKS]]
+        elif result["old_hash"] and result["old_hash"] != result["new_hash"]:
+            logger.info(f"  No new links or blocks (text changed)")
         else:
             logger.info(f"  No change")
 
@@ -219,12 +574,197 @@ def check_single_page(source: dict, url: str, section_name: str, stored_hashes:
     return result
 
 
-def monitor_source(source: dict, stored_hashes: dict) -> list[dict]:
-    """Monitor all sections of a single source."""
-    results = []
+def sitemap_url(source: dict) -> str:
+    """A sitemap source's "sitemap" URL, or /sitemap.xml on its site."""
+    return source.get("sitemap") or urljoin(source.get("url", ""), "/sitemap.xml")
+
+
+def fetch_sitemap(url: str, validators: dict) -> tuple[str | None, list[dict], dict]:
+    """
+    Conditionally fetch and parse one sitemap file.
+
+    Returns (kind, entries, validators); kind is "urlset" or "sitemapindex",
+    or None when the server answered 304 Not Modified.
+    """
+    headers = dict(HEADERS)
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    response = http_client.get(url, headers=headers, timeout=TIMEOUT)
+    response.raise_for_status()
+    if response.status_code == 304:
+        return None, [], validators
+
+    content = response.content
+    if content[:2] == b"\x1f\x8b":  # sitemap.xml.gz served without Content-Encoding
+        content = gzip.decompress(content)
+    kind, entries = parse_sitemap(content)
+    return kind, entries, {"etag": response.headers.get("ETag"),
+                           "last_modified": response.headers.get("Last-Modified")}
+
+
+def _sitemap_files(source: dict, url: str, previous_files: dict[str, dict], delay: float) -> tuple[dict, bool]:
+    """
+    Current state of a sitemap and its child sitemaps: url -> {validators,
+    lastmod, entries}. Files that answer 304, or index children whose lastmod
+    is unchanged, keep their stored entries without being parsed.
+    Returns (files, whether anything was re-read).
+    """
+    include = _compile_ignore_patterns(tuple(source.get("sitemap_include", [])))
+    previous = previous_files.get(url, {})
+    kind, entries, validators = fetch_sitemap(url, previous)
+    if kind is None:
+        return previous_files, False
+
+    if kind == "urlset":
+        return {url: {**validators, "entries": {
+            e["loc"]: [e["lastmod"], e["title"]] for e in entries if not include or include.search(e["loc"])
+        }}}, True
+
+    # Sitemap index: only re-read children whose lastmod moved
+    files = {url: {**validators, "index": True}}
+    children = sorted(entries, key=lambda e: e["lastmod"] or "", reverse=True)[:MAX_CHILD_SITEMAPS]
+    for child in children:
+        stored = previous_files.get(child["loc"])
+        if stored and child["lastmod"] and stored.get("lastmod") == child["lastmod"]:
+            files[child["loc"]] = stored
+            continue
+        time.sleep(delay)
+        try:
+            child_kind, child_entries, child_validators = fetch_sitemap(child["loc"], stored or {})
+        except (requests.RequestException, ElementTree.ParseError, OSError, EOFError) as e:
+            logger.warning(f"  Child sitemap {child['loc']} failed: {e}")
+            if stored:
+                files[child["loc"]] = stored
+            continue
+        if child_kind is None:
+            files[child["loc"]] = {**stored, "lastmod": child["lastmod"]}
+        elif child_kind == "urlset":
+            files[child["loc"]] = {**child_validators, "lastmod": child["lastmod"], "entries": {
+                e["loc"]: [e["lastmod"], e["title"]] for e in child_entries if not include or include.search(e["loc"])
+            }}
+        else:
+            logger.warning(f"  Skipping nested sitemap index {child['loc']}")
+    return files, True
+
+
+def sitemap_item(source: dict, loc: str, lastmod: str | None, title: str | None, change: str) -> dict:
+    """A new_items entry for a sitemap URL (the title comes from the URL unless the sitemap has one)."""
+    slug = urlparse(loc).path.rstrip("/").rsplit("/", 1)[-1]
+    slug = re.sub(r"\.(s?html?|php|aspx?|jsp)$", "", slug, flags=re.IGNORECASE)
+    return {
+        "title": title or re.sub(r"[-_]+", " ", slug).strip() or loc,
+        "url": loc,
+        "published": lastmod or "",
+        "snippet": "",
+        "focus_areas": source.get("focus_areas", []),
+        "source_id": source.get("id", "unknown"),
+        "source_name": source.get("name", source.get("id", "unknown")),
+        "method": "sitemap",
+        "change": change  # "new" or "modified"
+    }
+
+
+def check_sitemap_source(source: dict, state: dict | None, stored_hashes: dict, delay: float,
+                         parser: str = "html.parser", snapshots: dict | None = None) -> list[dict]:
+    """
+    Check a "sitemap" source: diff its sitemap's URL + lastmod entries against
+    the stored state and report new or modified URLs as items.
+
+    The first check only records the sitemap. If the site has no sitemap, its
+    pages are checked like a webfetch source instead, and the sitemap is only
+    probed again after SITEMAP_RETRY_DAYS. Each result's "sitemap_state" is
+    what to store for the source.
+    """
     source_id = source.get("id", "unknown")
+    url = sitemap_url(source)
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    state = state if state and state.get("sitemap") == url else {}
+
+    result = {
+        "source_id": source_id,
+        "source_name": source.get("name", source_id),
+        "section": SITEMAP_SECTION,
+        "url": url,
+        "success": False,
+        "change_detected": False,
+        "items": [],
+        "sitemap_state": None,
+        "sitemap_not_modified": False,
+        "error": None,
+        "last_checked": datetime.now(timezone.utc).isoformat()
+    }
+
+    def html_fallback() -> list[dict]:
+        result["success"] = True
+        result["sitemap_missing"] = True
+        results = [result]
+        for page_url, section_name in source_pages(source):
+            time.sleep(delay)
+            results.append(check_single_page(source, page_url, section_name, stored_hashes, parser, snapshots))
+        return results
+
+    retry_after = (datetime.fromisoformat(state.get("missing", "2000-01-01"))
+                   + timedelta(days=SITEMAP_RETRY_DAYS)).strftime("%Y-%m-%d")
+    if state.get("missing") and today < retry_after:
+        logger.info(f"Checking: {source_id} - no sitemap (next probe {retry_after}), checking pages")
+        return html_fallback()
 
-    # Get URLs to check
+    try:
+        logger.info(f"Checking: {source_id} - sitemap ({url})")
+        files, changed = _sitemap_files(source, url, state.get("files", {}), delay)
+    except requests.RequestException as e:
+        status = e.response.status_code if isinstance(e, requests.HTTPError) and e.response is not None else None
+        if status not in (404, 410):
+            result["error"] = str(e)
+            logger.error(f"  Error checking {source_id} sitemap: {e}")
+            return [result]
+        logger.info(f"  No sitemap ({status}), checking pages")
+        result["sitemap_state"] = {"sitemap": url, "missing": today}
+        return html_fallback()
+    except (ElementTree.ParseError, OSError, EOFError) as e:
+        logger.info(f"  Unreadable sitemap ({e}), checking pages")
+        result["sitemap_state"] = {"sitemap": url, "missing": today}
+        return html_fallback()
+
+    result["success"] = True
+    result["sitemap_state"] = {"sitemap": url, "checked": today, "files": files}
+    if not changed:
+        result["sitemap_not_modified"] = True
+        logger.info(f"  Not modified")
+        return [result]
+
+    def all_entries(by_file: dict) -> dict[str, list]:
+        return {loc: value for f in by_file.values() for loc, value in f.get("entries", {}).items()}
+
+    if not state.get("files"):
+        logger.info(f"  First check - storing {len(all_entries(files))} sitemap URLs")
+        return [result]
+
+    old, new = all_entries(state["files"]), all_entries(files)
+    items = [
+        sitemap_item(source, loc, lastmod, title, "new" if loc not in old else "modified")
+        for loc, (lastmod, title) in new.items()
+        if loc not in old or (lastmod and lastmod != old[loc][0])
+    ]
+    items.sort(key=lambda item: item["published"], reverse=True)
+    if len(items) > MAX_SITEMAP_ITEMS:
+        logger.warning(f"  {len(items)} new or modified URLs, reporting the {MAX_SITEMAP_ITEMS} most recent")
+    result["items"] = items[:MAX_SITEMAP_ITEMS]
+    logger.info(f"  {len(result['items'])} new or modified URLs" if items else "  No change")
+    return [result]
+
+
+def page_host(url: str) -> str:
+    """Hostname used to group pages into per-host queues."""
+    host = (urlparse(url).hostname or "").lower()
+    return host.removeprefix("www.")
+
+
+def source_pages(source: dict) -> list[tuple[str, str]]:
+    """List the (url, section_name) pages to check for a source."""
+    pages = []
     sections = source.get("sections", [])
     if sections:
         for section in sections:
@@ -236,34 +776,140 @@ def monitor_source(source: dict, stored_hashes: dict) -> list[dict]:
                 section_url = source.get("url", "").rstrip("/") + section_url
 
             if section_url:
-                result = check_single_page(source, section_url, section_name, stored_hashes)
-                results.append(result)
-                time.sleep(1)  # Rate limiting between sections
+                pages.append((section_url, section_name))
     else:
         # Just check main URL
         main_url = source.get("url", "")
         if main_url:
-            result = check_single_page(source, main_url, "main", stored_hashes)
-            results.append(result)
-
-    return results
+            pages.append((main_url, "main"))
+    return pages
+
+
+def page_change_record(result: dict) -> dict:
+    """The page_changes entry written for a changed page."""
+    return {
+        "source_id": result["source_id"],
+        "source_name": result["source_name"],
+        "section": result["section"],
+        "url": result["url"],
+        "change_detected": result["change_detected"],
+        "notable_links": result.get("notable_links", []),
+        "new_blocks": result.get("new_blocks", []),
+        "via": result.get("fallback"),
+        "last_checked": result["last_checked"]
+    }
 
 
-def monitor_all_sources(sources: list[dict], stored_hashes: dict, max_workers: int = 3) -> list[dict]:
-    """Monitor all sources with rate limiting."""
-    all_results = []
+def merge_page_output(existing: dict | None, output: dict) -> dict:
+    """
+    Merge this run's output into an existing new_items.json: fetch_rss
+    output, or monitor_pages output from another run (e.g. another tier).
+
+    Page changes are added, one per (source, section or URL); a page changed
+    in both runs keeps both runs' new links and blocks. Sitemap items are
+    added unless their URL is already there, and page stats are summed.
+    """
+    if not isinstance(existing, dict):
+        return output
+
+    changes = existing.setdefault("page_changes", [])
+    by_page = {(change.get("source_id"), change.get("section") or change.get("url")): change for change in changes}
+    for change in output["page_changes"]:
+        key = (change["source_id"], change["section"] or change["url"])
+        known = by_page.get(key)
+        if known is None:
+            changes.append(change)
+            by_page[key] = change
+            continue
+        known_urls = {link["url"] for link in known.get("notable_links", [])}
+        known["notable_links"] = known.get("notable_links", []) + [
+            link for link in change["notable_links"] if link["url"] not in known_urls]
+        known["new_blocks"] = known.get("new_blocks", []) + [
+            block for block in change["new_blocks"] if block not in known.get("new_blocks", [])]
+        known["last_checked"] = max(known.get("last_checked") or "", change["last_checked"])
+
+    items = existing.setdefault("items", [])
+    known_urls = {item.get("url") for item in items}
+    items.extend(item for item in output["items"] if item["url"] not in known_urls)
+    existing["new_items_count"] = len(items)
+
+    # A document written by monitor_pages itself keeps page stats under "stats"
+    standalone = "fetched_at" not in existing
+    stats = existing.setdefault("stats" if standalone else "page_monitor_stats", {})
+    for key, value in output["stats"].items():
+        stats[key] = stats.get(key, 0) + value
+    if standalone:
+        existing["checked_at"] = max(existing.get("checked_at") or "", output["checked_at"])
+        existing["tiers"] = sorted(set(existing.get("tiers", [])) | set(output["tiers"]))
+        existing.setdefault("errors", []).extend(output["errors"])
+    return existing
+
+
+def monitor_host(tasks: list[tuple[int, dict, str, str]], stored_hashes: dict, delay: float,
+                 parser: str = "html.parser",
+                 on_result: Callable[[dict], None] | None = None,
+                 snapshots: dict | None = None,
+                 sitemap_state: dict | None = None) -> list[tuple[int, dict]]:
+    """Check one host's pages (and sitemaps) in order, waiting `delay` seconds between requests."""
+    results = []
+    for i, (index, source, url, section_name) in enumerate(tasks):
+        if i > 0:
+            time.sleep(delay)
+        if source.get("method") == "sitemap":
+            page_results = check_sitemap_source(source, (sitemap_state or {}).get(source.get("id")),
+                                                stored_hashes, delay, parser, snapshots)
+        else:
+            page_results = [check_single_page(source, url, section_name, stored_hashes, parser, snapshots)]
+        for result in page_results:
+            if on_result:
+                on_result(result)
+            results.append((index, result))
+    return results
 
-    # Process sources sequentially to respect rate limits
-    # (We could parallelize, but government sites often have strict limits)
-    for i, source in enumerate(sources):
-        results = monitor_source(source, stored_hashes)
-        all_results.extend(results)
 
-        # Delay between sources
-        if i < len(sources) - 1:
-            time.sleep(2)
+def monitor_all_sources(sources: list[dict], stored_hashes: dict, max_hosts: int = DEFAULT_MAX_HOSTS,
+                        parser: str = "html.parser",
+                        on_result: Callable[[dict], None] | None = None,
+                        snapshots: dict | None = None,
+                        sitemap_state: dict | None = None) -> list[dict]:
+    """
+    Monitor all sources, checking different hosts in parallel.
+
+    Each host gets its own queue so politeness delays only apply between
+    requests to the same host. The delay for a host is the largest
+    "request_delay" among its sources (DEFAULT_HOST_DELAY if none is set).
+    Results are returned in source/section order. on_result, if given, is
+    called from the worker threads as each page finishes. A sitemap source is
+    one task on its sitemap's host (its pages are only checked, on the same
+    queue, when it has no sitemap).
+    """
+    host_tasks: dict[str, list[tuple[int, dict, str, str]]] = defaultdict(list)
+    host_delays: dict[str, float] = {}
+    index = 0
+
+    for source in sources:
+        delay = source.get("request_delay", DEFAULT_HOST_DELAY)
+        pages = [(sitemap_url(source), SITEMAP_SECTION)] if source.get("method") == "sitemap" else source_pages(source)
+        for url, section_name in pages:
+            host = page_host(url)
+            host_tasks[host].append((index, source, url, section_name))
+            host_delays[host] = max(host_delays.get(host, 0.0), delay)
+            index += 1
+
+    logger.info(f"Scheduling {index} pages across {len(host_tasks)} hosts ({max_hosts} in parallel)")
+
+    indexed_results = []
+    with ThreadPoolExecutor(max_workers=max(1, max_hosts)) as executor:
+        futures = [
+            executor.submit(monitor_host, tasks, stored_hashes, host_delays[host], parser, on_result, snapshots,
+                            sitemap_state)
+            for host, tasks in host_tasks.items()
+        ]
+        for future in as_completed(futures):
+            indexed_results.extend(future.result())
 
-    return all_results
+    indexed_results.sort(key=lambda pair: pair[0])
+    return [result for _, result in indexed_results]
 
 
 def main():
@@ -271,7 +917,17 @@ def main():
     parser.add_argument("--tier", type=int, choices=[1, 2, 3, 4, 5], help="Tier to monitor (1-5)")
     parser.add_argument("--all", action="store_true", help="Monitor all tiers")
     parser.add_argument("--dry-run", action="store_true", help="Preview without saving hashes")
-    parser.add_argument("--output", type=str, help="Output file path")
+    parser.add_argument("--output", type=str, help="Output file path (default: new_items.json / new_items.ndjson)")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json",
+                        help="json: merge into new_items.json; ndjson: append page changes as they are found")
+    parser.add_argument("--gzip", action="store_true", help="With --format=ndjson, append to new_items.ndjson.gz")
+    parser.add_argument("--max-hosts", type=int, default=DEFAULT_MAX_HOSTS,
+                        help=f"Number of hosts to check in parallel (default: {DEFAULT_MAX_HOSTS})")
+    parser.add_argument("--parser", choices=["auto", "selectolax", "lxml", "html.parser"], default="auto",
+                        help="HTML parser backend (default: auto, the fastest installed). "
+                             "Switching backends can change hashes once on malformed pages.")
+    parser.add_argument("--due-only", action="store_true",
+                        help="Only check sources that are due (check_frequency, adapted to how often they change)")
     args = parser.parse_args()
 
     # Determine which tiers to check
@@ -287,43 +943,83 @@ def main():
     # Load sources
     sources = load_source_configs(tiers)
     if not sources:
-        logger.warning("No webfetch sources found for specified tiers")
+        logger.warning("No webfetch or sitemap sources found for specified tiers")
         return
 
-    logger.info(f"Found {len(sources)} webfetch sources to monitor")
+    logger.info(f"Found {len(sources)} webfetch/sitemap sources to monitor")
+
+    # Skip sources that are not due yet
+    schedule_conn = scheduler.connect()
+    if args.due_only:
+        if args.dry_run:
+            for line in scheduler.format_report(schedule_conn, sources):
+                logger.info(line)
+        sources, not_due = scheduler.select_due(schedule_conn, sources)
+        logger.info(f"{len(sources)} sources due, {len(not_due)} skipped until their next check")
+        if not sources:
+            schedule_conn.close()
+            return
 
     # Load stored hashes
     stored_hashes = load_page_hashes()
-    logger.info(f"Loaded {len(stored_hashes)} stored page hashes")
+    snapshots = load_page_snapshots()
+    sitemap_state = load_sitemap_state()
+    logger.info(f"Loaded {len(stored_hashes)} stored page hashes, {len(snapshots)} page snapshots")
+
+    # In NDJSON mode, append each change as it is found instead of rewriting new_items.json
+    stream = None
+    on_result = None
+    if args.format == "ndjson" and not args.dry_run:
+        default_name = "new_items.ndjson.gz" if args.gzip else "new_items.ndjson"
+        output_path = Path(args.output) if args.output else OUTPUT_DIR / default_name
+        stream = NDJSONWriter(output_path, append=True, shared=True)
+
+        def on_result(result: dict):
+            if result.get("change_detected"):
+                stream.write("page_change", page_change_record(result))
+            for item in result.get("items", []):
+                stream.write("item", item)
+    else:
+        output_path = Path(args.output) if args.output else OUTPUT_DIR / "new_items.json"
 
     # Monitor all sources
-    results = monitor_all_sources(sources, stored_hashes)
+    start = time.monotonic()
+    html_parser = resolve_parser(args.parser)
+    logger.info(f"Using HTML parser: {html_parser}")
+    results = monitor_all_sources(sources, stored_hashes, max_hosts=args.max_hosts, parser=html_parser,
+                                  on_result=on_result, snapshots=snapshots, sitemap_state=sitemap_state)
+    logger.info(f"Checked {len(results)} pages in {time.monotonic() - start:.1f}s")
 
     # Prepare output
     changes = [r for r in results if r.get("change_detected")]
+    sitemap_items = [item for r in results for item in r.get("items", [])]
+    sitemap_results = [r for r in results if r["section"] == SITEMAP_SECTION and "items" in r]
     stats = {
         "total_pages": len(results),
         "successful": len([r for r in results if r.get("success")]),
-        "failed": len([r for r in results if not r.get("success")]),
-        "changes_detected": len(changes)
+        "failed": len([r for r in results if not r.get("success") and not r.get("skipped")]),
+        "extraction_failures": len([r for r in results if r.get("extraction_failed")]),
+        "fallbacks_used": len([r for r in results if r.get("fallback")]),
+        "skipped_empty": len([r for r in results if r.get("skipped")]),
+        "changes_detected": len(changes),
+        # Text changed but nothing was added (counters, dates, rotating content)
+        "text_only_changes": len([
+            r for r in results
+            if not r.get("change_detected") and not r.get("fallback") and r.get("old_hash")
+            and r.get("new_hash") and r["old_hash"] != r["new_hash"]
+        ]),
+        "sitemaps_checked": len(sitemap_results),
+        "sitemaps_not_modified": len([r for r in sitemap_results if r.get("sitemap_not_modified")]),
+        "sitemaps_missing": len([r for r in sitemap_results if r.get("sitemap_missing")]),
+        "sitemap_items": len(sitemap_items)
     }
 
     output = {
         "checked_at": datetime.now(timezone.utc).isoformat(),
         "tiers": tiers,
         "stats": stats,
-        "page_changes": [
-            {
-                "source_id": r["source_id"],
-                "source_name": r["source_name"],
-                "section": r["section"],
-                "url": r["url"],
-                "change_detected": r["change_detected"],
-                "notable_links": r.get("notable_links", []),
-                "last_checked": r["last_checked"]
-            }
-            for r in results if r.get("change_detected")
-        ],
+        "page_changes": [page_change_record(r) for r in results if r.get("change_detected")],
+        "items": sitemap_items,  # New or modified URLs from sitemap sources
         "errors": [
             {
                 "source_id": r["source_id"],
@@ -336,47 +1032,70 @@ def main():
 
     # Update stored hashes (unless dry run)
     if not args.dry_run:
+        hash_updates = {
+            f"{result['source_id']}:{result['section']}": result["new_hash"]
+            for result in results
+            if result.get("success") and result.get("new_hash")
+        }
+        update_page_hashes(hash_updates)
+        update_page_snapshots({
+            f"{result['source_id']}:{result['section']}": result["snapshot"]
+            for result in results
+            if result.get("snapshot") is not None
+        })
+        update_sitemap_state({
+            result["source_id"]: result["sitemap_state"]
+            for result in results
+            if result.get("sitemap_state") is not None
+        })
+        logger.info(f"Updated page hashes, snapshots and sitemap state saved to {STATE_DIR}")
+
+        # A source counts as checked if any of its pages loaded, and as changed if any page changed
+        outcomes = {}
         for result in results:
-            if result.get("success") and result.get("new_hash"):
-                hash_key = f"{result['source_id']}:{result['section']}"
-                stored_hashes[hash_key] = result["new_hash"]
-        save_page_hashes(stored_hashes)
-        logger.info(f"Updated page hashes saved to {HASHES_FILE}")
+            if result.get("skipped"):
+                continue  # No request was made
+            source_id = result["source_id"]
+            success, changed = outcomes.get(source_id, (False, False))
+            outcomes[source_id] = (success or bool(result.get("success")),
+                                   changed or bool(result.get("change_detected") or result.get("items")))
+        with schedule_conn:
+            scheduler.record_checks(schedule_conn, [
+                (source, *outcomes[source["id"]]) for source in sources if source.get("id") in outcomes
+            ])
+    schedule_conn.close()
 
     # Write output or merge with existing new_items.json
-    output_path = Path(args.output) if args.output else OUTPUT_DIR / "new_items.json"
-
     if args.dry_run:
         logger.info("=== DRY RUN - Not saving hashes ===")
         print(json.dumps(output, indent=2))
+    elif stream:
+        stream.write("page_run", {key: output[key] for key in ("checked_at", "tiers", "stats", "errors")})
+        stream.close()
+        logger.info(f"Appended {stream.counts['page_change']} page changes and "
+                    f"{stream.counts['item']} sitemap items to: {output_path}")
     else:
-        # Try to merge with existing new_items.json
-        if output_path.exists():
-            try:
-                with open(output_path) as f:
-                    existing = json.load(f)
-                # Merge page_changes into existing
-                existing["page_changes"] = output["page_changes"]
-                existing["page_monitor_stats"] = stats
-                with open(output_path, "w") as f:
-                    json.dump(existing, f, indent=2)
-                logger.info(f"Merged page changes into: {output_path}")
-            except (json.JSONDecodeError, IOError):
-                # Write standalone output
-                with open(output_path, "w") as f:
-                    json.dump(output, f, indent=2)
-        else:
-            with open(output_path, "w") as f:
-                json.dump(output, f, indent=2)
+        # Merge into an existing new_items.json under the lock (other tiers may
+        # be merging too), or write standalone output if there is none
+        merged = update_json(output_path, lambda existing: merge_page_output(existing, output))
+        if merged is output:
             logger.info(f"Output saved to: {output_path}")
+        else:
+            logger.info(f"Merged page changes into: {output_path}")
 
     # Summary
     logger.info("=" * 50)
     logger.info(f"Monitoring complete!")
     logger.info(f"  Pages checked: {stats['total_pages']}")
     logger.info(f"  Successful: {stats['successful']}")
-    logger.info(f"  Failed: {stats['failed']}")
+    logger.info(f"  Failed: {stats['failed']} (empty or collapsed extraction: {stats['extraction_failures']})")
+    logger.info(f"  Served by fallbacks: {stats['fallbacks_used']}")
+    logger.info(f"  Skipped (known empty): {stats['skipped_empty']}")
     logger.info(f"  CHANGES DETECTED: {stats['changes_detected']}")
+    logger.info(f"  Text-only changes ignored: {stats['text_only_changes']}")
+    logger.info(f"  Sitemaps: {stats['sitemaps_checked']} checked, {stats['sitemaps_not_modified']} not modified, "
+                f"{stats['sitemaps_missing']} missing; {stats['sitemap_items']} new or modified URLs")
+    http_client.log_latency_report(logger)
 
     if changes:
         logger.info("\nPages with changes:")
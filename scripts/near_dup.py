@@ -0,0 +1,299 @@
+"""
+Near-Duplicate Item Clustering for TMT Legal Intelligence
+
+The same notice is often covered by several outlets (MediaNama, LiveLaw,
+Bar & Bench, ...) under different URLs, so exact-URL dedup lets every copy
+through. fetch_rss.py runs new items through this module to fold them into
+one canonical item per story:
+
+- Each item's title, and its title + snippet, are reduced to sets of word
+  tokens with a MinHash signature each; signatures are split into LSH bands,
+  so only items that share a band are compared (roughly linear in the
+  number of items)
+- Candidates from different sources count as the same story when their
+  titles are near-identical (TITLE_THRESHOLD), or their title + snippet
+  tokens overlap by SIMILARITY_THRESHOLD and their titles share a core
+  (MIN_TITLE_SIMILARITY). Items from one source are never folded together:
+  a feed's own series posts and boilerplate snippets look alike
+- Items from this run are clustered together; fingerprints of recent items
+  are kept in the item_fingerprints / item_bands tables of seen_items.db, so
+  items covering a story already reported in the last few days are recognised
+
+Usage:
+    from near_dup import NearDuplicateIndex
+
+    index = NearDuplicateIndex(conn, lookback_days=3)
+    match = index.add(item)          # None if new, else the earlier match
+    canonical = index.canonical_items()
+"""
+
+import hashlib
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+NUM_PERM = 32                 # MinHash signature length
+BANDS = 16                    # LSH bands of NUM_PERM // BANDS rows each
+TITLE_THRESHOLD = 0.6         # Jaccard similarity of title tokens alone
+SIMILARITY_THRESHOLD = 0.5    # Jaccard similarity of title + snippet tokens...
+MIN_TITLE_SIMILARITY = 0.25   # ...when the titles also overlap this much
+DEFAULT_LOOKBACK_DAYS = 3     # Compare against items first seen this recently
+KEEP_DAYS = 30                # Fingerprints older than this are pruned
+MIN_TOKENS = 4                # Items with fewer title tokens are never clustered
+SQL_CHUNK_SIZE = 500
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# Fixed permutation parameters so signatures are comparable across runs
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.sha256(f"a{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME | 1,
+     int.from_bytes(hashlib.sha256(f"b{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME)
+    for i in range(NUM_PERM)
+]
+_WORD = re.compile(r"[a-z0-9]+")
+_TAG = re.compile(r"<[^>]+>|&\w+;")
+_SUFFIXES = ("ing", "ied", "ies", "ed", "es", "s", "e")
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in into is it its of on or that the their this to was were
+    will with after over under new says said via more than about amid also can may not no
+""".split())
+
+
+def _stem(word: str) -> str:
+    """Crude suffix folding so notifies/notified and rule/rules compare equal."""
+    if len(word) > 3 and not word.isdigit() and not word.endswith("ss"):
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                return word[:-len(suffix)]
+    return word
+
+
+def tokenize(title: str, snippet: str = "") -> frozenset[str]:
+    """Normalized content words of title + snippet (lowercase, no stopwords, suffixes folded)."""
+    text = _TAG.sub(" ", f"{title} {snippet}").lower()
+    return frozenset(_stem(word) for word in _WORD.findall(text) if len(word) > 1 and word not in STOPWORDS)
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def minhash(tokens: frozenset[str]) -> list[int]:
+    """MinHash signature (NUM_PERM values) of a token set."""
+    hashes = [_token_hash(token) for token in tokens]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_keys(signature: list[int]) -> list[str]:
+    """LSH bucket keys: items that share any key are compared."""
+    rows = NUM_PERM // BANDS
+    return [
+        f"{band}:" + hashlib.blake2b(
+            ",".join(str(v) for v in signature[band * rows:(band + 1) * rows]).encode(), digest_size=8
+        ).hexdigest()
+        for band in range(BANDS)
+    ]
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def fingerprint(item: dict) -> tuple[frozenset[str], frozenset[str], list[str]]:
+    """Title tokens, title + snippet tokens, and LSH band keys for both (none for very short titles)."""
+    title_tokens = tokenize(item.get("title", ""))
+    tokens = title_tokens | tokenize("", item.get("snippet", ""))
+    if len(title_tokens) < MIN_TOKENS:
+        return title_tokens, tokens, []
+    keys = [f"t{key}" for key in band_keys(minhash(title_tokens))]
+    if tokens != title_tokens:
+        keys += [f"c{key}" for key in band_keys(minhash(tokens))]
+    return title_tokens, tokens, keys
+
+
+def same_story(a: tuple[frozenset[str], frozenset[str]], b: tuple[frozenset[str], frozenset[str]]) -> float:
+    """Similarity of two (title tokens, all tokens) pairs if they count as the same story, else 0."""
+    title_similarity = jaccard(a[0], b[0])
+    if title_similarity >= TITLE_THRESHOLD:
+        return title_similarity
+    if title_similarity >= MIN_TITLE_SIMILARITY:
+        similarity = jaccard(a[1], b[1])
+        if similarity >= SIMILARITY_THRESHOLD:
+            return similarity
+    return 0.0
+
+
+def init_tables(conn: sqlite3.Connection):
+    """Create the fingerprint tables in seen_items.db if needed."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS item_fingerprints (
+            url TEXT PRIMARY KEY,
+            title TEXT,
+            source_id TEXT,
+            title_tokens TEXT,
+            tokens TEXT,
+            first_seen TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fingerprints_first_seen ON item_fingerprints(first_seen)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS item_bands (
+            band_key TEXT,
+            url TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_item_bands_key ON item_bands(band_key)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_item_bands_url ON item_bands(url)")
+    conn.commit()
+
+
+class NearDuplicateIndex:
+    """
+    Clusters the items of one run, and matches them against recent runs.
+
+    Items are added in arrival order; the first item of a cluster is its
+    representative until canonical_items() picks the best one.
+    """
+
+    def __init__(self, conn: sqlite3.Connection | None = None, lookback_days: int = DEFAULT_LOOKBACK_DAYS):
+        self.conn = conn
+        self.since = (datetime.now(timezone.utc) - timedelta(days=lookback_days)).isoformat()
+        self.items: list[dict] = []
+        self._tokens: list[tuple[frozenset[str], frozenset[str]]] = []
+        self._bands: list[list[str]] = []
+        self._parent: list[int] = []
+        self._buckets: dict[str, list[int]] = {}
+        self.earlier: list[tuple[dict, dict]] = []   # (item, match from an earlier run)
+        self.stats = {"clustered": 0, "earlier": 0}
+
+    def _root(self, i: int) -> int:
+        while self._parent[i] != i:
+            self._parent[i] = self._parent[self._parent[i]]
+            i = self._parent[i]
+        return i
+
+    def _union(self, i: int, j: int):
+        # The earlier item stays the root, so streamed output keeps its first copy
+        ri, rj = self._root(i), self._root(j)
+        if ri != rj:
+            self._parent[max(ri, rj)] = min(ri, rj)
+
+    def _earlier_match(self, item: dict, tokens: tuple, keys: list[str]) -> dict | None:
+        """Best match among items other sources published in the lookback window, if any."""
+        if self.conn is None:
+            return None
+        rows = self.conn.execute(f"""
+            SELECT DISTINCT f.url, f.title, f.source_id, f.title_tokens, f.tokens
+            FROM item_bands b JOIN item_fingerprints f ON f.url = b.url
+            WHERE b.band_key IN ({','.join('?' * len(keys))}) AND f.first_seen >= ? AND f.source_id != ?
+        """, [*keys, self.since, item.get("source_id")]).fetchall()
+        best = None
+        for url, title, source_id, title_tokens, stored in rows:
+            similarity = same_story(tokens, (frozenset(title_tokens.split()), frozenset(stored.split())))
+            if similarity and (best is None or similarity > best["similarity"]):
+                best = {"url": url, "title": title, "source_id": source_id, "similarity": round(similarity, 2)}
+        return best
+
+    def add(self, item: dict) -> dict | None:
+        """
+        Add a new item (with its source_id set). Returns None if it starts a
+        new story, otherwise what it duplicates: {"earlier": match} for a
+        story from a previous run, or {"duplicate_of": representative item}
+        within this run.
+        """
+        title_tokens, tokens, keys = fingerprint(item)
+        index = len(self.items)
+        self.items.append(item)
+        self._tokens.append((title_tokens, tokens))
+        self._bands.append(keys)
+        self._parent.append(index)
+
+        earlier = self._earlier_match(item, self._tokens[index], keys) if keys else None
+        candidates = {i for key in keys for i in self._buckets.get(key, [])}
+        for key in keys:
+            self._buckets.setdefault(key, []).append(index)
+        for i in candidates:
+            if self.items[i].get("source_id") != item.get("source_id") and \
+                    same_story(self._tokens[index], self._tokens[i]):
+                self._union(index, i)
+
+        if earlier:
+            self.earlier.append((item, earlier))
+            self.stats["earlier"] += 1
+            return {"earlier": earlier}
+        root = self._root(index)
+        if root != index:
+            self.stats["clustered"] += 1
+            return {"duplicate_of": self.items[root]}
+        return None
+
+    def clusters(self) -> list[list[dict]]:
+        """Items of this run grouped by story, in order of each story's first item."""
+        groups: dict[int, list[dict]] = {}
+        for i, item in enumerate(self.items):
+            groups.setdefault(self._root(i), []).append(item)
+        return list(groups.values())
+
+    def canonical_items(self, rank=None) -> list[dict]:
+        """
+        One item per story not already reported in an earlier run.
+
+        `rank` orders a cluster's items (lowest first) to choose the canonical
+        one, e.g. by source tier; by default the first item wins. The others
+        are attached as alternate_sources, and their focus-area matches merged.
+        """
+        earlier_ids = {id(item) for item, _ in self.earlier}
+        canonical = []
+        for cluster in self.clusters():
+            if any(id(item) in earlier_ids for item in cluster):
+                continue
+            members = sorted(cluster, key=rank) if rank else cluster
+            best, alternates = dict(members[0]), members[1:]
+            if alternates:
+                best["alternate_sources"] = [alternate_source(item) for item in alternates]
+                merged_areas = dict(best.get("matched_focus_areas") or {})
+                for item in alternates:
+                    for area, keywords in (item.get("matched_focus_areas") or {}).items():
+                        merged_areas[area] = sorted(set(merged_areas.get(area, [])) | set(keywords), key=str.lower)
+                if merged_areas:
+                    best["matched_focus_areas"] = merged_areas
+            canonical.append(best)
+        return canonical
+
+    def record(self):
+        """Store this run's fingerprints and prune old ones. Does not commit."""
+        if self.conn is None:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [
+            (item["url"], item.get("title", ""), item.get("source_id"),
+             " ".join(sorted(title_tokens)), " ".join(sorted(tokens)), now)
+            for item, (title_tokens, tokens), keys in zip(self.items, self._tokens, self._bands)
+            if item.get("url") and keys
+        ]
+        self.conn.executemany("""
+            INSERT OR IGNORE INTO item_fingerprints (url, title, source_id, title_tokens, tokens, first_seen)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+        self.conn.executemany(
+            "INSERT INTO item_bands (band_key, url) VALUES (?, ?)",
+            [(key, item["url"]) for item, keys in zip(self.items, self._bands) if item.get("url") for key in keys]
+        )
+        prune(self.conn)
+
+
+def alternate_source(item: dict) -> dict:
+    """The fields of a folded duplicate that are kept on the canonical item."""
+    return {key: item.get(key) for key in ("source_id", "source_name", "url", "title", "published")}
+
+
+def prune(conn: sqlite3.Connection, keep_days: int = KEEP_DAYS):
+    """Drop fingerprints first seen more than keep_days ago. Does not commit."""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=keep_days)).isoformat()
+    old = [row[0] for row in conn.execute("SELECT url FROM item_fingerprints WHERE first_seen < ?", (cutoff,))]
+    for i in range(0, len(old), SQL_CHUNK_SIZE):
+        chunk = old[i:i + SQL_CHUNK_SIZE]
+        placeholders = ",".join("?" * len(chunk))
+        conn.execute(f"DELETE FROM item_bands WHERE url IN ({placeholders})", chunk)
+        conn.execute(f"DELETE FROM item_fingerprints WHERE url IN ({placeholders})", chunk)
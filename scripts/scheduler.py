@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Frequency-Aware Source Scheduler for TMT Legal Intelligence
+
+Decides which sources are due for a check, based on their tier's (or their
+own) check_frequency and on how often they have actually published. State is
+kept in the source_schedule table of sources/state/seen_items.db.
+
+- every_run sources are always due
+- daily / weekly / monthly sources start at 1 / 7 / 30 days between checks
+- each check that finds something new halves the interval, each check that
+  finds nothing stretches it by half again, within 1/4x..4x of the base
+- failed checks leave the source due, so it is retried on the next run
+
+fetch_rss.py and monitor_pages.py use this with --due-only.
+
+Usage:
+    python scheduler.py --all                 # Report which sources are due now
+    python scheduler.py --tier=3 --method=rss # Report for one tier and method
+"""
+
+import argparse
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import source_registry
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DB_PATH = PROJECT_ROOT / "sources" / "state" / "seen_items.db"
+
+# Base hours between checks per check_frequency
+FREQUENCY_HOURS = {
+    "every_run": 0,
+    "hourly": 1,
+    "daily": 24,
+    "weekly": 24 * 7,
+    "monthly": 24 * 30
+}
+DEFAULT_FREQUENCY = "daily"
+MIN_FACTOR = 0.25      # Busiest sources: 4x as often as the base frequency
+MAX_FACTOR = 4.0       # Quietest sources: a quarter as often
+SPEED_UP = 0.5         # Interval multiplier after a check that found something
+BACK_OFF = 1.5         # Interval multiplier after a check that found nothing
+DUE_SLACK_HOURS = 2    # Scheduled runs drift; treat "due within 2h" as due
+
+
+def init_schedule_table(conn: sqlite3.Connection):
+    """Create the source_schedule table if needed."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS source_schedule (
+            source_id TEXT PRIMARY KEY,
+            method TEXT,
+            frequency TEXT,
+            interval_hours REAL,
+            last_checked TEXT,
+            last_success TEXT,
+            last_change TEXT,
+            next_due TEXT,
+            checks INTEGER DEFAULT 0,
+            changes INTEGER DEFAULT 0,
+            failures INTEGER DEFAULT 0
+        )
+    """)
+    conn.commit()
+
+
+def connect(db_path: Path = DB_PATH) -> sqlite3.Connection:
+    """Open the state DB (WAL, waits on other processes) with the schedule table ready."""
+    conn = sqlite3.connect(db_path, timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    init_schedule_table(conn)
+    return conn
+
+
+def base_interval_hours(source: dict) -> float:
+    """Hours between checks implied by the source's check_frequency."""
+    frequency = source.get("check_frequency", DEFAULT_FREQUENCY)
+    return FREQUENCY_HOURS.get(frequency, FREQUENCY_HOURS[DEFAULT_FREQUENCY])
+
+
+def load_schedule(conn: sqlite3.Connection) -> dict[str, dict]:
+    """Load the schedule rows keyed by source id."""
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute("SELECT * FROM source_schedule").fetchall()
+    finally:
+        conn.row_factory = None
+    return {row["source_id"]: dict(row) for row in rows}
+
+
+def is_due(source: dict, entry: dict | None, now: datetime) -> bool:
+    """Whether a source should be checked in a run starting at `now`."""
+    if base_interval_hours(source) == 0 or not entry or not entry.get("next_due"):
+        return True
+    # A changed check_frequency in the config takes effect immediately
+    if entry.get("frequency") != source.get("check_frequency", DEFAULT_FREQUENCY):
+        return True
+    next_due = datetime.fromisoformat(entry["next_due"])
+    return next_due <= now + timedelta(hours=DUE_SLACK_HOURS)
+
+
+def select_due(conn: sqlite3.Connection, sources: list[dict],
+               now: datetime | None = None) -> tuple[list[dict], list[dict]]:
+    """Split sources into (due, not_due)."""
+    now = now or datetime.now(timezone.utc)
+    schedule = load_schedule(conn)
+    due, not_due = [], []
+    for source in sources:
+        (due if is_due(source, schedule.get(source.get("id")), now) else not_due).append(source)
+    return due, not_due
+
+
+def next_interval(source: dict, entry: dict | None, changed: bool) -> float:
+    """Adapt the interval: shorter after finding something new, longer after finding nothing."""
+    base = base_interval_hours(source)
+    if base == 0:
+        return 0
+    current = base
+    if entry and entry.get("interval_hours") and entry.get("frequency") == source.get("check_frequency", DEFAULT_FREQUENCY):
+        current = entry["interval_hours"]
+    current *= SPEED_UP if changed else BACK_OFF
+    return max(base * MIN_FACTOR, min(base * MAX_FACTOR, current))
+
+
+def record_checks(conn: sqlite3.Connection, outcomes: list[tuple[dict, bool, bool]],
+                  now: datetime | None = None):
+    """
+    Record (source, success, changed) outcomes for this run.
+
+    Successful checks move next_due forward by the adapted interval; failed
+    checks keep the previous next_due so the source stays due. Does not commit.
+    """
+    now = now or datetime.now(timezone.utc)
+    schedule = load_schedule(conn)
+    rows = []
+    for source, success, changed in outcomes:
+        source_id = source.get("id", "unknown")
+        entry = schedule.get(source_id) or {}
+        interval = entry.get("interval_hours") or base_interval_hours(source)
+        next_due = entry.get("next_due")
+        if success:
+            interval = next_interval(source, entry, changed)
+            next_due = (now + timedelta(hours=interval)).isoformat()
+        rows.append((
+            source_id,
+            source.get("method"),
+            source.get("check_frequency", DEFAULT_FREQUENCY),
+            interval,
+            now.isoformat(),
+            now.isoformat() if success else entry.get("last_success"),
+            now.isoformat() if success and changed else entry.get("last_change"),
+            next_due,
+            (entry.get("checks") or 0) + 1,
+            (entry.get("changes") or 0) + (1 if success and changed else 0),
+            (entry.get("failures") or 0) + (0 if success else 1)
+        ))
+
+    conn.executemany("""
+        INSERT OR REPLACE INTO source_schedule
+            (source_id, method, frequency, interval_hours, last_checked, last_success,
+             last_change, next_due, checks, changes, failures)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+
+def format_report(conn: sqlite3.Connection, sources: list[dict], now: datetime | None = None) -> list[str]:
+    """Dry-run report lines: which sources would be checked and when the rest are next due."""
+    now = now or datetime.now(timezone.utc)
+    schedule = load_schedule(conn)
+    due, not_due = select_due(conn, sources, now)
+
+    lines = [f"Due now: {len(due)} of {len(sources)} sources"]
+    for source in due:
+        entry = schedule.get(source.get("id")) or {}
+        last = entry.get("last_success") or "never"
+        lines.append(f"  [due]  {source.get('id')} ({source.get('method')}, "
+                     f"{source.get('check_frequency', DEFAULT_FREQUENCY)}) last success: {last[:16]}")
+    for source in sorted(not_due, key=lambda s: schedule[s["id"]]["next_due"]):
+        entry = schedule[source["id"]]
+        lines.append(f"  [skip] {source.get('id')} ({source.get('method')}, every "
+                     f"{entry['interval_hours']:.0f}h) next due: {entry['next_due'][:16]}, "
+                     f"{entry['changes']}/{entry['checks']} checks found something")
+    return lines
+
+
+def load_sources(tiers: list[int], methods: list[str]) -> list[dict]:
+    """Load enabled sources for the given tiers and methods, with inherited check_frequency."""
+    return source_registry.load().select(tiers=tiers, methods=methods)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report which sources are due for a check")
+    parser.add_argument("--tier", type=int, choices=[1, 2, 3, 4, 5], help="Tier to report (1-5)")
+    parser.add_argument("--all", action="store_true", help="Report all tiers")
+    parser.add_argument("--method", choices=["rss", "webfetch", "sitemap"], help="Only this method (default: all)")
+    args = parser.parse_args()
+
+    if args.all:
+        tiers = [1, 2, 3, 4, 5]
+    elif args.tier:
+        tiers = [args.tier]
+    else:
+        tiers = [1]
+
+    methods = [args.method] if args.method else ["rss", "webfetch", "sitemap"]
+    sources = load_sources(tiers, methods)
+
+    conn = connect()
+    for line in format_report(conn, sources):
+        print(line)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Full-Text Search Index for TMT Legal Intelligence
+
+Indexes the repository into SQLite FTS5 (BM25 ranking) so agents can search
+it in milliseconds instead of grepping sources/ for every query:
+
+- Extracted statute and judgment text (.txt / .md under sources/statutes and
+  sources/judgements), one entry per "--- Page i ---" page, with title, date
+  and focus areas from the document's metadata JSON or its folder
+- Daily findings (sources/downloaded/*_findings.json), one entry per finding
+- Fetched items and page changes in new_items.json (and new_items.ndjson)
+
+Indexing is incremental: only files whose size, mtime and content changed
+are re-read. The index lives in sources/state/search_index.db and can be
+rebuilt from the files at any time.
+
+Usage:
+    python search_index.py index                          # Update the index
+    python search_index.py index --rebuild                # Rebuild from scratch
+    python search_index.py search '"Section 79" intermediary'
+    python search_index.py search "safe harbour" --area=IT-Act --from=2024-01-01
+    python search_index.py search "Puttaswamy" --kind=judgement --json
+"""
+
+import argparse
+import email.utils
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+from item_stream import iter_records
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+SOURCES_DIR = PROJECT_ROOT / "sources"
+STATUTES_DIR = SOURCES_DIR / "statutes"
+JUDGEMENTS_DIR = SOURCES_DIR / "judgements"
+DOWNLOADED_DIR = SOURCES_DIR / "downloaded"
+INDEX_PATH = SOURCES_DIR / "state" / "search_index.db"
+
+TEXT_SUFFIXES = {".txt", ".md"}
+PAGE_MARKER = re.compile(r"^--- Page (\d+) ---$", re.MULTILINE)
+DATE_PREFIX = re.compile(r"(\d{4}-\d{2}-\d{2})")
+TITLE_WEIGHT = 5.0   # BM25 weight of the title column relative to the body
+DEFAULT_LIMIT = 20
+
+
+def connect(db_path: Path = INDEX_PATH) -> sqlite3.Connection:
+    """Open (and create if needed) the index DB."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime_ns INTEGER,
+            sha256 TEXT,
+            indexed_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS docs (
+            id INTEGER PRIMARY KEY,
+            path TEXT,
+            kind TEXT,
+            locator TEXT,
+            title TEXT,
+            url TEXT,
+            date TEXT,
+            source TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_docs_path ON docs(path);
+        CREATE INDEX IF NOT EXISTS idx_docs_date ON docs(date);
+        CREATE TABLE IF NOT EXISTS doc_areas (
+            doc_id INTEGER,
+            area TEXT COLLATE NOCASE
+        );
+        CREATE INDEX IF NOT EXISTS idx_doc_areas ON doc_areas(area, doc_id);
+        CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+            title, body, tokenize = 'porter unicode61 remove_diacritics 2'
+        );
+    """)
+    return conn
+
+
+def normalize_date(value) -> str | None:
+    """ISO date (YYYY-MM-DD) from an ISO string, an RFC 822 date or a date-prefixed name."""
+    if not value or not isinstance(value, str):
+        return None
+    match = DATE_PREFIX.search(value)
+    if match:
+        return match.group(1)
+    try:
+        return email.utils.parsedate_to_datetime(value).date().isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def split_pages(text: str) -> list[tuple[str | None, str]]:
+    """Split extract_text output into (page number, text); other text is one entry."""
+    markers = list(PAGE_MARKER.finditer(text))
+    if not markers:
+        return [(None, text)]
+    pages = []
+    for marker, following in zip(markers, markers[1:] + [None]):
+        end = following.start() if following else len(text)
+        pages.append((marker.group(1), text[marker.end():end].strip()))
+    return pages
+
+
+def load_metadata(path: Path) -> dict:
+    """Metadata JSON for an extracted document: judgment folder metadata.json or a statute sidecar."""
+    candidates = [
+        path.parent / "metadata.json",
+        path.with_name(f"{path.stem}_metadata.json"),
+        path.with_name(f"{path.stem}-Metadata.json"),
+        *sorted(path.parent.glob("*[Mm]etadata.json"))
+    ]
+    for candidate in candidates:
+        if candidate.exists():
+            try:
+                with open(candidate, encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                continue
+    return {}
+
+
+def text_file_docs(path: Path) -> Iterator[dict]:
+    """Index entries for one extracted statute or judgment text file."""
+    relative = path.relative_to(SOURCES_DIR)
+    kind = "statute" if relative.parts[0] == "statutes" else "judgement"
+    metadata = load_metadata(path)
+
+    if kind == "statute":
+        folder_area = relative.parts[1] if len(relative.parts) > 2 else None
+        title = metadata.get("short_title") or metadata.get("title")
+        date = metadata.get("notification_date") or metadata.get("effective_date")
+        areas = metadata.get("focus_areas") or metadata.get("tags") or []
+    else:
+        # sources/judgements/YYYY-<area>-<title>/...
+        folder_area = None
+        title = metadata.get("case_name")
+        date = metadata.get("judgment_date")
+        areas = metadata.get("focus_areas") or []
+
+    areas = list(areas) + ([folder_area] if folder_area and folder_area not in areas else [])
+    title = title or path.stem.replace("_", " ")
+    date = normalize_date(date) or normalize_date(path.name) or normalize_date(path.parent.name)
+    source = metadata.get("court") or metadata.get("issuing_authority")
+
+    text = path.read_text(encoding="utf-8", errors="replace")
+    for page, page_text in split_pages(text):
+        if page_text:
+            yield {
+                "kind": kind,
+                "locator": f"page {page}" if page else None,
+                "title": title,
+                "body": page_text,
+                "date": date,
+                "source": source,
+                "areas": areas
+            }
+
+
+def _finding_entries(node, category: str | None = None) -> Iterator[tuple[str | None, dict]]:
+    """Every dict with a title and a summary or URL, anywhere in a findings document."""
+    if isinstance(node, dict):
+        if node.get("title") and (node.get("summary") or node.get("url")):
+            yield category, node
+            return
+        for key, value in node.items():
+            yield from _finding_entries(value, key if isinstance(value, list) else category)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _finding_entries(value, category)
+
+
+def findings_docs(path: Path) -> Iterator[dict]:
+    """Index entries for a daily *_findings.json file."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    file_date = normalize_date(data.get("date")) or normalize_date(path.name)
+
+    summary = data.get("executive_summary")
+    if summary:
+        yield {"kind": "finding", "locator": "executive_summary", "title": f"Executive summary {file_date}",
+               "body": summary, "date": file_date, "areas": []}
+
+    for category, entry in _finding_entries(data):
+        body = " ".join(str(v) for k, v in entry.items()
+                        if isinstance(v, str) and k not in ("title", "url", "date", "id"))
+        yield {
+            "kind": "finding",
+            "locator": entry.get("id") or category,
+            "title": entry["title"],
+            "body": body,
+            "url": entry.get("url"),
+            "date": normalize_date(entry.get("date")) or file_date,
+            "source": entry.get("source"),
+            "areas": entry.get("focus_areas") or []
+        }
+
+
+def item_docs(items: list[dict], page_changes: list[dict]) -> Iterator[dict]:
+    """Index entries for fetched RSS items and changed pages."""
+    for item in items:
+        areas = [a for a in item.get("focus_areas", []) if a != "all"]
+        areas += [a for a in item.get("matched_focus_areas", {}) if a not in areas]
+        yield {
+            "kind": "item",
+            "locator": item.get("source_id"),
+            "title": item.get("title") or "",
+            "body": item.get("snippet") or "",
+            "url": item.get("url"),
+            "date": normalize_date(item.get("published")),
+            "source": item.get("source_name"),
+            "areas": areas
+        }
+    for change in page_changes:
+        yield {
+            "kind": "page_change",
+            "locator": change.get("section"),
+            "title": f"{change.get('source_name', change.get('source_id'))} ({change.get('section')})",
+            "body": " ".join(link.get("text", "") for link in change.get("notable_links", [])),
+            "url": change.get("url"),
+            "date": normalize_date(change.get("last_checked")),
+            "source": change.get("source_name"),
+            "areas": []
+        }
+
+
+def new_items_docs(path: Path) -> Iterator[dict]:
+    """Index entries for new_items.json or an NDJSON stream of the same records."""
+    if path.suffix == ".json":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        yield from item_docs(data.get("items", []), data.get("page_changes", []))
+        return
+    items, page_changes = [], []
+    for record in iter_records(path):
+        if record.get("record") == "item":
+            items.append(record)
+        elif record.get("record") == "page_change":
+            page_changes.append(record)
+    yield from item_docs(items, page_changes)
+
+
+def indexable_files() -> dict[Path, callable]:
+    """Every file the index covers, with the function that turns it into entries."""
+    files = {}
+    for root in (STATUTES_DIR, JUDGEMENTS_DIR):
+        if root.exists():
+            for path in root.rglob("*"):
+                if path.suffix in TEXT_SUFFIXES and path.name != "README.md" and path.is_file():
+                    files[path] = text_file_docs
+    for path in DOWNLOADED_DIR.glob("*_findings.json"):
+        files[path] = findings_docs
+    for name in ("new_items.json", "new_items.ndjson", "new_items.ndjson.gz"):
+        if (DOWNLOADED_DIR / name).exists():
+            files[DOWNLOADED_DIR / name] = new_items_docs
+    return files
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _delete_path(conn: sqlite3.Connection, path: str):
+    ids = [row[0] for row in conn.execute("SELECT id FROM docs WHERE path = ?", (path,))]
+    conn.executemany("DELETE FROM docs_fts WHERE rowid = ?", [(i,) for i in ids])
+    conn.executemany("DELETE FROM doc_areas WHERE doc_id = ?", [(i,) for i in ids])
+    conn.execute("DELETE FROM docs WHERE path = ?", (path,))
+
+
+def _insert_docs(conn: sqlite3.Connection, path: str, docs: Iterator[dict]) -> int:
+    count = 0
+    for doc in docs:
+        cursor = conn.execute(
+            "INSERT INTO docs (path, kind, locator, title, url, date, source) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, doc["kind"], doc.get("locator"), doc["title"], doc.get("url"), doc.get("date"), doc.get("source"))
+        )
+        conn.execute("INSERT INTO docs_fts (rowid, title, body) VALUES (?, ?, ?)",
+                     (cursor.lastrowid, doc["title"], doc["body"]))
+        conn.executemany("INSERT INTO doc_areas (doc_id, area) VALUES (?, ?)",
+                         [(cursor.lastrowid, area) for area in dict.fromkeys(doc.get("areas", [])) if area])
+        count += 1
+    return count
+
+
+def update_index(conn: sqlite3.Connection, rebuild: bool = False) -> dict:
+    """
+    Bring the index up to date with the files on disk.
+
+    Files with unchanged size and mtime are skipped without reading them;
+    files whose mtime changed but content did not only get their stat updated.
+    """
+    stats = {"files": 0, "indexed": 0, "unchanged": 0, "removed": 0, "entries": 0, "errors": []}
+    if rebuild:
+        with conn:
+            conn.executescript("DELETE FROM docs_fts; DELETE FROM doc_areas; DELETE FROM docs; DELETE FROM files;")
+
+    known = {row[0]: row[1:] for row in conn.execute("SELECT path, size, mtime_ns, sha256 FROM files")}
+    files = indexable_files()
+    stats["files"] = len(files)
+
+    for path, reader in sorted(files.items()):
+        key = str(path.relative_to(PROJECT_ROOT))
+        stat = path.stat()
+        previous = known.pop(key, None)
+        if previous and previous[0] == stat.st_size and previous[1] == stat.st_mtime_ns:
+            stats["unchanged"] += 1
+            continue
+
+        sha256 = _file_sha256(path)
+        now = datetime.now(timezone.utc).isoformat()
+        with conn:
+            if previous and previous[2] == sha256:
+                conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                             (stat.st_size, stat.st_mtime_ns, key))
+                stats["unchanged"] += 1
+                continue
+            _delete_path(conn, key)
+            try:
+                stats["entries"] += _insert_docs(conn, key, reader(path))
+            except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+                stats["errors"].append(f"{key}: {e}")
+                continue
+            conn.execute("INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, indexed_at) "
+                         "VALUES (?, ?, ?, ?, ?)", (key, stat.st_size, stat.st_mtime_ns, sha256, now))
+            stats["indexed"] += 1
+
+    # Files that no longer exist
+    with conn:
+        for key in known:
+            _delete_path(conn, key)
+            conn.execute("DELETE FROM files WHERE path = ?", (key,))
+            stats["removed"] += 1
+
+    return stats
+
+
+def _quote_terms(query: str) -> str:
+    """Fallback for input that is not valid FTS5 syntax: match every word literally."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def search(conn: sqlite3.Connection, query: str, areas: list[str] | None = None,
+           date_from: str | None = None, date_to: str | None = None,
+           kinds: list[str] | None = None, limit: int = DEFAULT_LIMIT) -> list[dict]:
+    """
+    BM25-ranked search. `query` uses FTS5 syntax: "quoted phrases", AND / OR /
+    NOT, prefix*. Filters narrow by focus area (any of), date range and kind.
+    """
+    sql = f"""
+        SELECT d.path, d.kind, d.locator, d.title, d.url, d.date, d.source,
+               bm25(docs_fts, {TITLE_WEIGHT}, 1.0) AS score,
+               snippet(docs_fts, -1, '[', ']', ' ... ', 16) AS snippet
+        FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid
+        WHERE docs_fts MATCH ?
+    """
+    params: list = []
+    if date_from:
+        sql += " AND d.date >= ?"
+        params.append(date_from)
+    if date_to:
+        sql += " AND d.date <= ?"
+        params.append(date_to)
+    if kinds:
+        sql += f" AND d.kind IN ({','.join('?' * len(kinds))})"
+        params.extend(kinds)
+    if areas:
+        sql += f" AND d.id IN (SELECT doc_id FROM doc_areas WHERE area IN ({','.join('?' * len(areas))}))"
+        params.extend(areas)
+    sql += " ORDER BY score LIMIT ?"
+    params.append(limit)
+
+    conn.row_factory = sqlite3.Row
+    try:
+        try:
+            rows = conn.execute(sql, [query, *params]).fetchall()
+        except sqlite3.OperationalError:
+            rows = conn.execute(sql, [_quote_terms(query), *params]).fetchall()
+    finally:
+        conn.row_factory = None
+    return [dict(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over statutes, judgments, findings and items")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = sub.add_parser("index", help="Update the index (only changed files are re-read)")
+    index_parser.add_argument("--rebuild", action="store_true", help="Drop and rebuild the whole index")
+
+    search_parser = sub.add_parser("search", help="Search the index")
+    search_parser.add_argument("query", help='FTS5 query, e.g. \'"Section 79" AND intermediary\'')
+    search_parser.add_argument("--area", action="append", help="Focus area filter (repeatable)")
+    search_parser.add_argument("--from", dest="date_from", help="Earliest date (YYYY-MM-DD)")
+    search_parser.add_argument("--to", dest="date_to", help="Latest date (YYYY-MM-DD)")
+    search_parser.add_argument("--kind", action="append",
+                               choices=["statute", "judgement", "finding", "item", "page_change"],
+                               help="Only these kinds of entries (repeatable)")
+    search_parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help=f"Max results (default: {DEFAULT_LIMIT})")
+    search_parser.add_argument("--update", action="store_true", help="Update the index before searching")
+    search_parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    conn = connect()
+
+    if args.command == "index" or args.update or not conn.execute("SELECT 1 FROM files LIMIT 1").fetchone():
+        start = time.monotonic()
+        stats = update_index(conn, rebuild=getattr(args, "rebuild", False))
+        print(f"Indexed {stats['indexed']} changed files ({stats['entries']} entries), "
+              f"{stats['unchanged']} unchanged, {stats['removed']} removed "
+              f"in {time.monotonic() - start:.2f}s", file=sys.stderr)
+        for error in stats["errors"]:
+            print(f"  Skipped {error}", file=sys.stderr)
+        if args.command == "index":
+            conn.close()
+            return
+
+    start = time.monotonic()
+    results = search(conn, args.query, args.area, args.date_from, args.date_to, args.kind, args.limit)
+    elapsed_ms = (time.monotonic() - start) * 1000
+    conn.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print(f"{len(results)} results in {elapsed_ms:.1f} ms")
+    for i, result in enumerate(results, 1):
+        where = result["path"] + (f" ({result['locator']})" if result["locator"] else "")
+        print(f"\n{i}. [{result['kind']}] {result['title']}  {result['date'] or ''}")
+        print(f"   {where}")
+        if result["url"]:
+            print(f"   {result['url']}")
+        print(f"   {' '.join(result['snippet'].split())}")
+
+
+if __name__ == "__main__":
+    main()
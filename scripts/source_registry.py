@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Source Configuration Registry for TMT Legal Intelligence
+
+The one place scripts load sources from. Reads every tier config
+(sources/config/tier*/*.json) plus master-sources.json, validates them, and
+compiles a snapshot with lookups by id, method, tier, host and focus area.
+
+- Sources inherit their tier and their tier's check_frequency
+- Schema errors (bad JSON, missing id/url/method, unknown method or
+  frequency, rss sources without an rss URL, duplicate ids within a tier)
+  are collected up front and the offending source is left out; warnings
+  cover things that still work but look wrong
+- The compiled snapshot is cached in memory and in
+  sources/state/source_registry.json, keyed on the config files' mtimes and
+  sizes, so it is only rebuilt after a config changes
+
+Usage:
+    python source_registry.py                      # Validate; exit 1 on errors
+    python source_registry.py --id=meity_main      # Show a source
+    python source_registry.py --host=meity.gov.in --method=webfetch
+
+    import source_registry
+
+    registry = source_registry.load()
+    sources = registry.select(tiers=[1, 2], methods=["rss"])
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+from pathlib import Path
+from urllib.parse import urlparse
+
+from state_io import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+SOURCES_CONFIG_DIR = PROJECT_ROOT / "sources" / "config"
+MASTER_SOURCES_FILE = SOURCES_CONFIG_DIR / "master-sources.json"
+SNAPSHOT_PATH = PROJECT_ROOT / "sources" / "state" / "source_registry.json"
+
+SNAPSHOT_VERSION = 5  # Bump when validation or the snapshot layout changes
+TIER_DIRS = {
+    1: "tier1-critical",
+    2: "tier2-high",
+    3: "tier3-standard",
+    4: "tier4-regular",
+    5: "tier5-periodic"
+}
+METHODS = {"rss", "webfetch", "websearch", "sitemap"}
+FREQUENCIES = {"every_run", "hourly", "daily", "weekly", "monthly"}
+DEFAULT_FREQUENCY = "daily"
+URL_RULE_KEYS = {"keep_params", "strip_params", "resolve_redirects", "hosts"}
+IGNORE_KEYS = {"selectors", "patterns"}
+FALLBACK_TYPES = {"url", "rss", "sitemap"}
+
+_memo: dict = {}
+
+
+def source_host(url: str) -> str:
+    """Hostname a source is indexed under (lowercase, without www.)."""
+    return (urlparse(url or "").hostname or "").lower().removeprefix("www.")
+
+
+def _is_url(value) -> bool:
+    return isinstance(value, str) and value.startswith(("http://", "https://"))
+
+
+def validate_source(source, where: str) -> tuple[list[str], list[str]]:
+    """Schema errors and warnings for one source entry."""
+    if not isinstance(source, dict):
+        return [f"{where}: source entry is not an object"], []
+    errors, warnings = [], []
+    where = f"{where} ({source.get('id', '?')})"
+
+    if not isinstance(source.get("id"), str) or not source.get("id"):
+        errors.append(f"{where}: missing id")
+    if not _is_url(source.get("url")):
+        errors.append(f"{where}: url must be an http(s) URL, got {source.get('url')!r}")
+    method = source.get("method")
+    if method not in METHODS:
+        errors.append(f"{where}: unknown method {method!r} (expected one of {', '.join(sorted(METHODS))})")
+    if method == "rss" and not _is_url(source.get("rss")):
+        errors.append(f"{where}: rss source without an http(s) rss URL")
+    if "enabled" in source and not isinstance(source["enabled"], bool):
+        errors.append(f"{where}: enabled must be true or false")
+    if "check_frequency" in source and source["check_frequency"] not in FREQUENCIES:
+        errors.append(f"{where}: unknown check_frequency {source['check_frequency']!r}")
+    for field in ("focus_areas", "filter_keywords", "keywords"):
+        value = source.get(field)
+        if value is not None and not (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+            errors.append(f"{where}: {field} must be a list of strings")
+    url_rules = source.get("url_rules")
+    if url_rules is not None:
+        if not isinstance(url_rules, dict) or set(url_rules) - URL_RULE_KEYS:
+            errors.append(f"{where}: url_rules must be an object with keys from {', '.join(sorted(URL_RULE_KEYS))}")
+        elif not all(isinstance(url_rules.get(k, []), list) for k in ("keep_params", "strip_params", "hosts")):
+            errors.append(f"{where}: url_rules keep_params, strip_params and hosts must be lists")
+    if "sitemap" in source and not _is_url(source["sitemap"]):
+        errors.append(f"{where}: sitemap must be an http(s) URL")
+    include = source.get("sitemap_include")
+    if include is not None:
+        if not (isinstance(include, list) and all(isinstance(p, str) for p in include)):
+            errors.append(f"{where}: sitemap_include must be a list of strings")
+        else:
+            for pattern in include:
+                try:
+                    re.compile(pattern)
+                except re.error as e:
+                    errors.append(f"{where}: bad sitemap_include pattern {pattern!r}: {e}")
+    ignore = source.get("ignore")
+    if ignore is not None:
+        if not isinstance(ignore, dict) or set(ignore) - IGNORE_KEYS or not all(
+                isinstance(v, list) and all(isinstance(item, str) for item in v) for v in ignore.values()):
+            errors.append(f"{where}: ignore must be an object with selectors and/or patterns lists of strings")
+        else:
+            for pattern in ignore.get("patterns", []):
+                try:
+                    re.compile(pattern)
+                except re.error as e:
+                    errors.append(f"{where}: bad ignore pattern {pattern!r}: {e}")
+    sections = source.get("sections")
+    if sections is not None and not (isinstance(sections, list) and
+                                     all(isinstance(s, dict) and _is_url(s.get("url")) for s in sections)):
+        errors.append(f"{where}: sections must be a list of objects with an http(s) url")
+    for fallbacks in [source.get("fallbacks")] + [s.get("fallbacks") for s in sections or [] if isinstance(s, dict)]:
+        if fallbacks is not None and not (isinstance(fallbacks, list) and all(
+                isinstance(f, dict) and f.get("type", "url") in FALLBACK_TYPES and _is_url(f.get("url"))
+                for f in fallbacks)):
+            errors.append(f"{where}: fallbacks must be a list of objects with a type "
+                          f"({', '.join(sorted(FALLBACK_TYPES))}) and an http(s) url")
+
+    if method == "websearch" and not source.get("search_query"):
+        warnings.append(f"{where}: websearch source without a search_query")
+    return errors, warnings
+
+
+def _config_files() -> list[Path]:
+    return sorted(SOURCES_CONFIG_DIR.glob("tier*/*.json")) + [MASTER_SOURCES_FILE]
+
+
+def _snapshot_key(files: list[Path]) -> list:
+    key = [SNAPSHOT_VERSION]
+    for path in files:
+        try:
+            stat = path.stat()
+            key.append([str(path.relative_to(PROJECT_ROOT)), stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            key.append([str(path.relative_to(PROJECT_ROOT)), None, None])
+    return key
+
+
+def compile_snapshot(files: list[Path]) -> dict:
+    """Read and validate every config file and build the lookup indices."""
+    sources, tiers, errors, warnings = [], {}, [], []
+    master = {}
+    seen_in_tier: dict[tuple[int, str], str] = {}
+    tiers_of_id: dict[str, set[int]] = {}
+
+    for path in files:
+        name = str(path.relative_to(PROJECT_ROOT))
+        if not path.exists():
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                config = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+            errors.append(f"{name}: unreadable: {e}")
+            continue
+        if not isinstance(config, dict) or not isinstance(config.get("sources"), list):
+            errors.append(f"{name}: expected an object with a sources list")
+            continue
+
+        if path == MASTER_SOURCES_FILE:
+            master = {k: v for k, v in config.items() if k != "sources"}
+            tier = None  # Master entries carry their own tier
+        else:
+            tier = config.get("tier")
+            if tier not in TIER_DIRS:
+                errors.append(f"{name}: tier must be one of 1-5, got {tier!r}")
+                continue
+            if path.parent.name != TIER_DIRS[tier]:
+                warnings.append(f"{name}: declares tier {tier} but is in {path.parent.name}/")
+            frequency = config.get("check_frequency", DEFAULT_FREQUENCY)
+            if frequency not in FREQUENCIES:
+                errors.append(f"{name}: unknown check_frequency {frequency!r}")
+                frequency = DEFAULT_FREQUENCY
+            tiers.setdefault(tier, {"name": config.get("name"), "check_frequency": frequency, "files": []})
+            tiers[tier]["files"].append(name)
+            if isinstance(config.get("source_count"), int) and config["source_count"] != len(config["sources"]):
+                warnings.append(f"{name}: source_count is {config['source_count']} "
+                                f"but {len(config['sources'])} sources are listed")
+
+        for position, source in enumerate(config["sources"]):
+            where = f"{name} sources[{position}]"
+            source_errors, source_warnings = validate_source(source, where)
+            source_tier = tier if tier is not None else (source.get("tier") if isinstance(source, dict) else None)
+            if not source_errors and source_tier not in TIER_DIRS:
+                source_errors.append(f"{where} ({source.get('id')}): master source needs a tier (1-5)")
+            warnings.extend(source_warnings)
+            if source_errors:
+                errors.extend(source_errors)
+                continue
+
+            key = (source_tier, source["id"])
+            if key in seen_in_tier:
+                errors.append(f"{where}: duplicate id {source['id']!r} in tier {source_tier} "
+                              f"(also in {seen_in_tier[key]})")
+                continue
+            seen_in_tier[key] = name
+            tiers_of_id.setdefault(source["id"], set()).add(source_tier)
+
+            entry = dict(source)
+            entry["tier"] = source_tier
+            tier_frequency = tiers.get(source_tier, {}).get("check_frequency", DEFAULT_FREQUENCY)
+            entry.setdefault("check_frequency", tier_frequency)
+            sources.append(entry)
+
+    for source_id, id_tiers in sorted(tiers_of_id.items()):
+        if len(id_tiers) > 1:
+            warnings.append(f"{source_id}: listed in tiers {', '.join(str(t) for t in sorted(id_tiers))}")
+
+    # Link rules (see url_canon.py) apply to every host a source publishes on
+    url_rules = {}
+    for source in sources:
+        rules = source.get("url_rules")
+        if rules:
+            hosts = [source_host(source["url"]), source_host(source.get("rss")), *rules.get("hosts", [])]
+            for host in filter(None, hosts):
+                url_rules.setdefault(host.lower().removeprefix("www."), rules)
+
+    def index(keys_of) -> dict[str, list[int]]:
+        built: dict[str, list[int]] = {}
+        for position, source in enumerate(sources):
+            for key in dict.fromkeys(keys_of(source)):
+                if key:
+                    built.setdefault(str(key), []).append(position)
+        return built
+
+    return {
+        "key": _snapshot_key(files),
+        "sources": sources,
+        "tiers": {str(tier): info for tier, info in sorted(tiers.items())},
+        "master": master,
+        "url_rules": url_rules,
+        "errors": errors,
+        "warnings": warnings,
+        "index": {
+            "id": index(lambda s: [s["id"]]),
+            "method": index(lambda s: [s["method"]]),
+            "tier": index(lambda s: [s["tier"]]),
+            "host": index(lambda s: [source_host(s["url"]), source_host(s.get("rss"))]),
+            "focus_area": index(lambda s: s.get("focus_areas") or [])
+        }
+    }
+
+
+class SourceRegistry:
+    """Validated sources with indexed lookups. Lookups return copies callers may modify."""
+
+    def __init__(self, snapshot: dict):
+        self.sources = snapshot["sources"]
+        self.tiers = {int(tier): info for tier, info in snapshot["tiers"].items()}
+        self.master = snapshot["master"]
+        self.url_rules = snapshot["url_rules"]
+        self.errors = snapshot["errors"]
+        self.warnings = snapshot["warnings"]
+        self._index = snapshot["index"]
+
+    def _positions(self, index: str, key) -> set[int]:
+        return set(self._index[index].get(str(key), []))
+
+    def get(self, source_id: str, tier: int | None = None) -> dict | None:
+        """A source by id (the lowest tier's entry if the id is in several tiers)."""
+        matches = self.all_with_id(source_id)
+        if tier is not None:
+            matches = [s for s in matches if s["tier"] == tier]
+        return matches[0] if matches else None
+
+    def all_with_id(self, source_id: str) -> list[dict]:
+        """Every entry for a source id, in tier order."""
+        return sorted(self._copies(self._positions("id", source_id)), key=lambda s: s["tier"])
+
+    def select(self, tiers: list[int] | None = None, methods: list[str] | None = None,
+               host: str | None = None, focus_area: str | None = None,
+               enabled_only: bool = True) -> list[dict]:
+        """Sources matching every given filter, in config order."""
+        positions = set(range(len(self.sources)))
+        if tiers is not None:
+            positions &= set().union(*(self._positions("tier", t) for t in tiers))
+        if methods is not None:
+            positions &= set().union(*(self._positions("method", m) for m in methods))
+        if host is not None:
+            positions &= self._positions("host", source_host(f"//{host}" if "//" not in host else host))
+        if focus_area is not None:
+            positions &= self._positions("focus_area", focus_area)
+        selected = self._copies(positions)
+        return [s for s in selected if s.get("enabled", True)] if enabled_only else selected
+
+    def _copies(self, positions) -> list[dict]:
+        return [dict(self.sources[p]) for p in sorted(positions)]
+
+    def log_problems(self, log: logging.Logger = logger):
+        """Log schema errors (sources left out) so they surface at the start of a run."""
+        for error in self.errors:
+            log.error(f"Source config: {error}")
+        if self.errors:
+            log.error(f"{len(self.errors)} source config errors; the affected sources are skipped "
+                      f"(run source_registry.py for details)")
+
+
+def load(use_cache: bool = True) -> SourceRegistry:
+    """
+    The registry for the current configs.
+
+    Reuses the in-process or on-disk snapshot when no config file has changed
+    since it was compiled; otherwise recompiles and rewrites the snapshot.
+    """
+    files = _config_files()
+    key = _snapshot_key(files)
+    if use_cache:
+        if _memo.get("key") == key:
+            return SourceRegistry(_memo)
+        snapshot = read_json(SNAPSHOT_PATH, default=None)
+        if isinstance(snapshot, dict) and snapshot.get("key") == key:
+            _memo.clear()
+            _memo.update(snapshot)
+            return SourceRegistry(snapshot)
+
+    snapshot = compile_snapshot(files)
+    try:
+        atomic_write_json(SNAPSHOT_PATH, snapshot, indent=None)
+    except OSError as e:
+        logger.warning(f"Could not cache source registry snapshot: {e}")
+    _memo.clear()
+    _memo.update(snapshot)
+    return SourceRegistry(snapshot)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate source configs and look up sources")
+    parser.add_argument("--id", help="Show the source(s) with this id")
+    parser.add_argument("--tier", type=int, choices=sorted(TIER_DIRS), help="Only this tier")
+    parser.add_argument("--method", choices=sorted(METHODS), help="Only this method")
+    parser.add_argument("--host", help="Only sources on this host")
+    parser.add_argument("--focus-area", help="Only sources tagged with this focus area")
+    parser.add_argument("--include-disabled", action="store_true", help="Include disabled sources")
+    parser.add_argument("--warnings", action="store_true", help="Also list warnings")
+    args = parser.parse_args()
+
+    registry = load(use_cache=False)
+
+    if args.id or args.tier or args.method or args.host or args.focus_area:
+        if args.id:
+            matches = registry.all_with_id(args.id)
+        else:
+            matches = registry.select(
+                tiers=[args.tier] if args.tier else None,
+                methods=[args.method] if args.method else None,
+                host=args.host, focus_area=args.focus_area,
+                enabled_only=not args.include_disabled
+            )
+        print(json.dumps(matches, indent=2, ensure_ascii=False))
+        return
+
+    counts = {tier: len(registry.select(tiers=[tier], enabled_only=False)) for tier in registry.tiers}
+    print(f"{len(registry.sources)} valid sources "
+          f"({', '.join(f'tier {tier}: {count}' for tier, count in counts.items())})")
+    print(f"{len(registry.errors)} errors, {len(registry.warnings)} warnings")
+    for error in registry.errors:
+        print(f"  ERROR {error}")
+    if args.warnings:
+        for warning in registry.warnings:
+            print(f"  WARN  {warning}")
+    sys.exit(1 if registry.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Shared State and Output I/O for TMT Legal Intelligence
+
+All scripts that write files other processes also read or write
+(page_hashes.json, new_items.json, NDJSON streams) go through here:
+
+- Writes go to a temp file in the same directory, are fsynced, then renamed
+  over the target, so a crash never leaves a half-written file behind.
+- An advisory lock on "<file>.lock" serializes read-modify-write cycles, so
+  tiers can run as separate processes without losing each other's updates.
+
+Usage:
+    from state_io import atomic_write_json, file_lock, update_json
+
+    atomic_write_json(path, data)
+
+    with file_lock(path):
+        ...
+
+    update_json(path, lambda data: data.update(new_hashes), default={})
+"""
+
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+LOCK_SUFFIX = ".lock"
+
+
+def lock_path(path: Path) -> Path:
+    """The lock file guarding `path`."""
+    path = Path(path)
+    return path.with_name(path.name + LOCK_SUFFIX)
+
+
+@contextmanager
+def file_lock(path: Path, shared: bool = False) -> Iterator[None]:
+    """
+    Hold an exclusive (or shared) advisory lock for `path` while in the block.
+
+    The lock lives in a separate "<file>.lock" file so the data file itself
+    can be replaced atomically while the lock is held.
+    """
+    lock_file = lock_path(path)
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_file, "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write_text(path: Path, text: str):
+    """Write text to `path` via temp file + fsync + rename."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_json(path: Path, data: Any, indent: int | None = 2):
+    """Serialize `data` as JSON and write it atomically."""
+    atomic_write_text(path, json.dumps(data, indent=indent))
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    """Read JSON from `path`, returning `default` if it is missing or unreadable."""
+    path = Path(path)
+    if not path.exists():
+        return default
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        logger.warning(f"Could not read {path}: {e}")
+        return default
+
+
+def update_json(path: Path, update: Callable[[Any], Any], default: Any = None) -> Any:
+    """
+    Locked read-modify-write of a JSON file.
+
+    `update` receives the current data (or `default`) and may mutate it in
+    place or return a replacement. The result is written atomically and returned.
+    """
+    with file_lock(path):
+        data = read_json(path, default)
+        replaced = update(data)
+        if replaced is not None:
+            data = replaced
+        atomic_write_json(path, data)
+        return data
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+URL Canonicalization for TMT Legal Intelligence
+
+Feed links for the same article differ in ways that made seen_items treat
+them as new: tracking parameters (utm_*, ?ref=), http vs https, www, trailing
+slashes, AMP variants, fragments and feedburner redirect links. fetch_rss.py
+runs every link through here before dedup and storage:
+
+- canonicalize() gives the dedup key stored in seen_items.url (always https,
+  no www, no tracking parameters, sorted query, no trailing slash or AMP suffix)
+- clean_url() gives the link shown in new_items.json: tracking parameters,
+  fragments and AMP suffixes removed, scheme and host kept as published
+
+Per-host rules come from a source's "url_rules" in its config and apply to
+links on the source's hosts (its url and rss hosts, plus any listed in "hosts"):
+
+    "url_rules": {
+        "keep_params": ["id"],           # Drop every other query parameter
+        "strip_params": ["from"],        # Drop these as well as the defaults
+        "resolve_redirects": true,       # HEAD redirecting links (feedproxy) to the article
+        "hosts": ["m.example.com"]
+    }
+
+seen_items.db rows written before canonicalization are rewritten once by
+migrate_seen_items(), which fetch_rss.py runs automatically; duplicates
+that collapse onto one key are merged, keeping the earliest first_seen.
+Links stored in a different form than their key are remembered in the
+seen_raw_links table, so fetch_rss.py can tell which repeats only
+canonicalization caught (a link it had never seen as published).
+
+Usage:
+    python url_canon.py "https://www.example.com/story/?utm_source=x#top"
+    python url_canon.py --migrate --dry-run    # Report what the migration would merge
+    python url_canon.py --migrate              # Run it now
+"""
+
+import argparse
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+import http_client
+import source_registry
+from source_registry import source_host
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DB_PATH = PROJECT_ROOT / "sources" / "state" / "seen_items.db"
+
+# Bump when canonicalize() changes, so stored keys are migrated again
+MIGRATION_NAME = "url_canon_v1"
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl",
+    "ref", "ref_src", "ref_url", "referrer", "cmpid", "ncid", "ocid", "sr_share",
+    "amp", "outputtype", "__twitter_impression", "s_cid", "spm", "trk", "trkcampaign"
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_", "vero_", "oly_")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def host_rules(registry: source_registry.SourceRegistry | None = None) -> dict[str, dict]:
+    """url_rules from the source configs, keyed by host (without www.)."""
+    registry = registry or source_registry.load()
+    return registry.url_rules
+
+
+def _rules_for(host: str, rules_by_host: dict[str, dict] | None) -> dict:
+    if not rules_by_host:
+        return {}
+    return rules_by_host.get(host.removeprefix("www."), {})
+
+
+def _is_tracking(name: str, rules: dict) -> bool:
+    lowered = name.lower()
+    if "keep_params" in rules:
+        return name not in rules["keep_params"]
+    return (lowered in TRACKING_PARAMS or lowered.startswith(TRACKING_PREFIXES)
+            or name in rules.get("strip_params", []))
+
+
+def _strip_amp(host: str, path: str) -> tuple[str, str]:
+    """Non-AMP host and path for AMP variants (amp.host, /amp, /amp/, .amp, .amp.html)."""
+    if host.startswith("amp."):
+        host = host[len("amp."):]
+    for suffix in ("/amp/", "/amp", ".amp.html", ".amp"):
+        if path.endswith(suffix):
+            path = path[:-len(suffix)] + (".html" if suffix == ".amp.html" else "")
+            break
+    if path.startswith("/amp/"):
+        path = path[len("/amp"):]
+    return host, path
+
+
+def _normalize(url: str, rules_by_host: dict[str, dict] | None, as_key: bool) -> str:
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if parts.scheme.lower() not in DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower().rstrip(".")
+    rules = _rules_for(host, rules_by_host)
+    host, path = _strip_amp(host, parts.path or "/")
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k, rules)]
+
+    if as_key:
+        scheme = "https"
+        host = host.removeprefix("www.")
+        path = path.rstrip("/") or "/"
+        query.sort()
+    else:
+        scheme = parts.scheme.lower()
+    netloc = host if port in (None, DEFAULT_PORTS[parts.scheme.lower()]) else f"{host}:{port}"
+    return urlunsplit((scheme, netloc, path, urlencode(query, doseq=True), ""))
+
+
+def canonicalize(url: str, rules_by_host: dict[str, dict] | None = None) -> str:
+    """Dedup key for a link: the same article always maps to the same string."""
+    return _normalize(url, rules_by_host, as_key=True)
+
+
+def clean_url(url: str, rules_by_host: dict[str, dict] | None = None) -> str:
+    """The link without tracking parameters, fragment or AMP suffix, otherwise as published."""
+    return _normalize(url, rules_by_host, as_key=False)
+
+
+def resolve_redirect(url: str, rules_by_host: dict[str, dict] | None = None) -> str:
+    """Final URL of a redirecting link (e.g. feedproxy) if its host's rules ask for it."""
+    if not _rules_for(source_host(url), rules_by_host).get("resolve_redirects"):
+        return url
+    try:
+        response = http_client.head(url, timeout=10, retries=1)
+        return response.url or url
+    except requests.RequestException:
+        return url
+
+
+def init_raw_links_table(conn: sqlite3.Connection):
+    """Create the seen_raw_links table (published link -> canonical key) if needed."""
+    conn.execute("CREATE TABLE IF NOT EXISTS seen_raw_links (raw_url TEXT PRIMARY KEY, url TEXT)")
+
+
+def unseen_raw_links(conn: sqlite3.Connection, links: list[str], chunk_size: int = 500) -> set[str]:
+    """The links that are not in seen_raw_links."""
+    links = list(dict.fromkeys(links))
+    known = set()
+    for i in range(0, len(links), chunk_size):
+        chunk = links[i:i + chunk_size]
+        placeholders = ",".join("?" * len(chunk))
+        known.update(row[0] for row in conn.execute(
+            f"SELECT raw_url FROM seen_raw_links WHERE raw_url IN ({placeholders})", chunk))
+    return set(links) - known
+
+
+def record_raw_links(conn: sqlite3.Connection, links: dict[str, str]):
+    """Remember published links (raw -> canonical key) that differ from their key. Does not commit."""
+    conn.executemany("INSERT OR IGNORE INTO seen_raw_links (raw_url, url) VALUES (?, ?)",
+                     [(raw, key) for raw, key in links.items() if raw != key])
+
+
+def _migrate_table(conn: sqlite3.Connection, table: str, rules_by_host: dict[str, dict],
+                   merge_key: str | None = None) -> dict:
+    """Rewrite a url-keyed table to canonical keys, keeping the row with the lowest merge_key."""
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    if not columns:
+        return {"rows": 0, "rewritten": 0, "merged": 0}
+    rows = conn.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall()
+    url_index = columns.index("url")
+    order_index = columns.index(merge_key) if merge_key else None
+
+    groups: dict[str, list[tuple]] = {}
+    for row in rows:
+        groups.setdefault(canonicalize(row[url_index], rules_by_host), []).append(row)
+
+    stats = {"rows": len(rows), "rewritten": 0, "merged": 0}
+    placeholders = ", ".join("?" * len(columns))
+    for key, group in groups.items():
+        if len(group) == 1 and group[0][url_index] == key:
+            continue
+        if order_index is not None:
+            group.sort(key=lambda row: row[order_index] or "")
+        keep = list(group[0])
+        keep[url_index] = key
+        conn.executemany(f"DELETE FROM {table} WHERE url = ?", [(row[url_index],) for row in group])
+        conn.execute(f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", keep)
+        stats["rewritten"] += 1
+        stats["merged"] += len(group) - 1
+    return stats
+
+
+def migrate_seen_items(conn: sqlite3.Connection, rules_by_host: dict[str, dict] | None = None,
+                       dry_run: bool = False, force: bool = False) -> dict | None:
+    """
+    One-time rewrite of seen_items to canonical URL keys. Returns stats, or
+    None if already applied. Expects a connection with isolation_level=None
+    (or no open transaction), as it begins its own.
+    """
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_migrations (name TEXT PRIMARY KEY, applied_at TEXT)")
+    applied = conn.execute("SELECT 1 FROM schema_migrations WHERE name = ?", (MIGRATION_NAME,)).fetchone()
+    if applied and not force:
+        return None
+    rules_by_host = host_rules() if rules_by_host is None else rules_by_host
+
+    init_raw_links_table(conn)
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        record_raw_links(conn, {url: canonicalize(url, rules_by_host)
+                                for (url,) in conn.execute("SELECT url FROM seen_items").fetchall()})
+        stats = {"seen_items": _migrate_table(conn, "seen_items", rules_by_host, merge_key="first_seen")}
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.execute("INSERT OR REPLACE INTO schema_migrations (name, applied_at) VALUES (?, ?)",
+                         (MIGRATION_NAME, datetime.now(timezone.utc).isoformat()))
+            conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Canonicalize URLs / migrate seen_items.db to canonical keys")
+    parser.add_argument("urls", nargs="*", help="URLs to show the canonical key and clean link for")
+    parser.add_argument("--migrate", action="store_true", help="Rewrite seen_items.db to canonical keys")
+    parser.add_argument("--dry-run", action="store_true", help="With --migrate, report without changing anything")
+    parser.add_argument("--force", action="store_true", help="With --migrate, run even if already applied")
+    args = parser.parse_args()
+
+    rules = host_rules()
+    for url in args.urls:
+        print(f"{url}\n  key:   {canonicalize(url, rules)}\n  clean: {clean_url(url, rules)}")
+
+    if args.migrate:
+        # isolation_level=None: the migration manages its own transaction
+        conn = sqlite3.connect(DB_PATH, timeout=60, isolation_level=None)
+        stats = migrate_seen_items(conn, rules, dry_run=args.dry_run, force=args.force)
+        conn.close()
+        if stats is None:
+            print(f"{MIGRATION_NAME} already applied (use --force to run it again)")
+            return
+        for table, table_stats in stats.items():
+            print(f"{table}: {table_stats['rows']} rows, {table_stats['rewritten']} keys rewritten, "
+                  f"{table_stats['merged']} duplicates merged{' (dry run)' if args.dry_run else ''}")
+    elif not args.urls:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Shared fixtures. The scripts are flat modules run from scripts/, so that
+directory is put on sys.path the way running them there would.
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import source_registry  # noqa: E402
+
+
+class Project:
+    """A throwaway project tree whose source configs the registry reads."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.config_dir = root / "sources" / "config"
+        self.state_dir = root / "sources" / "state"
+        self.output_dir = root / "sources" / "downloaded"
+        for path in (self.config_dir, self.state_dir, self.output_dir):
+            path.mkdir(parents=True, exist_ok=True)
+
+    def write_tier(self, tier: int, sources: list[dict], name: str = "sources.json", **config) -> Path:
+        """Write a tier config file and return its path."""
+        path = self.config_dir / source_registry.TIER_DIRS[tier] / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"tier": tier, **config, "sources": sources}, indent=2), encoding="utf-8")
+        return path
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """An empty project tree with the source registry pointed at it."""
+    project = Project(tmp_path / "project")
+    monkeypatch.setattr(source_registry, "PROJECT_ROOT", project.root)
+    monkeypatch.setattr(source_registry, "SOURCES_CONFIG_DIR", project.config_dir)
+    monkeypatch.setattr(source_registry, "MASTER_SOURCES_FILE", project.config_dir / "master-sources.json")
+    monkeypatch.setattr(source_registry, "SNAPSHOT_PATH", project.state_dir / "source_registry.json")
+    source_registry._memo.clear()
+    yield project
+    source_registry._memo.clear()
+
+
+class LocalServer:
+    """
+    A local HTTP server for the scripts' fetch paths.
+
+    `routes` maps a path to (status, headers, body), or to a callable taking
+    the request handler and returning that tuple (or None once it has written
+    the response itself). Every request is recorded in `requests`.
+    """
+
+    def __init__(self):
+        self.routes: dict = {}
+        self.requests: list[dict] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, send_body: bool):
+                server.requests.append({"method": self.command, "path": self.path, "headers": dict(self.headers)})
+                route = server.routes.get(self.path, (404, {}, b"not found"))
+                response = route(self) if callable(route) else route
+                if response is None:
+                    return
+                status, headers, body = response
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if send_body and status not in (204, 304):
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(send_body=True)
+
+            def do_HEAD(self):
+                self._respond(send_body=False)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def paths(self) -> list[str]:
+        return [request["path"] for request in self.requests]
+
+
+@pytest.fixture
+def http_server():
+    server = LocalServer()
+    thread = threading.Thread(target=server.httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
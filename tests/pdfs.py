@@ -0,0 +1,54 @@
+"""Minimal hand-built PDFs for the extraction tests (no PDF writer needed)."""
+
+HELVETICA = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+
+
+def stream(data: bytes, extra: bytes = b"") -> bytes:
+    return b"<< /Length %d %s>>\nstream\n%s\nendstream" % (len(data), extra, data)
+
+
+def build_pdf(objects: list[bytes]) -> bytes:
+    """A PDF from its objects (numbered from 1; object 1 must be the catalog), with a correct xref."""
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def text_pdf(pages: list[str], font: bytes = HELVETICA, extra_objects: list[bytes] = ()) -> bytes:
+    """
+    A PDF with one line of text per page (an empty string makes a blank page).
+
+    The font is object 3; extra_objects (e.g. a ToUnicode stream for it) are
+    numbered from 4 + 2 * len(pages).
+    """
+    page_count = len(pages)
+    kids = b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(page_count))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, page_count),
+        font,
+    ]
+    for i, text in enumerate(pages):
+        escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1")
+        content = b"BT /F1 12 Tf 72 720 Td (%s) Tj ET" % escaped if text else b""
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i))
+        objects.append(stream(content))
+    return build_pdf(objects + list(extra_objects))
+
+
+def to_unicode_cmap(mapping: dict[str, str]) -> bytes:
+    """A ToUnicode CMap stream mapping single-byte codes to characters."""
+    pairs = b"".join(b"<%02X> <%04X>\n" % (ord(code), ord(char)) for code, char in mapping.items())
+    cmap = (b"/CIDInit /ProcSet findresource begin 12 dict begin begincmap /CMapName /Test def "
+            b"1 begincodespacerange <00> <FF> endcodespacerange\n"
+            b"%d beginbfchar\n%sendbfchar endcmap CMapName currentdict /CMap defineresource pop end end"
+            % (len(mapping), pairs))
+    return stream(cmap)
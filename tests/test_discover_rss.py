@@ -0,0 +1,155 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import discover_rss
+
+RSS = (b'<?xml version="1.0"?><rss version="2.0"><channel><title>Regulator news</title>'
+       b'<item><title>Order</title><link>https://regulator.example/1</link></item></channel></rss>')
+NOW = datetime(2026, 10, 17, tzinfo=timezone.utc)
+
+
+def _entry(status: str, age: timedelta) -> dict:
+    return {"id": "s", "status": status, "rss": None, "checked_at": (NOW - age).isoformat()}
+
+
+@pytest.mark.parametrize("status, age, fresh", [
+    ("found", timedelta(days=29), True),
+    ("found", timedelta(days=31), False),
+    ("not_found", timedelta(days=6), True),
+    ("not_found", timedelta(days=8), False),
+    ("error", timedelta(hours=12), True),
+    ("error", timedelta(days=2), False),
+    ("unknown", timedelta(minutes=1), False),
+])
+def test_cached_results_expire_per_status(status, age, fresh):
+    cache = {"https://a.example": _entry(status, age)}
+    assert bool(discover_rss.cached_result(cache, {"url": "https://a.example"}, NOW)) == fresh
+
+
+def test_cache_round_trip_skips_probing(tmp_path, monkeypatch):
+    path = tmp_path / "feed_discovery.json"
+    results = [
+        {"id": "a", "url": "https://a.example", "status": "found", "rss": "https://a.example/feed", "method": "discovered"},
+        {"id": "b", "url": "https://b.example", "status": "not_found", "error": None},
+        {"id": "c", "url": "https://c.example", "status": "not_found", "error": "Failed to fetch homepage: timeout"},
+        {"id": "d", "url": "https://d.example", "status": "found", "rss": "https://d.example/rss", "cached": True},
+        {"id": "e", "url": "https://e.example", "status": "already_has_rss", "rss": "https://e.example/rss"},
+    ]
+    discover_rss.save_cache(results, path)
+    cache = discover_rss.load_cache(path)
+    assert {url: entry["status"] for url, entry in cache.items()} == {
+        "https://a.example": "found", "https://b.example": "not_found", "https://c.example": "error"}
+
+    probed = []
+
+    async def discover(url, slots):
+        probed.append(url)
+        return {"url": url, "feed_url": None, "method": None, "error": None}
+
+    monkeypatch.setattr(discover_rss, "discover_feed_async", discover)
+    sources = [{"id": s, "url": f"https://{s}.example", "type": "news"} for s in "abcf"]
+    sources.append({"id": "g", "url": "https://g.example", "type": "court"})
+    results = {r["id"]: r for r in discover_rss.discover_all(sources, cache)}
+    assert probed == ["https://f.example"]
+    assert results["a"] == {"id": "a", "url": "https://a.example", "status": "found",
+                            "rss": "https://a.example/feed", "method": "discovered", "cached": True}
+    assert results["g"]["status"] == "skipped_type"
+
+
+def test_highest_ranked_feed_wins_even_when_it_answers_last(monkeypatch):
+    delays = {"https://x.example/slow-feed": 0.2, "https://x.example/html": 0.0, "https://x.example/fast-feed": 0.0}
+    confirmed = []
+
+    def probe(url):
+        time.sleep(delays[url])
+        return None if url.endswith("/html") else url
+
+    monkeypatch.setattr(discover_rss, "probe_feed", probe)
+    monkeypatch.setattr(discover_rss, "confirm_feed", lambda url: confirmed.append(url) or True)
+
+    async def run(candidates):
+        return await discover_rss._first_feed(candidates, discover_rss.ProbeSlots())
+
+    assert asyncio.run(run(list(delays))) == "https://x.example/slow-feed"
+    assert confirmed == ["https://x.example/slow-feed"]
+    confirmed.clear()
+    assert asyncio.run(run(["https://x.example/html", "https://x.example/fast-feed"])) == "https://x.example/fast-feed"
+
+
+def test_discovers_advertised_feed_before_guessed_paths(http_server):
+    homepage = b'<html><head><link rel="alternate" type="application/rss+xml" href="/news/latest.xml"></head></html>'
+    http_server.routes["/"] = (200, {"Content-Type": "text/html"}, homepage)
+    http_server.routes["/news/latest.xml"] = (200, {"Content-Type": "application/rss+xml"}, RSS)
+    http_server.routes["/feed"] = (200, {"Content-Type": "application/rss+xml"}, RSS)
+
+    async def run():
+        return await discover_rss.discover_feed_async(http_server.url("/"), discover_rss.ProbeSlots())
+
+    result = asyncio.run(run())
+    assert (result["feed_url"], result["method"]) == (http_server.url("/news/latest.xml"), "discovered")
+    assert "/feed" not in http_server.paths()  # Guessed paths only run when the advertised feeds fail
+
+    http_server.routes["/"] = (200, {"Content-Type": "text/html"}, b"<html><body>No feeds here</body></html>")
+    result = asyncio.run(run())
+    assert result["feed_url"] == http_server.url("/feed")
+
+
+@pytest.fixture
+def configs(tmp_path):
+    config_dir = tmp_path / "sources" / "config"
+    for tier, sources in {
+        "tier1-primary": [{"id": "trai", "url": "https://trai.example"},
+                          {"id": "meity", "url": "https://meity.example"}],
+        "tier2-news": [{"id": "trai", "url": "https://trai.example"},
+                       {"id": "blog", "url": "https://blog.example", "rss": "https://blog.example/old"}],
+        "tier3-other": [{"id": "trai", "url": "https://trai.example/press"}],
+    }.items():
+        (config_dir / tier).mkdir(parents=True)
+        (config_dir / tier / "sources.json").write_text(json.dumps({"sources": sources}, indent=2))
+    return config_dir
+
+
+def _found(source_id, url, rss):
+    return {"id": source_id, "url": url, "status": "found", "rss": rss}
+
+
+def test_config_update_writes_each_changed_file_once(configs, monkeypatch, capsys):
+    writes = []
+    atomic_write_json = discover_rss.atomic_write_json
+    monkeypatch.setattr(discover_rss, "atomic_write_json",
+                        lambda path, data: writes.append(path.parent.name) or atomic_write_json(path, data))
+    results = [_found("trai", "https://trai.example", "https://trai.example/rss"),
+               _found("meity", "https://meity.example", "https://meity.example/feed"),
+               _found("blog", "https://blog.example", "https://blog.example/new"),
+               {"id": "none", "url": "https://none.example", "status": "not_found"}]
+
+    plan = discover_rss.update_source_configs(results, configs)
+    assert sorted(writes) == ["tier1-primary", "tier2-news"]
+    assert {path.parent.name: ids for path, (_, _, ids) in plan.items()} == {
+        "tier1-primary": ["trai", "meity"], "tier2-news": ["trai"]}
+
+    def sources(tier):
+        return {s["id"]: s for s in json.loads((configs / tier / "sources.json").read_text())["sources"]}
+    assert sources("tier1-primary")["trai"] == {"id": "trai", "url": "https://trai.example",
+                                                "rss": "https://trai.example/rss", "method": "rss"}
+    assert sources("tier2-news")["blog"]["rss"] == "https://blog.example/old"  # Existing feeds are kept
+    assert "rss" not in sources("tier3-other")["trai"]  # Same id, different URL
+    assert '+      "rss": "https://meity.example/feed",' in capsys.readouterr().out
+
+    assert discover_rss.update_source_configs(results, configs) == {}
+    assert len(writes) == 2
+
+
+def test_config_diff_preview_writes_nothing(configs):
+    before = {path: path.read_text() for path in configs.rglob("*.json")}
+    plan = discover_rss.update_source_configs([_found("meity", "https://meity.example", "https://meity.example/feed")],
+                                              configs, write=False)
+    assert [path.parent.name for path in plan] == ["tier1-primary"]
+    diff = discover_rss.config_diff(plan, configs)
+    assert diff[:2] == ["--- a/sources/config/tier1-primary/sources.json",
+                        "+++ b/sources/config/tier1-primary/sources.json"]
+    assert {path: path.read_text() for path in configs.rglob("*.json")} == before
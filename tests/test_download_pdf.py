@@ -0,0 +1,210 @@
+import hashlib
+import json
+
+import pytest
+
+import download_pdf
+from download_pdf import fetch_to_file
+
+BODY = b"%PDF-1.7\n" + bytes(range(256)) * 800 + b"\n%%EOF\n"
+
+
+class RangeRoute:
+    """Serves a body with Range/If-Range support; can break off the next response halfway."""
+
+    def __init__(self, body: bytes = BODY, etag: str | None = '"v1"'):
+        self.body = body
+        self.etag = etag
+        self.honour_range = True
+        self.break_next = False
+
+    def __call__(self, handler):
+        headers = {"Content-Type": "application/pdf", **({"ETag": self.etag} if self.etag else {})}
+        range_header = handler.headers.get("Range")
+        start, status = 0, 200
+        if range_header and self.honour_range and handler.headers.get("If-Range") in (None, self.etag):
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            if start >= len(self.body):
+                return 416, {"Content-Range": f"bytes */{len(self.body)}"}, b""
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{len(self.body) - 1}/{len(self.body)}"
+        body = self.body[start:]
+        if not self.break_next:
+            return status, headers, body
+
+        self.break_next = False
+        handler.send_response(status)
+        for name, value in {**headers, "Content-Length": str(len(body))}.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body[:len(body) // 2])
+        handler.wfile.flush()
+        handler.connection.shutdown(2)
+        handler.close_connection = True
+        return None
+
+
+@pytest.fixture
+def pdf_route(http_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(download_pdf, "STORE_DIR", tmp_path / "store")
+    route = RangeRoute()
+    http_server.routes["/doc.pdf"] = route
+    route.url = http_server.url("/doc.pdf")
+    route.seen = lambda: [(r["headers"].get("Range"), r["headers"].get("If-Range")) for r in http_server.requests]
+    return route
+
+
+def _part(output):
+    return output.with_name(output.name + ".part")
+
+
+def _save_partial(output, url, data, validator='"v1"'):
+    _part(output).write_bytes(data)
+    if validator:
+        output.with_name(output.name + ".part.json").write_text(json.dumps({"url": url, "validator": validator}))
+
+
+def _check_complete(result, output, body=BODY):
+    assert result["success"], result["error"]
+    assert result["size"] == len(body)
+    assert result["sha256"] == hashlib.sha256(body).hexdigest()
+    assert output.read_bytes() == body
+    assert not _part(output).exists()
+    assert not output.with_name(output.name + ".part.json").exists()
+
+
+def test_continues_part_file_from_an_earlier_run(pdf_route, tmp_path):
+    output = tmp_path / "doc.pdf"
+    _save_partial(output, pdf_route.url, BODY[:1000])
+
+    result = fetch_to_file(pdf_route.url, output)
+    _check_complete(result, output)
+    assert result["resumed_bytes"] == 1000
+    assert pdf_route.seen() == [("bytes=1000-", '"v1"')]
+
+
+def test_part_file_without_saved_validator_is_restarted(pdf_route, tmp_path):
+    output = tmp_path / "doc.pdf"
+    _save_partial(output, pdf_route.url, b"bytes of some other file", validator=None)
+
+    result = fetch_to_file(pdf_route.url, output)
+    _check_complete(result, output)
+    assert result["resumed_bytes"] == 0
+    assert pdf_route.seen() == [(None, None)]
+
+
+def test_changed_file_is_downloaded_afresh(pdf_route, tmp_path):
+    output = tmp_path / "doc.pdf"
+    _save_partial(output, pdf_route.url, b"%PDF-1.4 the old version")
+    pdf_route.body, pdf_route.etag = BODY[::-1], '"v2"'
+
+    result = fetch_to_file(pdf_route.url, output)
+    _check_complete(result, output, BODY[::-1])
+    assert result["resumed_bytes"] == 0
+    assert pdf_route.seen() == [("bytes=24-", '"v1"')]
+
+
+def test_resumes_broken_transfer(pdf_route, tmp_path):
+    pdf_route.break_next = True
+    output = tmp_path / "doc.pdf"
+
+    result = fetch_to_file(pdf_route.url, output)
+    _check_complete(result, output)
+    # Resumes after the last chunk written before the connection dropped
+    resumed = result["resumed_bytes"]
+    assert 0 < resumed <= len(BODY) // 2
+    assert pdf_route.seen() == [(None, None), (f"bytes={resumed}-", '"v1"')]
+
+
+def test_validator_survives_a_failed_run(pdf_route, tmp_path, monkeypatch):
+    monkeypatch.setattr(download_pdf, "RESUME_ATTEMPTS", 0)
+    pdf_route.break_next = True
+    output = tmp_path / "doc.pdf"
+    assert not fetch_to_file(pdf_route.url, output)["success"]
+    assert json.loads(output.with_name("doc.pdf.part.json").read_text())["validator"] == '"v1"'
+
+    result = fetch_to_file(pdf_route.url, output)
+    _check_complete(result, output)
+    assert result["resumed_bytes"] > 0
+
+
+def test_weak_etag_falls_back_to_last_modified():
+    response = type("Response", (), {"headers": {"ETag": 'W/"v1"', "Last-Modified": "Wed, 01 Oct 2026 00:00:00 GMT"}})
+    assert download_pdf.resume_validator(response) == "Wed, 01 Oct 2026 00:00:00 GMT"
+
+
+def test_restarts_when_range_ignored(pdf_route, tmp_path):
+    pdf_route.honour_range = False
+    output = tmp_path / "doc.pdf"
+    _save_partial(output, pdf_route.url, b"stale partial download")
+
+    result = fetch_to_file(pdf_route.url, output)
+    _check_complete(result, output)
+    assert result["resumed_bytes"] == 0
+
+
+def test_complete_part_file_is_kept_on_416(pdf_route, tmp_path):
+    output = tmp_path / "doc.pdf"
+    _save_partial(output, pdf_route.url, BODY)
+
+    _check_complete(fetch_to_file(pdf_route.url, output), output)
+    assert pdf_route.seen() == [(f"bytes={len(BODY)}-", '"v1"')]
+
+
+def test_overlong_part_file_is_discarded_on_416(pdf_route, tmp_path):
+    output = tmp_path / "doc.pdf"
+    _save_partial(output, pdf_route.url, BODY + b"trailing junk")
+
+    result = fetch_to_file(pdf_route.url, output)
+    _check_complete(result, output)
+    assert pdf_route.seen() == [(f"bytes={len(BODY) + 13}-", '"v1"'), (None, None)]
+
+
+@pytest.fixture
+def downloads(tmp_path, monkeypatch):
+    directory = tmp_path / "downloaded"
+    directory.mkdir()
+    monkeypatch.setattr(download_pdf, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(download_pdf, "DOWNLOAD_DIR", directory)
+    monkeypatch.setattr(download_pdf, "STORE_DIR", directory / "store")
+    return directory
+
+
+def test_same_content_is_stored_once(http_server, downloads):
+    http_server.routes["/a.pdf"] = http_server.routes["/mirror/a.pdf"] = (200, {}, BODY)
+    first = fetch_to_file(http_server.url("/a.pdf"), downloads / "2026-10-01_a.pdf")
+    second = fetch_to_file(http_server.url("/mirror/a.pdf"), downloads / "2026-10-02_a.pdf")
+
+    assert (first["duplicate"], second["duplicate"]) == (False, True)
+    assert first["store_path"] == second["store_path"]
+    assert first["link"] == "symlink"
+    assert (downloads / "2026-10-02_a.pdf").read_bytes() == BODY
+    assert len(list((downloads / "store").rglob("*.pdf"))) == 1
+
+    manifest = downloads / "download_manifest.json"
+    download_pdf.record_results(manifest, [first, second])
+    data = json.loads(manifest.read_text())
+    assert data["stats"] == {"duplicates": 1, "bytes_saved": len(BODY)}
+    assert data["objects"][first["sha256"]]["names"] == ["2026-10-01_a.pdf", "2026-10-02_a.pdf"]
+
+
+@pytest.mark.parametrize("links", ["symlink", "hardlink"])
+def test_migration_is_idempotent(downloads, monkeypatch, links):
+    if links == "hardlink":
+        def no_symlinks(*args):
+            raise OSError("symlinks not permitted")
+        monkeypatch.setattr(download_pdf.os, "symlink", no_symlinks)
+    (downloads / "2025-01-12_order.pdf").write_bytes(BODY)
+    (downloads / "2025-02-03_order-copy.pdf").write_bytes(BODY)
+    (downloads / "2025-03-04_other.pdf").write_bytes(BODY[::-1])
+    manifest = downloads / "download_manifest.json"
+
+    results = download_pdf.migrate_to_store(manifest)
+    assert {r["link"] for r in results} == {links}
+    assert sum(r["duplicate"] for r in results) == 1
+    assert (downloads / "2025-02-03_order-copy.pdf").read_bytes() == BODY
+    stats = json.loads(manifest.read_text())["stats"]
+    assert stats == {"duplicates": 1, "bytes_saved": len(BODY)}
+
+    assert download_pdf.migrate_to_store(manifest) == []
+    assert json.loads(manifest.read_text())["stats"] == stats
@@ -0,0 +1,45 @@
+import itertools
+
+import pytest
+
+import extract_cache
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(extract_cache, "_now", lambda: f"2026-10-01T00:00:{next(clock):06d}")
+    conn = extract_cache.connect(tmp_path / "extract_cache.db")
+    yield conn
+    conn.close()
+
+
+def test_document_round_trip_and_shared_pages(conn):
+    extract_cache.store_document(conn, "sha-a", "x-1", ["p1", "p2", "p1"], ["one", "two", "one"])
+    assert extract_cache.lookup_document(conn, "sha-a", "x-1") == ["one", "two", "one"]
+    assert extract_cache.lookup_document(conn, "sha-a", "x-2") is None
+    assert extract_cache.lookup_pages(conn, ["p2", "p3"], "x-1") == {"p2": "two"}
+    assert extract_cache.cache_size(conn) == 6
+
+
+def test_document_with_evicted_pages_is_a_miss(conn):
+    extract_cache.store_document(conn, "sha-a", "x-1", ["p1", "p2"], ["one", "two"])
+    with conn:
+        conn.execute("DELETE FROM pages WHERE page_key = 'p2'")
+    assert extract_cache.lookup_document(conn, "sha-a", "x-1") is None
+
+
+def test_evicts_orphan_pages_then_least_recently_used_documents(conn):
+    extract_cache.store_pages(conn, "x-1", ["orphan"], ["o" * 10])
+    extract_cache.store_document(conn, "old", "x-1", ["shared", "p-old"], ["s" * 10, "a" * 10])
+    extract_cache.store_document(conn, "new", "x-1", ["shared", "p-new"], ["s" * 10, "b" * 10])
+    extract_cache.lookup_document(conn, "old", "x-1")  # Now the most recently used
+
+    assert extract_cache.evict(conn, max_bytes=40) == 0
+    assert extract_cache.evict(conn, max_bytes=30) == 0  # Dropping the orphan is enough
+    assert extract_cache.lookup_pages(conn, ["orphan"], "x-1") == {}
+
+    assert extract_cache.evict(conn, max_bytes=25) == 1
+    assert extract_cache.lookup_document(conn, "new", "x-1") is None
+    assert extract_cache.lookup_document(conn, "old", "x-1") == ["s" * 10, "a" * 10]
+    assert extract_cache.cache_size(conn) == 20
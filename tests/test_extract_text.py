@@ -0,0 +1,167 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import extract_cache
+import extract_text
+from pdfs import text_pdf, to_unicode_cmap
+
+PAGES = [f"Page {n} of the gazette notification" if n % 5 else "" for n in range(1, 24)]
+
+
+@pytest.fixture
+def gazette(tmp_path) -> Path:
+    path = tmp_path / "gazette.pdf"
+    path.write_bytes(text_pdf(PAGES))
+    return path
+
+
+def test_page_batches_are_contiguous_and_cover_every_page(monkeypatch):
+    assert extract_text.page_batches(list(range(3)), workers=8) == [[0, 1, 2]]
+    monkeypatch.setattr(extract_text, "MIN_PAGES_PER_TASK", 2)
+    indices = list(range(23))
+    batches = extract_text.page_batches(indices, workers=3)
+    assert [i for batch in batches for i in batch] == indices
+    assert len(batches) <= 3 * extract_text.TASKS_PER_WORKER
+    assert all(len(batch) >= 2 for batch in batches)
+
+
+def test_parallel_pages_match_serial_extraction(gazette, monkeypatch):
+    monkeypatch.setattr(extract_text, "MIN_PAGES_PER_TASK", 2)
+    serial = list(extract_text.iter_page_texts(gazette, range(len(PAGES))))
+    assert serial == [(n, text) for n, text in enumerate(PAGES, 1)]
+    assert list(extract_text.iter_page_texts(gazette, range(len(PAGES)), workers=3)) == serial
+    assert list(extract_text.iter_page_texts(gazette, [9, 2, 15], workers=2)) == [serial[2], serial[9], serial[15]]
+
+
+def test_extract_pdf_formats_pages_and_skips_empty_ones(gazette):
+    text, report = extract_text.extract_pdf(gazette, workers=2, use_cache=False)
+    assert text.startswith("--- Page 1 ---\nPage 1 of the gazette notification\n\n--- Page 2 ---")
+    assert "--- Page 5 ---" not in text
+    assert report == {"cache": "off", "pages": 23, "extracted": 23,
+                      "words": 6 * sum(1 for page in PAGES if page)}
+
+
+def test_batch_extracts_identical_files_once(tmp_path):
+    pdfs = tmp_path / "pdfs"
+    pdfs.mkdir()
+    (pdfs / "a.pdf").write_bytes(text_pdf(["First order"]))
+    (pdfs / "copy-of-a.pdf").write_bytes(text_pdf(["First order"]))
+    (pdfs / "b.pdf").write_bytes(text_pdf(["Second order", "with two pages"]))
+
+    results = extract_text.extract_batch(extract_text.find_pdfs(str(pdfs)), tmp_path / "out",
+                                         workers=2, use_cache=False)
+    assert all(r["success"] for r in results)
+    by_name = {Path(r["pdf"]).name: r for r in results}
+    assert sorted(by_name) == ["a.pdf", "b.pdf", "copy-of-a.pdf"]
+    assert [r["cache"] for r in results].count("dup") == 1
+    assert (tmp_path / "out" / "a.txt").read_text() == (tmp_path / "out" / "copy-of-a.txt").read_text()
+    assert by_name["b.pdf"]["words"] == 5
+
+
+
+@pytest.fixture
+def cache_db(tmp_path, monkeypatch):
+    """Point the extraction cache at a throwaway DB (forked workers inherit it)."""
+    connect = extract_cache.connect
+    monkeypatch.setattr(extract_cache, "connect", lambda: connect(tmp_path / "extract_cache.db"))
+
+
+def test_cache_hit_skips_extraction(gazette, cache_db):
+    text, report = extract_text.extract_pdf(gazette)
+    assert report["cache"] == "miss" and report["extracted"] == 23
+    again, report = extract_text.extract_pdf(gazette, workers=2)
+    assert again == text
+    assert report == {"cache": "hit", "pages": 23, "extracted": 0, "words": 6 * 19}
+
+
+def test_changed_page_is_the_only_one_reextracted(tmp_path, gazette, cache_db):
+    extract_text.extract_pdf(gazette)
+    revised = tmp_path / "gazette-revised.pdf"
+    revised.write_bytes(text_pdf(PAGES[:6] + ["Page 7 as corrected by the erratum"] + PAGES[7:]))
+
+    text, report = extract_text.extract_pdf(revised)
+    assert (report["cache"], report["extracted"]) == ("partial", 1)
+    assert "--- Page 7 ---\nPage 7 as corrected by the erratum" in text
+    assert "Page 8 of the gazette notification" in text
+
+
+def test_small_cache_evicts_older_documents(tmp_path, cache_db):
+    first, second = tmp_path / "first.pdf", tmp_path / "second.pdf"
+    first.write_bytes(text_pdf(["First notification text"]))
+    second.write_bytes(text_pdf(["Second notification text"]))
+    extract_text.extract_pdf(first, max_cache_bytes=30)
+    extract_text.extract_pdf(second, max_cache_bytes=30)
+
+    assert extract_text.extract_pdf(second)[1]["cache"] == "hit"
+    assert extract_text.extract_pdf(first)[1]["cache"] == "miss"
+
+
+def test_fingerprint_covers_the_font_encoding_and_tounicode_map(tmp_path, cache_db):
+    font = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding %s /ToUnicode 6 0 R >>"
+    straight, swapped, recoded = tmp_path / "straight.pdf", tmp_path / "swapped.pdf", tmp_path / "recoded.pdf"
+    straight.write_bytes(text_pdf(["AB"], font % b"/WinAnsiEncoding", [to_unicode_cmap({"A": "A", "B": "B"})]))
+    swapped.write_bytes(text_pdf(["AB"], font % b"/WinAnsiEncoding", [to_unicode_cmap({"A": "B", "B": "A"})]))
+    recoded.write_bytes(text_pdf(["AB"], font % b"/MacRomanEncoding", [to_unicode_cmap({"A": "A", "B": "B"})]))
+
+    fingerprints = [extract_text.page_fingerprints(pdf)[0] for pdf in (straight, swapped, recoded)]
+    assert len(set(fingerprints)) == 3
+    assert extract_text.extract_pdf(straight)[0] == "--- Page 1 ---\nAB"
+    text, report = extract_text.extract_pdf(swapped)
+    assert (text, report["cache"]) == ("--- Page 1 ---\nBA", "miss")
+
+
+def test_streaming_writes_the_same_text_as_a_whole_extraction(tmp_path, gazette, cache_db):
+    output = tmp_path / "gazette.txt"
+    report = extract_text.extract_streaming(gazette, output, workers=2, progress=False)
+    assert report["complete"] and report["error"] is None
+    assert (report["pages"], report["extracted"], report["words"]) == (23, 23, 6 * 19)
+    assert output.read_text(encoding="utf-8") == extract_text.extract_pdf(gazette, use_cache=False)[0]
+    assert not extract_text.resume_path(output).exists()
+
+    report = extract_text.extract_streaming(gazette, output, progress=False)
+    assert (report["cache"], report["extracted"]) == ("hit", 0)
+
+
+def test_streaming_resumes_after_a_failure(tmp_path, gazette, monkeypatch):
+    monkeypatch.setattr(extract_text, "CHECKPOINT_EVERY", 5)
+    iter_pages = extract_text.iter_pages
+
+    def failing_at_page_13(pdf_path, indices):
+        for number, text in iter_pages(pdf_path, indices):
+            if number == 13:
+                raise RuntimeError("corrupt page")
+            yield number, text
+
+    output = tmp_path / "gazette.txt"
+    monkeypatch.setattr(extract_text, "iter_pages", failing_at_page_13)
+    report = extract_text.extract_streaming(gazette, output, use_cache=False, progress=False)
+    assert not report["complete"] and report["error"] == "corrupt page"
+    assert "--- Page 12 ---" in output.read_text(encoding="utf-8")
+
+    pages_read = []
+    monkeypatch.setattr(extract_text, "iter_pages", lambda pdf_path, indices: (
+        pages_read.append(list(indices)) or iter_pages(pdf_path, indices)))
+    report = extract_text.extract_streaming(gazette, output, use_cache=False, resume=True, progress=False)
+    assert report["complete"]
+    assert pages_read == [list(range(12, 23))]  # From the page that failed
+    assert output.read_text(encoding="utf-8") == extract_text.extract_pdf(gazette, use_cache=False)[0]
+    assert not extract_text.resume_path(output).exists()
+
+
+def test_parallel_pages_keep_a_bounded_number_of_batches_in_flight(gazette, monkeypatch):
+    submitted = []
+
+    class RecordingPool(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            submitted.append(args[1])
+            return super().submit(fn, *args)
+
+    monkeypatch.setattr(extract_text, "ProcessPoolExecutor", RecordingPool)
+    monkeypatch.setattr(extract_text, "MIN_PAGES_PER_TASK", 1)
+    pages = extract_text.iter_page_texts(gazette, range(len(PAGES)), workers=2)
+    assert next(pages) == (1, PAGES[0])
+    assert len(submitted) == 2 * 2 + 1  # The window, refilled once
+    assert [number for number, _ in pages] == list(range(2, 24))
+    assert [i for batch in submitted for i in batch] == list(range(23))
@@ -0,0 +1,186 @@
+import json
+import sqlite3
+import sys
+import threading
+import time
+
+import pytest
+
+import fetch_rss
+
+FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Regulator updates</title>
+<item><title>Consultation paper on broadcasting services authorisation</title>
+<link>https://regulator.example/consultation/1</link><description>Comments due next month</description></item>
+<item><title>Directions on commercial communications</title>
+<link>https://regulator.example/directions/2</link><description>Unsolicited calls</description></item>
+</channel></rss>"""
+ETAG = '"feed-v1"'
+LAST_MODIFIED = "Wed, 01 Oct 2026 10:00:00 GMT"
+
+
+@pytest.fixture
+def feed_run(project, http_server, tmp_path, monkeypatch):
+    """Run fetch_rss.main() against a local feed; returns a function giving each run's output."""
+    project.write_tier(1, [{
+        "id": "regulator", "name": "Regulator", "method": "rss",
+        "url": http_server.url("/"), "rss": http_server.url("/feed.xml")
+    }])
+    monkeypatch.setattr(fetch_rss, "DB_PATH", project.state_dir / "seen_items.db")
+    monkeypatch.setattr(fetch_rss, "OUTPUT_DIR", project.output_dir)
+    monkeypatch.setattr(fetch_rss, "FOCUS_KEYWORDS_FILE", project.config_dir / "focus-area-keywords.json")
+    fetch_rss.get_url_rules.cache_clear()
+    fetch_rss.get_focus_tagger.cache_clear()
+
+    parses = []
+    parse = fetch_rss.feedparser.parse
+    monkeypatch.setattr(fetch_rss.feedparser, "parse", lambda content: parses.append(content) or parse(content))
+
+    output_path = tmp_path / "new_items.json"
+
+    def run() -> dict:
+        monkeypatch.setattr(sys, "argv", ["fetch_rss.py", "--tier=1", f"--output={output_path}"])
+        fetch_rss.main()
+        return json.loads(output_path.read_text(encoding="utf-8"))
+
+    run.parses = parses
+    yield run
+    fetch_rss.get_url_rules.cache_clear()
+    fetch_rss.get_focus_tagger.cache_clear()
+
+
+def conditional_feed(handler):
+    """The feed, or 304 when the request carries matching validators."""
+    if handler.headers.get("If-None-Match") == ETAG or handler.headers.get("If-Modified-Since") == LAST_MODIFIED:
+        return 304, {"ETag": ETAG}, b""
+    return 200, {"Content-Type": "application/rss+xml", "ETag": ETAG, "Last-Modified": LAST_MODIFIED}, FEED
+
+
+def test_unchanged_feed_is_not_parsed_after_304(feed_run, http_server):
+    http_server.routes["/feed.xml"] = conditional_feed
+
+    first = feed_run()
+    assert first["new_items_count"] == 2
+    assert first["stats"]["not_modified"] == 0
+    assert len(feed_run.parses) == 1
+    assert "If-None-Match" not in http_server.requests[0]["headers"]
+
+    second = feed_run()
+    headers = http_server.requests[-1]["headers"]
+    assert headers["If-None-Match"] == ETAG
+    assert headers["If-Modified-Since"] == LAST_MODIFIED
+    assert len(feed_run.parses) == 1
+    stats = second["stats"]
+    assert (stats["not_modified"], stats["not_modified_304"], stats["not_modified_hash"]) == (1, 1, 0)
+    assert stats["not_modified_sources"] == ["regulator"]
+    assert second["new_items_count"] == 0
+
+
+def test_same_body_is_not_parsed_when_validators_are_ignored(feed_run, http_server):
+    http_server.routes["/feed.xml"] = (200, {"Content-Type": "application/rss+xml"}, FEED)
+
+    feed_run()
+    second = feed_run()
+    assert len(feed_run.parses) == 1
+    stats = second["stats"]
+    assert (stats["not_modified"], stats["not_modified_304"], stats["not_modified_hash"]) == (1, 0, 1)
+    assert stats["bytes_received"] == len(FEED)
+
+
+def test_changed_body_is_parsed_again(feed_run, http_server):
+    http_server.routes["/feed.xml"] = (200, {"ETag": ETAG}, FEED)
+    feed_run()
+
+    updated = FEED.replace(b"</channel>", b"<item><title>New tariff order</title>"
+                                          b"<link>https://regulator.example/tariff/3</link></item></channel>")
+    http_server.routes["/feed.xml"] = (200, {"ETag": '"feed-v2"'}, updated)
+    second = feed_run()
+    assert len(feed_run.parses) == 2
+    assert second["stats"]["not_modified"] == 0
+    assert [item["url"] for item in second["items"]] == ["https://regulator.example/tariff/3"]
+
+
+def test_async_engine_respects_global_and_per_host_limits(monkeypatch):
+    lock = threading.Lock()
+    in_flight = {"total": 0, "max_total": 0}
+    per_host: dict[str, int] = {}
+    max_per_host: dict[str, int] = {}
+
+    def fake_fetch(source, validators=None):
+        host = fetch_rss.feed_host(source["rss"])
+        with lock:
+            in_flight["total"] += 1
+            in_flight["max_total"] = max(in_flight["max_total"], in_flight["total"])
+            per_host[host] = per_host.get(host, 0) + 1
+            max_per_host[host] = max(max_per_host.get(host, 0), per_host[host])
+        time.sleep(0.02)
+        with lock:
+            in_flight["total"] -= 1
+            per_host[host] -= 1
+        return {"source_id": source["id"], "validators": validators}
+
+    monkeypatch.setattr(fetch_rss, "fetch_single_feed", fake_fetch)
+    sources = [{"id": f"{host}-{i}", "rss": f"https://www.{host}.example/feed/{i}"}
+               for host in ("a", "b", "c", "d") for i in range(5)]
+    callback_threads = set()
+
+    results = fetch_rss.fetch_all_feeds_async(
+        sources, max_concurrency=6, per_host_limit=2, validators={"a-0": {"etag": "x"}},
+        on_result=lambda result: callback_threads.add(threading.get_ident()))
+
+    assert [r["source_id"] for r in results] == [s["id"] for s in sources]
+    assert results[0]["validators"] == {"etag": "x"}
+    assert max(max_per_host.values()) == 2
+    assert in_flight["max_total"] <= 6
+    assert callback_threads == {threading.get_ident()}
+
+
+@pytest.fixture
+def seen_db(project, monkeypatch):
+    monkeypatch.setattr(fetch_rss, "DB_PATH", project.state_dir / "seen_items.db")
+    fetch_rss.get_url_rules.cache_clear()
+    conn = fetch_rss.init_database()
+    yield conn
+    conn.close()
+    fetch_rss.get_url_rules.cache_clear()
+
+
+def test_filter_new_items_looks_up_in_chunks(seen_db, monkeypatch):
+    monkeypatch.setattr(fetch_rss, "SQL_CHUNK_SIZE", 3)
+    items = [{"url": f"https://example.com/{i}", "title": f"Item {i}"} for i in range(10)]
+    with seen_db:
+        fetch_rss.mark_items_seen(seen_db, items[2:9:2], "ministry")
+    statements = []
+    seen_db.set_trace_callback(statements.append)
+
+    new = fetch_rss.filter_new_items(seen_db, items, "ministry")
+
+    assert [item["url"] for item in new] == [f"https://example.com/{i}" for i in (0, 1, 3, 5, 7, 9)]
+    assert len([sql for sql in statements if sql.startswith("SELECT url FROM seen_items")]) == 4
+
+
+def test_filter_new_items_shares_claimed_urls_across_feeds(seen_db):
+    claimed = set()
+    first = fetch_rss.filter_new_items(seen_db, [
+        {"url": "https://example.com/a", "canonical_url": "https://example.com/a"},
+        {"url": "https://example.com/a?utm_source=x", "canonical_url": "https://example.com/a"},
+        {"url": ""},
+    ], "one", claimed)
+    second = fetch_rss.filter_new_items(seen_db, [
+        {"url": "https://www.example.com/a/", "canonical_url": "https://example.com/a"},
+        {"url": "https://example.com/b"},
+    ], "two", claimed)
+    assert [item["url"] for item in first] == ["https://example.com/a"]
+    assert [item["url"] for item in second] == ["https://example.com/b"]
+
+
+def test_mark_items_seen_leaves_the_commit_to_the_caller(seen_db, project):
+    items = [{"url": "https://example.com/a", "title": "A", "source_id": "own"},
+             {"url": "https://example.com/b", "title": "B"}]
+    fetch_rss.mark_items_seen(seen_db, items, "fallback")
+    other = sqlite3.connect(project.state_dir / "seen_items.db")
+    assert other.execute("SELECT COUNT(*) FROM seen_items").fetchone() == (0,)
+    seen_db.commit()
+    assert sorted(other.execute("SELECT url, source_id FROM seen_items")) == [
+        ("https://example.com/a", "own"), ("https://example.com/b", "fallback")]
+    other.close()
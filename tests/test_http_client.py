@@ -0,0 +1,109 @@
+import socket
+import threading
+
+import pytest
+import requests
+
+import http_client
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry waits instead of sleeping."""
+    waits = []
+    monkeypatch.setattr(http_client.time, "sleep", waits.append)
+    monkeypatch.setattr(http_client, "_backoff", lambda attempt: 0.5 * 2 ** attempt)
+    return waits
+
+
+@pytest.fixture
+def one_slot_per_host(monkeypatch):
+    monkeypatch.setattr(http_client, "HOST_CONNECTION_LIMIT", 1)
+    monkeypatch.setattr(http_client, "_host_slots", {})
+    return lambda: http_client._host_slot("127.0.0.1")
+
+
+def _free(slot) -> bool:
+    if slot.acquire(blocking=False):
+        slot.release()
+        return True
+    return False
+
+
+def test_retries_5xx_and_429_honouring_retry_after(http_server, sleeps):
+    responses = iter([(503, {}, b"busy"), (429, {"Retry-After": "7"}, b"slow down"), (200, {}, b"ok")])
+    http_server.routes["/page"] = lambda handler: next(responses)
+
+    response = http_client.get(http_server.url("/page"))
+    assert (response.status_code, response.text) == (200, "ok")
+    assert sleeps == [0.5, 7.0]
+    assert len(http_server.requests) == 3
+
+
+def test_gives_back_the_last_response_when_retries_run_out(http_server, sleeps):
+    http_server.routes["/page"] = (502, {"Retry-After": "9999"}, b"bad gateway")
+    response = http_client.get(http_server.url("/page"), retries=2)
+    assert response.status_code == 502
+    assert sleeps == [http_client.RETRY_AFTER_MAX] * 2
+
+
+def test_client_errors_are_not_retried(http_server, sleeps):
+    assert http_client.get(http_server.url("/missing")).status_code == 404
+    assert sleeps == [] and len(http_server.requests) == 1
+
+
+def test_connection_errors_are_retried_then_raised(sleeps):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    with pytest.raises(requests.ConnectionError):
+        http_client.get(f"http://127.0.0.1:{port}/", retries=2)
+    assert sleeps == [0.5, 1.0]
+
+
+def test_session_is_pooled_per_thread():
+    session = http_client.get_session()
+    assert http_client.get_session() is session
+    other = []
+    thread = threading.Thread(target=lambda: other.append(http_client.get_session()))
+    thread.start()
+    thread.join()
+    assert other[0] is not session
+
+
+def test_slot_is_released_after_a_plain_request(http_server, one_slot_per_host):
+    http_server.routes["/page"] = (200, {}, b"ok")
+    http_client.get(http_server.url("/page"))
+    http_client.get(http_server.url("/page"))
+    assert _free(one_slot_per_host())
+
+
+def test_streamed_response_holds_the_slot_until_closed(http_server, one_slot_per_host):
+    http_server.routes["/doc.pdf"] = (200, {}, b"%PDF" * 1000)
+
+    response = http_client.get(http_server.url("/doc.pdf"), stream=True)
+    assert not _free(one_slot_per_host())
+    assert response.raw.read(4) == b"%PDF"
+    response.close()
+    assert _free(one_slot_per_host())
+
+    with http_client.get(http_server.url("/doc.pdf"), stream=True) as response:
+        assert not _free(one_slot_per_host())
+    assert _free(one_slot_per_host())
+
+    # A response dropped without close() gives its slot back too
+    http_client.get(http_server.url("/doc.pdf"), stream=True)
+    assert _free(one_slot_per_host())
+
+
+def test_latency_report_counts_requests_and_retries(http_server, sleeps, monkeypatch):
+    monkeypatch.setattr(http_client, "_latencies", type(http_client._latencies)(list))
+    monkeypatch.setattr(http_client, "_counters", type(http_client._counters)(
+        lambda: {"retries": 0, "errors": 0}))
+    responses = iter([(500, {}, b""), (200, {}, b"ok")])
+    http_server.routes["/page"] = lambda handler: next(responses)
+    http_client.get(http_server.url("/page"))
+
+    report = http_client.latency_report()["127.0.0.1"]
+    assert (report["requests"], report["retries"], report["errors"]) == (2, 1, 0)
+    assert http_client.latency_report_lines()[0].startswith("Per-host latency")
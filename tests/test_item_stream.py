@@ -0,0 +1,93 @@
+import gzip
+import threading
+
+import pytest
+
+from item_stream import NDJSONWriter, compact, default_compact_path, iter_records, merge_run_summary
+
+
+@pytest.mark.parametrize("name", ["new_items.ndjson", "new_items.ndjson.gz"])
+def test_writer_round_trip_and_append(tmp_path, name):
+    path = tmp_path / name
+    with NDJSONWriter(path) as writer:
+        writer.write("item", {"url": "https://example.com/a", "title": "Ünïcode"})
+    with NDJSONWriter(path, append=True) as writer:
+        writer.write("page_change", {"url": "https://example.com/p"})
+    assert writer.counts == {"page_change": 1}
+    assert list(iter_records(path)) == [
+        {"record": "item", "url": "https://example.com/a", "title": "Ünïcode"},
+        {"record": "page_change", "url": "https://example.com/p"},
+    ]
+    if name.endswith(".gz"):
+        assert gzip.decompress(path.read_bytes()).count(b"\n") == 2
+
+
+def test_writer_without_append_truncates(tmp_path):
+    path = tmp_path / "new_items.ndjson"
+    path.write_text('{"record": "item", "url": "old"}\n', encoding="utf-8")
+    for shared in (False, True):
+        with NDJSONWriter(path, shared=shared) as writer:
+            writer.write("item", {"url": "new"})
+        assert [r["url"] for r in iter_records(path)] == ["new"]
+
+
+def test_shared_writers_never_interleave_lines(tmp_path):
+    path = tmp_path / "new_items.ndjson"
+    writers = [NDJSONWriter(path, append=True, shared=True) for _ in range(4)]
+
+    def write(writer, n):
+        for i in range(200):
+            writer.write("item", {"url": f"https://example.com/{n}/{i}", "snippet": "x" * 500})
+
+    threads = [threading.Thread(target=write, args=(w, n)) for n, w in enumerate(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    records = list(iter_records(path))
+    assert len(records) == 800
+    assert len({r["url"] for r in records}) == 800
+
+
+def test_truncated_last_line_is_skipped(tmp_path):
+    path = tmp_path / "new_items.ndjson"
+    path.write_text('{"record": "item", "url": "a"}\n\n{"record": "item", "url"', encoding="utf-8")
+    assert list(iter_records(path)) == [{"record": "item", "url": "a"}]
+
+
+def test_compact_builds_the_json_document(tmp_path):
+    path = tmp_path / "new_items.ndjson"
+    with NDJSONWriter(path) as writer:
+        writer.write("item", {"url": "https://a.example/1", "source_id": "a"})
+        writer.write("alternate", {"url": "https://b.example/1", "source_id": "b",
+                                   "duplicate_of": "https://a.example/1"})
+        writer.write("page_change", {"source_id": "p", "section": "main"})
+        writer.write("fetch_run", {"fetched_at": "2026-10-01T00:00:00", "tiers": [2],
+                                   "stats": {"new_items": 1, "not_modified_sources": ["x"]},
+                                   "websearch_pending": ["w"]})
+        writer.write("fetch_run", {"fetched_at": "2026-10-01T01:00:00", "tiers": [1],
+                                   "stats": {"new_items": 2, "not_modified_sources": ["y"]},
+                                   "websearch_pending": ["w", "v"]})
+        writer.write("page_run", {"stats": {"total_pages": 3}})
+        writer.write("page_run", {"stats": {"total_pages": 2}})
+
+    document = compact(path)
+    assert document["new_items_count"] == 1
+    assert document["items"][0]["alternate_sources"] == [{"url": "https://b.example/1", "source_id": "b"}]
+    assert document["page_changes"] == [{"source_id": "p", "section": "main"}]
+    assert document["fetched_at"] == "2026-10-01T01:00:00"
+    assert document["tiers"] == [1, 2]
+    assert document["stats"] == {"new_items": 3, "not_modified_sources": ["x", "y"]}
+    assert document["websearch_pending"] == ["w", "v"]
+    assert document["page_monitor_stats"] == {"total_pages": 5}
+
+
+def test_merge_run_summary_adds_numbers_and_keeps_latest():
+    document = {"fetched_at": "2026-10-02", "stats": {"successful": 2, "engine": "threads"}}
+    merge_run_summary(document, {"fetched_at": "2026-10-01", "stats": {"successful": 3, "engine": "async"}})
+    assert document["fetched_at"] == "2026-10-02"
+    assert document["stats"] == {"successful": 5, "engine": "async"}
+
+
+def test_default_compact_path(tmp_path):
+    assert default_compact_path(tmp_path / "new_items.ndjson.gz") == tmp_path / "new_items.json"
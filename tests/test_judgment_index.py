@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+import judgment_index
+
+JUDGMENTS = {
+    "2015-Free-Speech-Shreya-Singhal": {
+        "case_name": "Shreya Singhal v Union of India", "court": "Supreme Court of India",
+        "judgment_date": "2015-03-24", "focus_areas": ["Free-Speech", "IT-Act"],
+        "statutes_interpreted": ["IT Act Sec 66A", "IT Act Sec 79"], "landmark": True, "landmark_score": 10
+    },
+    "2017-Privacy-Puttaswamy": {
+        "case_name": "K.S. Puttaswamy v Union of India", "court": "Supreme Court of India",
+        "judgment_date": "2017-08-24", "focus_areas": ["Data-Protection"], "landmark": True, "landmark_score": 9
+    },
+    "2023-IT-Act-Kunal-Kamra": {
+        "case_name": "Kunal Kamra v Union of India", "court": "Bombay High Court",
+        "judgment_date": "2023-01-31", "focus_areas": ["IT-Act"], "statutes_interpreted": ["IT Act Sec 79"]
+    },
+}
+
+
+@pytest.fixture
+def judgments(tmp_path, monkeypatch):
+    directory = tmp_path / "sources" / "judgements"
+    monkeypatch.setattr(judgment_index, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(judgment_index, "JUDGEMENTS_DIR", directory)
+    monkeypatch.setattr(judgment_index, "INDICES_DIR", directory / "indices")
+    monkeypatch.setattr(judgment_index, "MASTER_INDEX", directory / "indices" / "master-index.json")
+    monkeypatch.setattr(judgment_index, "STAT_CACHE", tmp_path / "sources" / "state" / "judgment_index_cache.json")
+    for folder, metadata in JUDGMENTS.items():
+        (directory / folder).mkdir(parents=True)
+        (directory / folder / "metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+    return directory
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Names of the metadata folders hashed during a build."""
+    folders = []
+    sha256 = judgment_index._sha256
+    monkeypatch.setattr(judgment_index, "_sha256", lambda path: folders.append(path.parent.name) or sha256(path))
+    return folders
+
+
+def _ids(entries):
+    return [entry["id"] for entry in entries]
+
+
+def test_build_and_query(judgments):
+    stats = judgment_index.update_indices()
+    assert (stats["judgments"], stats["updated"], stats["errors"]) == (3, 3, [])
+    assert len(stats["written"]) == 6
+
+    assert _ids(judgment_index.query(focus_area="it-act")) == [
+        "2023-IT-Act-Kunal-Kamra", "2015-Free-Speech-Shreya-Singhal"]
+    assert _ids(judgment_index.query(court="Supreme Court of India", year=2017)) == ["2017-Privacy-Puttaswamy"]
+    assert _ids(judgment_index.query(statute="IT Act Sec 79", landmark=True)) == ["2015-Free-Speech-Shreya-Singhal"]
+    assert judgment_index.query(focus_area="Telecom") == []
+    landmarks = json.loads((judgments / "indices" / "landmark-cases.json").read_text())["landmark_cases"]
+    assert [case["landmark_score"] for case in landmarks] == [10, 9]
+
+
+def test_unchanged_metadata_is_neither_hashed_nor_rewritten(judgments, hashed):
+    judgment_index.update_indices()
+    hashed.clear()
+    master_mtime = judgment_index.MASTER_INDEX.stat().st_mtime_ns
+
+    stats = judgment_index.update_indices()
+    assert (stats["reused"], stats["updated"], stats["written"]) == (3, 0, [])
+    assert hashed == []
+    assert judgment_index.MASTER_INDEX.stat().st_mtime_ns == master_mtime
+
+    # A new mtime (e.g. a fresh checkout) costs a hash, not a re-parse or a rewrite
+    metadata = judgments / "2017-Privacy-Puttaswamy" / "metadata.json"
+    os.utime(metadata, ns=(metadata.stat().st_atime_ns, metadata.stat().st_mtime_ns + 10**9))
+    stats = judgment_index.update_indices()
+    assert hashed == ["2017-Privacy-Puttaswamy"]
+    assert (stats["reused"], stats["written"]) == (3, [])
+
+
+def test_changed_and_removed_judgments(judgments):
+    judgment_index.update_indices()
+    metadata = {**JUDGMENTS["2023-IT-Act-Kunal-Kamra"], "court": "Supreme Court of India"}
+    (judgments / "2023-IT-Act-Kunal-Kamra" / "metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+    (judgments / "2017-Privacy-Puttaswamy" / "metadata.json").unlink()
+
+    stats = judgment_index.update_indices()
+    assert (stats["updated"], stats["reused"], stats["removed"]) == (1, 1, 1)
+    assert "by-statute-interpreted.json" not in stats["written"]
+    assert _ids(judgment_index.query(court="Bombay High Court")) == []
+    assert _ids(judgment_index.query(court="Supreme Court of India")) == [
+        "2023-IT-Act-Kunal-Kamra", "2015-Free-Speech-Shreya-Singhal"]
+    # Focus areas already in the index are kept even when no judgment is left in them
+    assert judgment_index.query(focus_area="Data-Protection") == []
+    assert "Data-Protection" in json.loads((judgments / "indices" / "by-focus-area.json").read_text())["focus_areas"]
+
+
+def test_broken_metadata_keeps_the_last_good_entry(judgments):
+    judgment_index.update_indices()
+    (judgments / "2017-Privacy-Puttaswamy" / "metadata.json").write_text("{not json", encoding="utf-8")
+
+    stats = judgment_index.update_indices()
+    assert len(stats["errors"]) == 1 and "2017-Privacy-Puttaswamy" in stats["errors"][0]
+    assert _ids(judgment_index.query(year="2017")) == ["2017-Privacy-Puttaswamy"]
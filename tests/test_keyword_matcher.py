@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from bench_keyword_matcher import load_keyword_lists, naive_pass
+from keyword_matcher import FocusAreaTagger, KeywordMatcher, compile_keywords
+
+TEXTS = [
+    "MeitY notifies amendments to the IT Rules, 2021",
+    "TRAI releases consultation paper on OTT communication services",
+    "Supreme Court on Section 69A blocking orders",
+    "DPDP Rules: data fiduciary obligations explained",
+    "Said the minister: nothing about artificial intelligence today",
+    "",
+    "Ständige Kommission — telecom licensing in the EU",
+]
+
+
+@pytest.fixture(scope="module")
+def keyword_lists():
+    lists = load_keyword_lists()
+    assert lists, "the tier configs should have filter_keywords lists"
+    return lists
+
+
+def test_matches_the_old_substring_loop_on_configured_lists(keyword_lists):
+    rng = random.Random(6)
+    texts = list(TEXTS)
+    for keywords in keyword_lists:
+        for kw in rng.sample(keywords, min(3, len(keywords))):
+            texts.append(f"News: {kw.upper()} update")
+            texts.append(kw[:-1])  # Near miss
+    for keywords in keyword_lists:
+        matcher = KeywordMatcher(keywords)
+        for text in texts:
+            assert bool(matcher.find(text)) == matcher.matches(text) == naive_pass(text, keywords), (keywords, text)
+
+
+def test_find_reports_configured_spelling_once():
+    matcher = KeywordMatcher(["DPDP", "dpdp", " Data Protection ", "", "  "])
+    assert matcher.keywords == ["DPDP", "Data Protection"]
+    assert matcher.find("new dpdp and DATA PROTECTION rules") == {"DPDP", "Data Protection"}
+    assert not KeywordMatcher([])
+
+
+def test_whole_words():
+    matcher = KeywordMatcher(["AI", "IT Rules"], whole_words=True)
+    assert matcher.find("said the AI panel on IT Rules") == {"AI", "IT Rules"}
+    assert matcher.find("said the maid about IT Rulesets") == set()
+
+
+def test_focus_area_tagger():
+    tagger = FocusAreaTagger({
+        "Data-Protection": ["DPDP", "personal data"],
+        "AI-Governance": ["AI", "deepfake"],
+        "Intermediary-Liability": ["IT Rules", "DPDP"],
+    })
+    assert tagger.tag("MeitY DPDP rules cover personal data and deepfake AI") == {
+        "Data-Protection": ["DPDP", "personal data"],
+        "AI-Governance": ["AI", "deepfake"],
+        "Intermediary-Liability": ["DPDP"],
+    }
+    assert tagger.tag("He said nothing") == {}
+
+
+def test_compile_keywords_reuses_matchers():
+    assert compile_keywords(["a", "b"]) is compile_keywords(("a", "b"))
+    assert compile_keywords(["a", "b"]) is not compile_keywords(["a", "b"], whole_words=True)
@@ -0,0 +1,288 @@
+import json
+import threading
+import time
+
+import monitor_pages
+from state_io import update_json
+
+
+def test_pages_are_checked_in_parallel_across_hosts_and_in_order_per_host(monkeypatch):
+    lock = threading.Lock()
+    calls = []  # (host, start, end)
+    active = {"now": 0, "max": 0}
+
+    def fake_check(source, url, section_name, stored_hashes, parser="html.parser", snapshots=None):
+        start = time.monotonic()
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.03)
+        with lock:
+            active["now"] -= 1
+            calls.append((monitor_pages.page_host(url), start, time.monotonic()))
+        return {"source_id": source["id"], "section": section_name, "url": url}
+
+    monkeypatch.setattr(monitor_pages, "check_single_page", fake_check)
+    sources = [
+        {"id": "ministry", "url": "https://www.ministry.example", "request_delay": 0.05,
+         "sections": [{"name": "press", "path": "/press"}, {"name": "notices", "path": "/notices"},
+                      {"name": "rules", "path": "/rules"}]},
+        {"id": "regulator", "url": "https://regulator.example", "request_delay": 0.01,
+         "sections": [{"name": "orders", "path": "/orders"}, {"name": "papers", "path": "/papers"}]},
+        {"id": "ministry-archive", "url": "https://ministry.example/archive", "request_delay": 0.02},
+    ]
+    seen = []
+
+    results = monitor_pages.monitor_all_sources(sources, {}, max_hosts=4, on_result=seen.append)
+
+    assert [(r["source_id"], r["section"]) for r in results] == [
+        ("ministry", "press"), ("ministry", "notices"), ("ministry", "rules"),
+        ("regulator", "orders"), ("regulator", "papers"), ("ministry-archive", "main")]
+    assert len(seen) == len(results)
+    assert active["max"] == 2  # One worker per host
+    ministry = sorted((start, end) for host, start, end in calls if host == "ministry.example")
+    assert len(ministry) == 4
+    # Same host: one at a time, spaced by the host's largest request_delay
+    for (_, previous_end), (start, _) in zip(ministry, ministry[1:]):
+        assert start - previous_end >= 0.05
+
+
+def _page_output(tier, changes=(), items=(), stats=None):
+    return {
+        "checked_at": f"2026-10-01T0{tier}:00:00",
+        "tiers": [tier],
+        "stats": stats or {"total_pages": 2, "changes_detected": len(changes)},
+        "page_changes": list(changes),
+        "items": list(items),
+        "errors": [],
+    }
+
+
+def _change(source_id, section, links, blocks=(), checked="2026-10-01"):
+    return {"source_id": source_id, "source_name": source_id, "section": section,
+            "url": f"https://{source_id}.example/{section}", "change_detected": True,
+            "notable_links": [{"text": link, "url": f"https://{source_id}.example/{link}"} for link in links],
+            "new_blocks": list(blocks), "via": None, "last_checked": checked}
+
+
+def test_tier_runs_merge_into_fetch_output(tmp_path):
+    path = tmp_path / "new_items.json"
+    path.write_text(json.dumps({"fetched_at": "2026-10-01T00:00:00", "tiers": [1, 2], "stats": {"new_items": 1},
+                                "items": [{"url": "https://feed.example/1"}], "new_items_count": 1,
+                                "page_changes": []}), encoding="utf-8")
+    tier1 = _page_output(1, [_change("meity", "press", ["a"])],
+                         [{"url": "https://feed.example/1"}, {"url": "https://site.example/x"}])
+    tier2 = _page_output(2, [_change("trai", "main", ["b"]), _change("meity", "press", ["a", "c"], ["New block"],
+                                                                       checked="2026-10-02")])
+
+    update_json(path, lambda existing: monitor_pages.merge_page_output(existing, tier1))
+    merged = update_json(path, lambda existing: monitor_pages.merge_page_output(existing, tier2))
+
+    assert [(c["source_id"], c["section"]) for c in merged["page_changes"]] == [("meity", "press"), ("trai", "main")]
+    meity = merged["page_changes"][0]
+    assert [link["text"] for link in meity["notable_links"]] == ["a", "c"]
+    assert meity["new_blocks"] == ["New block"]
+    assert meity["last_checked"] == "2026-10-02"
+    assert [item["url"] for item in merged["items"]] == ["https://feed.example/1", "https://site.example/x"]
+    assert merged["new_items_count"] == 2
+    assert merged["stats"] == {"new_items": 1}
+    assert merged["page_monitor_stats"] == {"total_pages": 4, "changes_detected": 3}
+
+
+def test_tier_runs_merge_without_fetch_output(tmp_path):
+    path = tmp_path / "new_items.json"
+    first = update_json(path, lambda existing: monitor_pages.merge_page_output(
+        existing, _page_output(2, [_change("trai", "main", ["b"])])))
+    assert first["tiers"] == [2]
+    merged = update_json(path, lambda existing: monitor_pages.merge_page_output(
+        existing, _page_output(1, [_change("meity", "press", ["a"])])))
+    assert merged["tiers"] == [1, 2]
+    assert merged["checked_at"] == "2026-10-01T02:00:00"
+    assert merged["stats"] == {"total_pages": 4, "changes_detected": 2}
+    assert len(merged["page_changes"]) == 2
+
+
+def test_diff_snapshot_first_check_adds_everything():
+    links = {"https://x.example/a": {"url": "https://x.example/a", "text": "A"}}
+    blocks = {"k1": "First block of text"}
+    added_links, added_blocks, snapshot = monitor_pages.diff_snapshot(None, links, blocks, "2026-10-01")
+    assert added_links == [links["https://x.example/a"]]
+    assert added_blocks == ["First block of text"]
+    assert snapshot == {"links": {"https://x.example/a": "2026-10-01"}, "blocks": {"k1": "2026-10-01"}}
+
+
+def test_diff_snapshot_reports_only_new_and_expires_old():
+    previous = {
+        "links": {"https://x.example/a": "2026-09-30", "https://x.example/old": "2026-01-01"},
+        "blocks": {"k1": "2026-09-30", "k-gone": "2026-09-29"},
+    }
+    links = {"https://x.example/a": {"url": "https://x.example/a"},
+             "https://x.example/b": {"url": "https://x.example/b"}}
+    added_links, added_blocks, snapshot = monitor_pages.diff_snapshot(previous, links, {"k1": "Same block"},
+                                                                      "2026-10-01")
+    assert added_links == [{"url": "https://x.example/b"}]
+    assert added_blocks == []
+    # Rotated-out entries are kept for a while so they do not come back as new
+    assert snapshot["blocks"] == {"k1": "2026-10-01", "k-gone": "2026-09-29"}
+    assert "https://x.example/old" not in snapshot["links"]
+    assert snapshot["links"]["https://x.example/b"] == "2026-10-01"
+
+
+def _listing(orders: list[str], footer: str = "Page generated at 10:00") -> bytes:
+    items = "".join(f'<li><a href="/orders/{n}.pdf">Order {n} on the telecom licensing framework</a></li>'
+                    for n in orders)
+    return (f"<html><body><main><h1>Press releases and orders of the regulator</h1><ul>{items}</ul>"
+            f"<p>{footer}</p></main></body></html>").encode()
+
+
+def test_only_added_links_and_blocks_are_changes(http_server):
+    source = {"id": "regulator", "name": "Regulator", "url": http_server.url("/orders"),
+              "ignore": {"patterns": [r"Page generated at \d+:\d+"]}}
+    snapshots = {}
+
+    def check(page: bytes) -> dict:
+        http_server.routes["/orders"] = (200, {"Content-Type": "text/html"}, page)
+        result = monitor_pages.check_single_page(source, http_server.url("/orders"), "main", {}, snapshots=snapshots)
+        assert result["success"], result["error"]
+        snapshots["regulator:main"] = result["snapshot"]
+        return result
+
+    assert not check(_listing(["1", "2"]))["change_detected"]  # First check only records
+    assert not check(_listing(["2", "1"], footer="Page generated at 11:30"))["change_detected"]
+    assert not check(_listing(["2"]))["change_detected"]  # Removals are not changes
+
+    result = check(_listing(["3", "2"]))
+    assert result["change_detected"]
+    assert result["notable_links"] == [{"text": "Order 3 on the telecom licensing framework",
+                                        "url": http_server.url("/orders/3.pdf")}]
+    assert result["new_blocks"] == ["Order 3 on the telecom licensing framework"]
+    assert not check(_listing(["1", "3", "2"]))["change_detected"]  # Seen within SNAPSHOT_KEEP_DAYS
+
+
+def test_extraction_problem_empty():
+    assert monitor_pages.extraction_problem(10, 0, []).startswith("empty extraction")
+
+
+def test_extraction_problem_collapse_needs_history():
+    history = [["2026-09-%02d" % day, 5000, 40] for day in range(1, monitor_pages.MIN_HISTORY + 1)]
+    assert monitor_pages.extraction_problem(900, 40, history[:-1]) is None
+    assert monitor_pages.extraction_problem(900, 40, history).startswith("extraction collapsed")
+    assert monitor_pages.extraction_problem(4800, 5, history).startswith("extraction collapsed")
+    assert monitor_pages.extraction_problem(4800, 38, history) is None
+
+
+JS_SHELL = b'<html><body><div id="app"></div><script src="/app.js"></script></body></html>'
+FEED = (b'<?xml version="1.0"?><rss version="2.0"><channel><title>Orders</title>'
+        b'<item><title>Order 7 on spectrum auctions</title><link>https://regulator.example/7</link>'
+        b'<description>Spectrum auction order</description></item></channel></rss>')
+
+
+def test_empty_page_keeps_its_snapshot_and_backs_off(http_server):
+    source = {"id": "regulator", "url": http_server.url("/orders")}
+    http_server.routes["/orders"] = (200, {}, _listing(["1", "2"]))
+    first = monitor_pages.check_single_page(source, http_server.url("/orders"), "main", {})
+    snapshots = {"regulator:main": first["snapshot"]}
+
+    http_server.routes["/orders"] = (200, {}, JS_SHELL)
+    for run in range(1, monitor_pages.EMPTY_BACKOFF_RUNS + 1):
+        result = monitor_pages.check_single_page(source, http_server.url("/orders"), "main", {}, snapshots=snapshots)
+        assert result["extraction_failed"] and not result["success"]
+        assert result["error"].startswith("Extraction failed: empty extraction")
+        assert result["snapshot"]["links"] == first["snapshot"]["links"]
+        assert result["snapshot"]["extraction"]["empty_runs"] == run
+        snapshots["regulator:main"] = result["snapshot"]
+
+    requests_before = len(http_server.requests)
+    result = monitor_pages.check_single_page(source, http_server.url("/orders"), "main", {}, snapshots=snapshots)
+    assert result["skipped"] and len(http_server.requests) == requests_before
+
+
+def test_fallback_feed_stands_in_for_an_empty_page(http_server):
+    source = {"id": "regulator", "url": http_server.url("/orders"),
+              "fallbacks": [{"type": "url", "url": http_server.url("/missing")},
+                            {"type": "rss", "url": http_server.url("/orders.xml")}]}
+    http_server.routes["/orders"] = (200, {}, JS_SHELL)
+    http_server.routes["/orders.xml"] = (200, {"Content-Type": "application/rss+xml"}, FEED)
+
+    result = monitor_pages.check_single_page(source, http_server.url("/orders"), "main", {})
+    assert result["success"] and not result["extraction_failed"]
+    assert result["fallback"] == f"rss:{http_server.url('/orders.xml')}"
+    assert result["snapshot"]["via"] == result["fallback"]
+    assert list(result["snapshot"]["links"]) == ["https://regulator.example/7"]
+    assert http_server.paths() == ["/orders", "/missing", "/orders.xml"]
+
+
+def _urlset(entries: dict[str, str]) -> bytes:
+    urls = "".join(f"<url><loc>{loc}</loc><lastmod>{lastmod}</lastmod></url>" for loc, lastmod in entries.items())
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'.encode()
+
+
+def _sitemap_run(source: dict, state: dict | None) -> tuple[list[dict], dict]:
+    results = monitor_pages.check_sitemap_source(source, state, {}, delay=0)
+    return results, results[0]["sitemap_state"]
+
+
+def test_sitemap_lastmod_diffing(http_server):
+    source = {"id": "regulator", "url": http_server.url("/"), "method": "sitemap", "sitemap_include": ["/orders/"]}
+    base = "https://regulator.example"
+    entries = {f"{base}/orders/1": "2026-10-01", f"{base}/orders/2": "2026-10-02", f"{base}/about": "2026-10-02"}
+    http_server.routes["/sitemap.xml"] = lambda handler: (
+        (304, {}, b"") if handler.headers.get("If-None-Match") == f'"{len(entries)}-{sorted(entries.values())[-1]}"'
+        else (200, {"ETag": f'"{len(entries)}-{sorted(entries.values())[-1]}"'}, _urlset(entries)))
+
+    results, state = _sitemap_run(source, None)
+    assert results[0]["success"] and results[0]["items"] == []  # First check only records
+    assert list(state["files"][http_server.url("/sitemap.xml")]["entries"]) == [f"{base}/orders/1", f"{base}/orders/2"]
+
+    results, state = _sitemap_run(source, state)
+    assert results[0]["sitemap_not_modified"]
+    assert http_server.requests[-1]["headers"]["If-None-Match"]
+
+    entries.update({f"{base}/orders/2": "2026-10-05", f"{base}/orders/3-spectrum-order.html": "2026-10-04",
+                    f"{base}/careers": "2026-10-05"})
+    results, state = _sitemap_run(source, state)
+    assert [(item["url"], item["change"], item["title"]) for item in results[0]["items"]] == [
+        (f"{base}/orders/2", "modified", "2"),
+        (f"{base}/orders/3-spectrum-order.html", "new", "3 spectrum order"),
+    ]
+    assert results[0]["items"][0]["method"] == "sitemap"
+
+
+def test_sitemap_index_children_are_reused_while_their_lastmod_is_unchanged(http_server):
+    source = {"id": "news", "url": http_server.url("/"), "sitemap": http_server.url("/index.xml")}
+    children = {"/2026-09.xml": "2026-09-30", "/2026-10.xml": "2026-10-01"}
+
+    def index(handler):
+        sitemaps = "".join(f"<sitemap><loc>{http_server.url(path)}</loc><lastmod>{lastmod}</lastmod></sitemap>"
+                           for path, lastmod in children.items())
+        return 200, {}, f'<?xml version="1.0"?><sitemapindex>{sitemaps}</sitemapindex>'.encode()
+
+    http_server.routes["/index.xml"] = index
+    http_server.routes["/2026-09.xml"] = (200, {}, _urlset({"https://news.example/a": "2026-09-30"}))
+    http_server.routes["/2026-10.xml"] = (200, {}, _urlset({"https://news.example/b": "2026-10-01"}))
+    _, state = _sitemap_run(source, None)
+
+    children["/2026-10.xml"] = "2026-10-02"
+    http_server.routes["/2026-10.xml"] = (200, {}, _urlset({"https://news.example/b": "2026-10-01",
+                                                            "https://news.example/c": "2026-10-02"}))
+    del http_server.requests[:]
+    results, state = _sitemap_run(source, state)
+    assert http_server.paths() == ["/index.xml", "/2026-10.xml"]
+    assert [item["url"] for item in results[0]["items"]] == ["https://news.example/c"]
+
+
+def test_missing_sitemap_falls_back_to_checking_pages(http_server):
+    source = {"id": "regulator", "url": http_server.url("/"), "method": "sitemap",
+              "sections": [{"name": "orders", "url": "/orders"}]}
+    http_server.routes["/orders"] = (200, {}, _listing(["1"]))
+
+    results, state = _sitemap_run(source, None)
+    assert results[0]["sitemap_missing"] and state["missing"]
+    assert [(r["section"], r["success"]) for r in results] == [("sitemap", True), ("orders", True)]
+    assert http_server.paths() == ["/sitemap.xml", "/orders"]
+
+    # Not probed again until SITEMAP_RETRY_DAYS have passed
+    results = monitor_pages.check_sitemap_source(source, state, {}, delay=0)
+    assert [r["section"] for r in results] == ["sitemap", "orders"]
+    assert results[0]["sitemap_state"] is None  # The stored "missing" date stays
+    assert http_server.paths()[2:] == ["/orders"]
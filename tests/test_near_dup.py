@@ -0,0 +1,71 @@
+import sqlite3
+
+import near_dup
+from near_dup import NearDuplicateIndex
+
+TITLE = "MeitY notifies amendments to IT Rules on synthetic media labelling"
+
+
+def _item(source_id, title, url, **extra):
+    return {"source_id": source_id, "title": title, "url": url, **extra}
+
+
+def _db():
+    conn = sqlite3.connect(":memory:")
+    near_dup.init_tables(conn)
+    return conn
+
+
+def test_same_story_from_two_sources_is_clustered():
+    index = NearDuplicateIndex()
+    first = _item("medianama", TITLE, "https://a.example/1")
+    assert index.add(first) is None
+    assert index.add(_item("livelaw", "MeitY notifies amendments to IT Rules on synthetic media labelling",
+                           "https://b.example/1")) == {"duplicate_of": first}
+    assert index.add(_item("barandbench", "Supreme Court hears challenge to online gaming tax",
+                           "https://c.example/1")) is None
+    assert [len(cluster) for cluster in index.clusters()] == [2, 1]
+    assert index.stats == {"clustered": 1, "earlier": 0}
+
+
+def test_same_source_and_short_titles_are_not_clustered():
+    index = NearDuplicateIndex()
+    index.add(_item("medianama", TITLE, "https://a.example/1"))
+    assert index.add(_item("medianama", TITLE, "https://a.example/2")) is None
+    index.add(_item("livelaw", "IT Rules", "https://b.example/1"))
+    assert index.add(_item("barandbench", "IT Rules", "https://c.example/1")) is None
+
+
+def test_canonical_items_ranks_and_merges_alternates():
+    index = NearDuplicateIndex()
+    index.add(_item("livelaw", TITLE, "https://b.example/1", tier=2,
+                    matched_focus_areas={"ai": ["deepfake"]}))
+    index.add(_item("meity", TITLE, "https://meity.example/1", tier=1,
+                    matched_focus_areas={"ai": ["Synthetic media"], "it_rules": ["IT Rules"]}))
+    (item,) = index.canonical_items(rank=lambda item: item["tier"])
+    assert item["source_id"] == "meity"
+    assert [alt["source_id"] for alt in item["alternate_sources"]] == ["livelaw"]
+    assert item["matched_focus_areas"] == {"ai": ["deepfake", "Synthetic media"], "it_rules": ["IT Rules"]}
+
+
+def test_canonical_items_default_keeps_first():
+    index = NearDuplicateIndex()
+    index.add(_item("livelaw", TITLE, "https://b.example/1"))
+    index.add(_item("meity", TITLE, "https://meity.example/1"))
+    (item,) = index.canonical_items()
+    assert item["source_id"] == "livelaw"
+
+
+def test_story_recorded_in_earlier_run_is_skipped():
+    conn = _db()
+    earlier = NearDuplicateIndex(conn)
+    earlier.add(_item("medianama", TITLE, "https://a.example/1"))
+    earlier.record()
+    conn.commit()
+
+    index = NearDuplicateIndex(conn)
+    match = index.add(_item("livelaw", TITLE, "https://b.example/1"))
+    assert match["earlier"]["url"] == "https://a.example/1"
+    assert index.canonical_items() == []
+    # The same source republishing is not an earlier-run duplicate
+    assert NearDuplicateIndex(conn).add(_item("medianama", TITLE, "https://a.example/2")) is None
@@ -0,0 +1,63 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import scheduler
+from scheduler import next_interval, select_due
+
+NOW = datetime(2026, 10, 1, 12, tzinfo=timezone.utc)
+DAILY = {"id": "trai", "method": "rss", "check_frequency": "daily"}
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    scheduler.init_schedule_table(conn)
+    return conn
+
+
+def test_next_interval_adapts_within_bounds():
+    assert next_interval(DAILY, None, changed=True) == 12
+    assert next_interval(DAILY, None, changed=False) == 36
+    entry = {"interval_hours": 7, "frequency": "daily"}
+    assert next_interval(DAILY, entry, changed=True) == 24 * scheduler.MIN_FACTOR
+    entry = {"interval_hours": 90, "frequency": "daily"}
+    assert next_interval(DAILY, entry, changed=False) == 24 * scheduler.MAX_FACTOR
+
+
+def test_next_interval_restarts_after_frequency_change():
+    entry = {"interval_hours": 90, "frequency": "weekly"}
+    assert next_interval(DAILY, entry, changed=True) == 12
+
+
+def test_next_interval_every_run():
+    assert next_interval({"check_frequency": "every_run"}, None, changed=False) == 0
+
+
+def test_select_due(conn):
+    quiet = {"id": "quiet", "check_frequency": "daily"}
+    busy = {"id": "busy", "check_frequency": "daily"}
+    new = {"id": "new", "check_frequency": "weekly"}
+    always = {"id": "always", "check_frequency": "every_run"}
+    scheduler.record_checks(conn, [(quiet, True, False), (busy, True, True), (always, True, False)],
+                            now=NOW - timedelta(hours=20))
+
+    due, not_due = select_due(conn, [quiet, busy, new, always], now=NOW)
+    # busy: due 12h after the check (8h ago); quiet: 36h after, not within the slack
+    assert [s["id"] for s in due] == ["busy", "new", "always"]
+    assert [s["id"] for s in not_due] == ["quiet"]
+
+
+def test_failed_check_stays_due(conn):
+    scheduler.record_checks(conn, [(DAILY, True, False)], now=NOW - timedelta(hours=40))
+    scheduler.record_checks(conn, [(DAILY, False, False)], now=NOW - timedelta(hours=1))
+    entry = scheduler.load_schedule(conn)["trai"]
+    assert entry["failures"] == 1 and entry["checks"] == 2
+    assert select_due(conn, [DAILY], now=NOW)[0] == [DAILY]
+
+
+def test_changed_frequency_is_due_immediately(conn):
+    scheduler.record_checks(conn, [(DAILY, True, False)], now=NOW)
+    assert select_due(conn, [DAILY], now=NOW)[0] == []
+    assert select_due(conn, [{**DAILY, "check_frequency": "hourly"}], now=NOW)[1] == []
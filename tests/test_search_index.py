@@ -0,0 +1,105 @@
+import json
+import os
+
+import pytest
+
+import search_index
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    sources = tmp_path / "sources"
+    for name, value in {"PROJECT_ROOT": tmp_path, "SOURCES_DIR": sources,
+                        "STATUTES_DIR": sources / "statutes", "JUDGEMENTS_DIR": sources / "judgements",
+                        "DOWNLOADED_DIR": sources / "downloaded"}.items():
+        monkeypatch.setattr(search_index, name, value)
+
+    statute = sources / "statutes" / "IT-Act" / "IT_Act_2000.txt"
+    statute.parent.mkdir(parents=True)
+    statute.write_text("--- Page 1 ---\nPreliminary definitions\n\n"
+                       "--- Page 2 ---\nSection 79 safe harbour for an intermediary", encoding="utf-8")
+    (statute.parent / "IT_Act_2000_metadata.json").write_text(json.dumps(
+        {"short_title": "Information Technology Act", "notification_date": "2000-10-17"}))
+
+    judgment = sources / "judgements" / "2015-Free-Speech-Shreya-Singhal" / "judgment.txt"
+    judgment.parent.mkdir(parents=True)
+    judgment.write_text("Section 66A struck down; Section 79 intermediary read down.", encoding="utf-8")
+    (judgment.parent / "metadata.json").write_text(json.dumps(
+        {"case_name": "Shreya Singhal v Union of India", "judgment_date": "2015-03-24",
+         "court": "Supreme Court", "focus_areas": ["Free-Speech", "Intermediary-Liability"]}))
+
+    downloads = sources / "downloaded"
+    downloads.mkdir(parents=True)
+    (downloads / "2026-10-01_findings.json").write_text(json.dumps({
+        "date": "2026-10-01",
+        "executive_summary": "Quiet day for telecom.",
+        "developments": [{"title": "MeitY intermediary advisory", "summary": "Deepfake labelling advisory",
+                          "url": "https://meity.example/advisory", "focus_areas": ["AI-Governance"]}]
+    }))
+    (downloads / "new_items.json").write_text(json.dumps({
+        "items": [{"title": "TRAI consultation on satellite spectrum", "snippet": "spectrum pricing",
+                   "url": "https://trai.example/1", "published": "2026-10-02T09:00:00",
+                   "source_id": "trai", "focus_areas": ["Telecom"]}],
+        "page_changes": []
+    }))
+
+    conn = search_index.connect(tmp_path / "search_index.db")
+    yield sources, conn
+    conn.close()
+
+
+def _found(conn, query, **filters):
+    return [(hit["kind"], hit["title"], hit["locator"]) for hit in search_index.search(conn, query, **filters)]
+
+
+def test_indexes_pages_findings_and_items(corpus):
+    sources, conn = corpus
+    stats = search_index.update_index(conn)
+    assert (stats["files"], stats["indexed"], stats["errors"]) == (4, 4, [])
+
+    assert _found(conn, '"safe harbour"') == [("statute", "Information Technology Act", "page 2")]
+    assert _found(conn, "spectrum") == [("item", "TRAI consultation on satellite spectrum", "trai")]
+    assert set(_found(conn, "intermediary")) == {
+        ("statute", "Information Technology Act", "page 2"),
+        ("judgement", "Shreya Singhal v Union of India", None),
+        ("finding", "MeitY intermediary advisory", "developments"),
+    }
+    assert _found(conn, "Section 79 (") == _found(conn, '"Section" "79"')  # Invalid syntax matches words
+
+
+def test_filters_by_area_date_and_kind(corpus):
+    _, conn = corpus
+    search_index.update_index(conn)
+    assert _found(conn, "intermediary", areas=["it-act"]) == [("statute", "Information Technology Act", "page 2")]
+    assert _found(conn, "intermediary", areas=["Free-Speech", "AI-Governance"], date_from="2020-01-01") == [
+        ("finding", "MeitY intermediary advisory", "developments")]
+    assert _found(conn, "intermediary", date_to="2010-01-01") == [("statute", "Information Technology Act", "page 2")]
+    assert _found(conn, "intermediary", kinds=["judgement"]) == [
+        ("judgement", "Shreya Singhal v Union of India", None)]
+
+
+def test_only_changed_files_are_reindexed(corpus):
+    sources, conn = corpus
+    search_index.update_index(conn)
+    assert search_index.update_index(conn)["unchanged"] == 4
+
+    statute = sources / "statutes" / "IT-Act" / "IT_Act_2000.txt"
+    os.utime(statute, ns=(statute.stat().st_atime_ns, statute.stat().st_mtime_ns + 10**9))
+    stats = search_index.update_index(conn)
+    assert (stats["indexed"], stats["unchanged"]) == (0, 4)  # Touched, same content
+
+    statute.write_text("--- Page 1 ---\nSection 79 due diligence by an intermediary", encoding="utf-8")
+    (sources / "downloaded" / "new_items.json").unlink()
+    stats = search_index.update_index(conn)
+    assert (stats["indexed"], stats["unchanged"], stats["removed"]) == (1, 2, 1)
+    assert _found(conn, '"safe harbour"') == []
+    assert _found(conn, "diligence") == [("statute", "Information Technology Act", "page 1")]
+    assert _found(conn, "spectrum") == []
+
+
+def test_rebuild_starts_from_scratch(corpus):
+    _, conn = corpus
+    search_index.update_index(conn)
+    stats = search_index.update_index(conn, rebuild=True)
+    assert (stats["indexed"], stats["unchanged"]) == (4, 0)
+    assert conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0] == stats["entries"]
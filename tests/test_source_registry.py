@@ -0,0 +1,89 @@
+import json
+import os
+
+import source_registry
+
+
+def _rss(source_id, host, **fields):
+    return {"id": source_id, "url": f"https://{host}/", "method": "rss", "rss": f"https://{host}/feed", **fields}
+
+
+def test_invalid_sources_are_reported_and_left_out(project):
+    project.write_tier(1, [
+        _rss("trai", "www.trai.example", focus_areas=["Telecom"]),
+        {"id": "no-url", "method": "webfetch"},
+        {"id": "bad-method", "url": "https://x.example", "method": "scrape"},
+        {"id": "feedless", "url": "https://y.example", "method": "rss"},
+        {"id": "bad-pattern", "url": "https://z.example", "method": "sitemap", "sitemap_include": ["("]},
+        _rss("trai", "trai.example"),
+        {"id": "search", "url": "https://s.example", "method": "websearch"},
+    ], check_frequency="hourly")
+    (project.config_dir / "tier2-high").mkdir()
+    (project.config_dir / "tier2-high" / "broken.json").write_text("{", encoding="utf-8")
+
+    registry = source_registry.load()
+    assert [s["id"] for s in registry.sources] == ["trai", "search"]
+    assert registry.get("trai")["check_frequency"] == "hourly"
+    errors = "\n".join(registry.errors)
+    for expected in ("(no-url): url must be", "(bad-method): unknown method 'scrape'",
+                     "(feedless): rss source without", "(bad-pattern): bad sitemap_include pattern",
+                     "duplicate id 'trai' in tier 1", "tier2-high/broken.json: unreadable"):
+        assert expected in errors
+    assert registry.warnings == ["sources/config/tier1-critical/sources.json sources[6] (search): "
+                                 "websearch source without a search_query"]
+
+
+def test_lookups_and_url_rules(project):
+    rules = {"strip_params": ["utm_source"], "hosts": ["cdn.regulator.example"]}
+    project.write_tier(1, [_rss("trai", "www.trai.example", focus_areas=["Telecom"], url_rules=rules),
+                           _rss("meity", "meity.example", focus_areas=["IT-Act"], enabled=False)])
+    project.write_tier(3, [_rss("trai", "trai.example", focus_areas=["Telecom", "Spectrum"]),
+                           {"id": "blog", "url": "https://blog.example", "method": "webfetch"}])
+    (project.config_dir / "master-sources.json").write_text(json.dumps({
+        "version": "2", "sources": [{"id": "gazette", "url": "https://gazette.example", "method": "webfetch",
+                                     "tier": 2}]}), encoding="utf-8")
+
+    registry = source_registry.load()
+    assert [s["tier"] for s in registry.all_with_id("trai")] == [1, 3]
+    assert registry.get("trai", tier=3)["focus_areas"] == ["Telecom", "Spectrum"]
+    assert registry.get("missing") is None
+    assert registry.get("gazette")["tier"] == 2 and registry.master == {"version": "2"}
+
+    def ids(**filters):
+        return [(s["id"], s["tier"]) for s in registry.select(**filters)]
+    assert ids(host="trai.example") == [("trai", 1), ("trai", 3)]
+    assert ids(host="https://www.TRAI.example/path") == [("trai", 1), ("trai", 3)]
+    assert ids(methods=["rss"]) == [("trai", 1), ("trai", 3)]
+    assert ids(methods=["rss"], enabled_only=False) == [("trai", 1), ("meity", 1), ("trai", 3)]
+    assert ids(tiers=[2, 3], methods=["webfetch"]) == [("blog", 3), ("gazette", 2)]
+    assert ids(focus_area="Spectrum") == [("trai", 3)]
+    assert registry.url_rules == {"trai.example": rules, "cdn.regulator.example": rules}
+    assert "trai: listed in tiers 1, 3" in registry.warnings
+
+    registry.get("trai")["url"] = "changed by a caller"
+    assert source_registry.load().get("trai")["url"] == "https://www.trai.example/"
+
+
+def test_snapshot_is_reused_until_a_config_changes(project, monkeypatch):
+    path = project.write_tier(1, [_rss("trai", "trai.example")])
+    compiles = []
+    compile_snapshot = source_registry.compile_snapshot
+    monkeypatch.setattr(source_registry, "compile_snapshot", lambda files: compiles.append(1) or compile_snapshot(files))
+
+    source_registry.load()
+    source_registry.load()
+    source_registry._memo.clear()  # A new process: the snapshot on disk is reused
+    assert source_registry.load().get("trai")
+    assert len(compiles) == 1
+    assert (project.state_dir / "source_registry.json").exists()
+
+    # Same size, new mtime: recompiled
+    path.write_text(path.read_text().replace("trai.example", "trai.exampl2"), encoding="utf-8")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+    assert source_registry.load().get("trai")["url"] == "https://trai.exampl2/"
+    assert len(compiles) == 2
+
+    project.write_tier(2, [_rss("meity", "meity.example")])
+    assert source_registry.load().get("meity")
+    assert source_registry.load(use_cache=False).get("meity")
+    assert len(compiles) == 4
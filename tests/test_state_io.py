@@ -0,0 +1,44 @@
+import multiprocessing
+
+from state_io import atomic_write_json, lock_path, read_json, update_json
+
+
+def test_atomic_write_json_round_trip(tmp_path):
+    path = tmp_path / "nested" / "state.json"
+    atomic_write_json(path, {"a": [1, 2], "b": None})
+    assert read_json(path) == {"a": [1, 2], "b": None}
+    atomic_write_json(path, {"a": 3})
+    assert read_json(path) == {"a": 3}
+    assert [p.name for p in path.parent.iterdir()] == ["state.json"]
+
+
+def test_read_json_default_for_missing_or_corrupt(tmp_path):
+    path = tmp_path / "state.json"
+    assert read_json(path, {}) == {}
+    path.write_text("{not json", encoding="utf-8")
+    assert read_json(path, []) == []
+
+
+def test_update_json_mutates_or_replaces(tmp_path):
+    path = tmp_path / "state.json"
+    assert update_json(path, lambda data: data.setdefault("runs", []).append(1), default={}) == {"runs": [1]}
+    assert update_json(path, lambda data: data["runs"].append(2)) == {"runs": [1, 2]}
+    assert update_json(path, lambda data: {"replaced": True}) == {"replaced": True}
+    assert read_json(path) == {"replaced": True}
+    assert lock_path(path).exists()
+
+
+def _increment(path, times):
+    for _ in range(times):
+        update_json(path, lambda data: data.update(count=data.get("count", 0) + 1), default={})
+
+
+def test_update_json_serializes_concurrent_processes(tmp_path):
+    path = tmp_path / "state.json"
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_increment, args=(path, 50)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert read_json(path) == {"count": 200}
@@ -0,0 +1,80 @@
+import sqlite3
+
+import url_canon
+from url_canon import canonicalize, clean_url, migrate_seen_items
+
+
+def test_canonicalize_drops_tracking_and_variants():
+    key = "https://example.com/news/story"
+    assert canonicalize("http://www.Example.com/news/story/?utm_source=x&fbclid=y#top") == key
+    assert canonicalize("https://amp.example.com/news/story/amp") == key
+    assert canonicalize("https://example.com:443/news/story") == key
+
+
+def test_canonicalize_sorts_query_and_keeps_real_params():
+    assert canonicalize("https://example.com/a?b=2&a=1&utm_medium=rss") == "https://example.com/a?a=1&b=2"
+
+
+def test_canonicalize_host_rules():
+    rules = {"example.com": {"strip_params": ["from"]}}
+    assert canonicalize("https://example.com/a?from=home&id=3", rules) == "https://example.com/a?id=3"
+    rules = {"example.com": {"keep_params": ["id"]}}
+    assert canonicalize("https://www.example.com/a?id=3&page=2", rules) == "https://example.com/a?id=3"
+
+
+def test_canonicalize_leaves_non_http_alone():
+    assert canonicalize("mailto:desk@example.com") == "mailto:desk@example.com"
+    assert canonicalize("") == ""
+
+
+def test_clean_url_keeps_published_form():
+    assert clean_url("http://www.example.com/a/?utm_source=x#frag") == "http://www.example.com/a/"
+
+
+def _seen_items_db():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    conn.execute("""
+        CREATE TABLE seen_items (
+            url TEXT PRIMARY KEY, title TEXT, source_id TEXT,
+            content_hash TEXT, first_seen TEXT, published TEXT
+        )
+    """)
+    conn.executemany("INSERT INTO seen_items (url, title, first_seen) VALUES (?, ?, ?)", [
+        ("https://www.example.com/a/?utm_source=rss", "later copy", "2026-02-01"),
+        ("https://example.com/a", "first copy", "2026-01-01"),
+        ("https://example.com/b?fbclid=1", "other", "2026-01-05"),
+        ("https://example.com/c", "already canonical", "2026-01-06"),
+    ])
+    return conn
+
+
+def test_migrate_seen_items_merges_to_canonical_keys():
+    conn = _seen_items_db()
+    stats = migrate_seen_items(conn, rules_by_host={})
+    assert stats["seen_items"] == {"rows": 4, "rewritten": 2, "merged": 1}
+    rows = dict(conn.execute("SELECT url, title FROM seen_items"))
+    assert rows == {
+        "https://example.com/a": "first copy",
+        "https://example.com/b": "other",
+        "https://example.com/c": "already canonical",
+    }
+    # Published links that differ from their key are remembered
+    assert url_canon.unseen_raw_links(conn, [
+        "https://www.example.com/a/?utm_source=rss", "https://example.com/b?fbclid=1", "https://example.com/c"
+    ]) == {"https://example.com/c"}
+
+
+def test_migrate_seen_items_runs_once_unless_forced():
+    conn = _seen_items_db()
+    assert migrate_seen_items(conn, rules_by_host={}) is not None
+    assert migrate_seen_items(conn, rules_by_host={}) is None
+    assert migrate_seen_items(conn, rules_by_host={}, force=True)["seen_items"]["rewritten"] == 0
+
+
+def test_migrate_seen_items_dry_run_changes_nothing():
+    conn = _seen_items_db()
+    before = sorted(conn.execute("SELECT * FROM seen_items"))
+    stats = migrate_seen_items(conn, rules_by_host={}, dry_run=True)
+    assert stats["seen_items"]["merged"] == 1
+    assert sorted(conn.execute("SELECT * FROM seen_items")) == before
+    assert migrate_seen_items(conn, rules_by_host={}) is not None